@@ -0,0 +1,16 @@
+import time
+
+from jass.logic.batch_game import BatchGame, random_policy, heuristic_policy
+
+if __name__ == '__main__':
+    n = 100_000
+    game = BatchGame(n=n, seed=0)
+
+    for name, policies in [('random', random_policy),
+                           ('heuristic', heuristic_policy),
+                           ('heuristic vs random', [heuristic_policy, random_policy] * 2)]:
+        start = time.perf_counter()
+        points = game.play_round(policies)
+        elapsed = time.perf_counter() - start
+        print(f'{name}: {n / elapsed * 60:,.0f} rounds/min, '
+              f'mean points {points[:, 0].mean():.1f} - {points[:, 1].mean():.1f}')
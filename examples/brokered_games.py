@@ -0,0 +1,36 @@
+import multiprocessing
+import time
+
+from jass.agents.impl.dqn_agent import DQNAgent
+from jass.agents.state import PlayCardState
+from jass.agents.util.inference_broker import InferenceBroker
+from jass.logic.game import Game
+from jass.models.linear_dqn import LinearDQN
+
+
+def play_games(policies, n_games):
+    agents = [DQNAgent(train=False) for _ in policies]
+    for agent, policy in zip(agents, policies):
+        agent.policy = policy
+    for _ in range(n_games):
+        Game(agents=agents, names=['Jean', 'Anne', 'Luc', 'Sophie'], log_fn=None, goal=1000).start()
+
+
+if __name__ == '__main__':
+    n_workers, n_games = 8, 20
+    policy_net = LinearDQN.for_state(PlayCardState)  # or loaded from a state dict
+
+    for max_wait_us in (0, 100, 1000):
+        with InferenceBroker(policy_net, PlayCardState, max_wait_us=max_wait_us, processes=True) as broker:
+            start = time.perf_counter()
+            workers = [multiprocessing.Process(target=play_games, args=([broker.policy() for _ in range(4)], n_games))
+                       for _ in range(n_workers)]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            elapsed = time.perf_counter() - start
+
+        print(f'max wait {max_wait_us} us: {broker.n_requests / elapsed:,.0f} decisions/s')
+        for histogram in (broker.batch_sizes, broker.latencies, broker.forward_times):
+            print(f'  {histogram}')
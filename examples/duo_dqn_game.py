@@ -3,21 +3,27 @@ import torch
 from jass.agents.impl.dqn_agent import DQNAgent
 from jass.agents.impl.greedy_agent import GreedyAgent
 from jass.agents.impl.random_agent import RandomAgent
+from jass.logic.events import ScoreDifferencePrinter
 from jass.logic.game import Game
+from jass.metrics import GameMetrics, LearnerMetrics, MetricsServer, RollingFileWriter
 
 if __name__ == '__main__':
     # state_dict = torch.load(f'/Users/greg/Data/AI/jass/policy_net_v1/policy_net_v1_ep_53260')
     # print([(k, v.size()) for k, v in state_dict.items()])
 
-    dqn_agent_builder = lambda: DQNAgent()  # DQNAgent(train=False, state_dict=state_dict)
-    agents = [dqn_agent_builder(), RandomAgent(), dqn_agent_builder(), RandomAgent()]
     names = ['Jean', 'Anne', 'Luc', 'Sophie']
+    dqn_agent_builder = lambda name: DQNAgent(metrics=LearnerMetrics(agent=name))  # DQNAgent(train=False, ...)
+    agents = [dqn_agent_builder(names[0]), RandomAgent(), dqn_agent_builder(names[2]), RandomAgent()]
 
     game = Game(
         agents=agents,
         names=names,
         log_fn=None,
-        goal=200000
+        goal=200000,
+        metrics=GameMetrics(),
     )
 
-    game.start()
+    game.events.subscribe(ScoreDifferencePrinter(every=20))
+    # metrics at http://127.0.0.1:9100/metrics and every 10 seconds in duo_dqn_metrics.jsonl
+    with MetricsServer(port=9100), RollingFileWriter('duo_dqn_metrics.jsonl', interval=10):
+        game.start()
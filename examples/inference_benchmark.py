@@ -0,0 +1,60 @@
+import random
+import time
+import warnings
+
+import torch
+from torch import nn
+
+from jass.agents.state import PlayCardState
+from jass.logic.card import Suit
+from jass.logic.deck import Deck
+from jass.models.linear_dqn import LinearDQN
+
+
+def random_states(n):
+    deck = Deck()
+    states = []
+    for _ in range(n):
+        cards = deck.shuffle().cards()
+        n_hand = random.randint(2, 9)
+        states.append(PlayCardState(trick_trump=random.choice(list(Suit)), trump_chooser_idx=random.randint(0, 3),
+                                    player_hand=cards[:n_hand], playable_cards=cards[:n_hand], trick_history=[],
+                                    round_history=[cards[9 + 4 * i:13 + 4 * i] for i in range(9 - n_hand)]))
+    return states
+
+
+def per_decision_us(model, x, min_time=1.0):
+    model(x)  # warm up
+    n = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < min_time:
+        model(x)
+        n += 1
+    return (time.perf_counter() - start) / n / len(x) * 1e6
+
+
+if __name__ == '__main__':
+    warnings.simplefilter('ignore')
+    torch.manual_seed(0)
+    policy_net = LinearDQN.for_state(PlayCardState)
+
+    def rebuilt_per_call(x):  # previous LinearDQN.forward
+        with torch.no_grad():
+            return nn.Sequential(*list(policy_net.net))(x.float())
+
+    def training_module(x):
+        with torch.no_grad():
+            return policy_net(x)
+
+    models = [
+        ('rebuilt per call', rebuilt_per_call),
+        ('training module', training_module),
+        ('frozen', policy_net.frozen()),
+        ('frozen, traced', policy_net.frozen(script=True)),
+        ('frozen, int8', policy_net.frozen(quantize=True)),
+        ('frozen, traced, int8', policy_net.frozen(script=True, quantize=True)),
+    ]
+    states = PlayCardState.encode_batch(random_states(256))
+    print(f'{"":<22}{"batch 1":>12}{"batch 256":>12}   (us per decision, {torch.get_num_threads()} threads)')
+    for name, model in models:
+        print(f'{name:<22}{per_decision_us(model, states[:1]):>12.1f}{per_decision_us(model, states):>12.2f}')
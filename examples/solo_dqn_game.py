@@ -1,5 +1,6 @@
 from jass.agents.impl.dqn_agent import DQNAgent
 from jass.agents.impl.random_agent import RandomAgent
+from jass.logic.events import ScoreDifferencePrinter
 from jass.logic.game import Game
 
 if __name__ == '__main__':
@@ -13,4 +14,5 @@ if __name__ == '__main__':
         goal=1e9
     )
 
+    game.events.subscribe(ScoreDifferencePrinter(every=20))
     game.start()
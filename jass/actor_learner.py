@@ -0,0 +1,294 @@
+"""
+Trains a DQN agent with actor processes playing games and one learner process training on their transitions.
+
+    python -m jass.actor_learner --actors 8 --steps 100000 --out policy_net.ckpt
+
+Actors play with a frozen, epsilon greedy snapshot of the policy network (the DQN agents sit on seats 0 and 2, the
+opponents on seats 1 and 3) and send their transitions in chunks of fixed width records through a queue. The learner
+pushes them into its replay memory and optimizes the network as fast as it can; every `publish_every` steps it copies
+the weights to a network in shared memory, which the actors load at the end of their next round.
+"""
+import argparse
+import contextlib
+import multiprocessing
+import queue
+import random
+import time
+from typing import Callable, List, NamedTuple, Optional, Sequence, Tuple
+
+import torch
+
+from jass.agents.action import ChooseTrumpAction, PlayCardAction
+from jass.agents.agent import Agent
+from jass.agents.impl.dqn_agent import DQNAgent, DQNPolicy, BATCH_SIZE, EPS_START, EPS_END, EPS_DECAY
+from jass.agents.impl.random_agent import RandomAgent
+from jass.agents.state import ChooseTrumpState, PlayCardState
+from jass.agents.util.policy import EpsilonGreedyPolicy
+from jass.agents.util.replay_memory import SARS, encode_transitions
+from jass.logic.deck import Deck
+from jass.logic.game import Game, GOAL
+from jass.metrics import GameMetrics, LearnerMetrics, MetricsServer, RollingFileWriter
+from jass.models.linear_dqn import LinearDQN
+
+AgentFactory = Callable[[], Agent]
+
+CHUNK_SIZE = 64  # transitions sent at once by an actor
+TARGET_UPDATE_STEPS = 1000
+
+
+class SharedWeights:
+    """Network in shared memory and the version of its weights, written by the learner and read by the actors"""
+
+    def __init__(self, context=multiprocessing):
+        self.net = LinearDQN.for_state(PlayCardState)
+        self.net.share_memory()
+        self.version = context.Value('q', 0)
+
+    def publish(self, net: LinearDQN) -> None:
+        with self.version.get_lock():
+            self.net.load_state_dict(net.state_dict())
+            self.version.value += 1
+
+    def copy_to(self, net: LinearDQN) -> int:
+        """Loads the weights into `net`, returns their version"""
+        with self.version.get_lock():
+            net.load_state_dict(self.net.state_dict())
+            return self.version.value
+
+
+#########
+# ACTOR #
+#########
+
+class ActorAgent(Agent):
+    """
+    Plays with an epsilon greedy snapshot of the shared network, swapped for the latest published one at the end of
+    each round, and sends its transitions to the learner
+    """
+
+    def __init__(self, weights: SharedWeights, transitions: multiprocessing.Queue, chunk_size: int = CHUNK_SIZE):
+        self.weights = weights
+        self.transitions = transitions
+        self.chunk_size = chunk_size
+        self.policy_net = LinearDQN.for_state(PlayCardState)
+        self.version = weights.copy_to(self.policy_net)
+        self.policy = EpsilonGreedyPolicy(original_policy=DQNPolicy(self.policy_net.frozen()), eps_start=EPS_START,
+                                          eps_end=EPS_END, eps_decay=EPS_DECAY)
+        self.__buffer: List[SARS] = []
+        self.prev_state = None
+        self.prev_action = None
+        self.prev_reward = None
+
+    def play_card(self, state: PlayCardState) -> PlayCardAction:
+        if self.prev_state is not None:
+            self.__send(SARS(self.prev_state, self.prev_action, self.prev_reward, state))
+        action = self.policy(state)
+        self.prev_state = state
+        self.prev_action = action
+        return action
+
+    def trick_end(self, reward: int, done: bool):
+        self.prev_reward = reward
+        if done:
+            self.__send(SARS(self.prev_state, self.prev_action, reward, None))
+            self.prev_state = None
+            if self.weights.version.value != self.version:
+                self.__swap_weights()
+
+    def choose_trump(self, state: ChooseTrumpState) -> ChooseTrumpAction:
+        return RandomAgent.choose_trump(state)
+
+    def new_game(self) -> None:
+        """
+        To call before each game but the first one: a game ending during a round leaves the last card played without
+        a next state, its transition is dropped (the round was cut short, it did not end there)
+        """
+        self.prev_state = None
+        self.prev_action = None
+        self.prev_reward = None
+
+    def flush(self) -> None:
+        if self.__buffer:
+            self.transitions.put(encode_transitions(self.__buffer, PlayCardState))
+            self.__buffer = []
+
+    def __send(self, sars: SARS) -> None:
+        self.__buffer.append(sars)
+        if len(self.__buffer) >= self.chunk_size:
+            self.flush()
+
+    def __swap_weights(self) -> None:
+        self.version = self.weights.copy_to(self.policy_net)
+        self.policy.original_policy = DQNPolicy(self.policy_net.frozen())
+
+
+class _GamesPlayed(NamedTuple):
+    """Sent by an actor after each game, with its transitions, for the learner to count its games in its metrics"""
+    rounds: List[Tuple[float, float, int]]  # arguments of `GameMetrics.round_played`
+    games: int
+    epsilon: float  # exploration rate of the actor at the end of the game
+
+
+class _GameLog:
+    """Takes the place of the `GameMetrics` of a game played by an actor: keeps what they would count"""
+
+    def __init__(self):
+        self.rounds: List[Tuple[float, float, int]] = []
+        self.games = 0
+
+    def round_played(self, seconds: float, agent_seconds: float, n_cards: int) -> None:
+        self.rounds.append((seconds, agent_seconds, n_cards))
+
+    def game_played(self) -> None:
+        self.games += 1
+
+
+def _run_actor(actor_idx: int, weights: SharedWeights, transitions: multiprocessing.Queue, stop,
+               opponent: AgentFactory, goal: int, seed: int) -> None:
+    torch.set_num_threads(1)
+    random.seed((seed << 16) + actor_idx)  # forked actors would otherwise explore and deal alike
+    deck = Deck(seed=seed, stream_id=actor_idx)
+    actors = [ActorAgent(weights, transitions), ActorAgent(weights, transitions)]
+    agents = [actors[0], opponent(), actors[1], opponent()]
+    while not stop.is_set():
+        for actor in actors:
+            actor.new_game()
+        log = _GameLog()
+        Game(agents=agents, names=['A0', 'B1', 'A2', 'B3'], goal=goal, deck=deck, metrics=log).start()
+        epsilon = sum(actor.policy.epsilon for actor in actors) / len(actors)
+        transitions.put(_GamesPlayed(log.rounds, log.games, epsilon))
+    # whatever was not sent yet is dropped, the learner does not read the queue anymore
+    transitions.cancel_join_thread()
+
+
+###########
+# LEARNER #
+###########
+
+class Learner:
+    """
+    Trains `agent` (a training DQNAgent whose replay memory supports `push_records`) on the transitions sent by
+    `n_actors` actor processes. Use it as a context manager to start and stop the actors. The games played by the
+    actors are counted in `game_metrics` if given, and their exploration rate is the epsilon of the agent's metrics.
+    """
+
+    def __init__(self, n_actors: int, agent: Optional[DQNAgent] = None, opponent: AgentFactory = RandomAgent,
+                 goal: int = GOAL, publish_every: int = 50, target_update_every: int = TARGET_UPDATE_STEPS,
+                 seed: int = 0, mp_context: Optional[str] = None, game_metrics: Optional[GameMetrics] = None):
+        self.agent = DQNAgent(train=True) if agent is None else agent
+        self.game_metrics = game_metrics
+        self.publish_every = publish_every
+        self.target_update_every = target_update_every
+        context = multiprocessing.get_context(mp_context)
+        self.weights = SharedWeights(context)
+        self.weights.publish(self.agent.policy_net)
+        self.transitions = context.Queue()
+        self.__stop = context.Event()
+        self.__actors = [context.Process(target=_run_actor, args=(i, self.weights, self.transitions, self.__stop,
+                                                                  opponent, goal, seed), daemon=True)
+                         for i in range(n_actors)]
+        self.n_steps = 0
+        self.n_transitions = 0
+        self.n_games = 0
+
+    def start(self) -> 'Learner':
+        for actor in self.__actors:
+            actor.start()
+        return self
+
+    def close(self, timeout: float = 10) -> None:
+        """Stops the actors, terminates the ones still running after `timeout` seconds"""
+        self.__stop.set()
+        deadline = time.monotonic() + timeout
+        while any(actor.is_alive() for actor in self.__actors) and time.monotonic() < deadline:
+            self.__receive(timeout=0.1)  # unblocks the actors putting into a full pipe
+        for actor in self.__actors:
+            if actor.is_alive():
+                actor.terminate()
+            actor.join()
+
+    def __enter__(self) -> 'Learner':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def train(self, n_steps: int) -> None:
+        """Runs `n_steps` optimization steps, waiting for transitions when the memory holds less than a batch"""
+        memory = self.agent.memory
+        for _ in range(n_steps):
+            self.__receive(timeout=0)
+            while len(memory) < BATCH_SIZE:
+                self.__check_actors()
+                self.__receive(timeout=1)
+            self.agent.optimize_model()
+            self.n_steps += 1
+            if self.n_steps % self.target_update_every == 0:
+                self.agent.target_net.load_state_dict(self.agent.policy_net.state_dict())
+            if self.n_steps % self.publish_every == 0:
+                self.weights.publish(self.agent.policy_net)
+
+    def __check_actors(self) -> None:
+        """Raises if an actor stopped before being asked to, as no transitions would come from it anymore"""
+        for i, actor in enumerate(self.__actors):
+            if actor.exitcode is not None:
+                raise RuntimeError(f'actor {i} ({actor.name}) died with exit code {actor.exitcode}')
+
+    def __receive(self, timeout: float) -> None:
+        """Pushes the transitions received into the memory, waits at most `timeout` seconds for the first chunk"""
+        try:
+            item = self.transitions.get(timeout=timeout) if timeout > 0 else self.transitions.get_nowait()
+            while True:
+                if isinstance(item, _GamesPlayed):
+                    self.__count(item)
+                else:
+                    self.agent.memory.push_records(item)
+                    self.n_transitions += len(item)
+                item = self.transitions.get_nowait()
+        except queue.Empty:
+            pass
+
+    def __count(self, played: _GamesPlayed) -> None:
+        self.n_games += played.games
+        if self.agent.metrics is not None:
+            self.agent.metrics.epsilon.set(played.epsilon)
+        if self.game_metrics is not None:
+            for round_played in played.rounds:
+                self.game_metrics.round_played(*round_played)
+            for _ in range(played.games):
+                self.game_metrics.game_played()
+
+
+def main(args: Sequence[str] = None) -> None:
+    parser = argparse.ArgumentParser(prog='python -m jass.actor_learner', description=__doc__.split('\n\n')[0])
+    parser.add_argument('--actors', type=int, default=multiprocessing.cpu_count() - 1)
+    parser.add_argument('--steps', type=int, default=10000)
+    parser.add_argument('--publish-every', type=int, default=50)
+    parser.add_argument('--report-every', type=int, default=1000)
+    parser.add_argument('--out', help='path of the trained policy network state dict')
+    parser.add_argument('--metrics-port', type=int, help='serves the metrics of the games and learner on localhost')
+    parser.add_argument('--metrics-file', help='writes the metrics of the games and learner to this (rotated) file')
+    parsed = parser.parse_args(args)
+
+    with contextlib.ExitStack() as outputs:
+        if parsed.metrics_port is not None:
+            outputs.enter_context(MetricsServer(port=parsed.metrics_port))
+        if parsed.metrics_file is not None:
+            outputs.enter_context(RollingFileWriter(parsed.metrics_file))
+
+        start = time.perf_counter()
+        agent = DQNAgent(train=True, metrics=LearnerMetrics())
+        with Learner(n_actors=parsed.actors, agent=agent, publish_every=parsed.publish_every,
+                     game_metrics=GameMetrics()) as learner:
+            while learner.n_steps < parsed.steps:
+                learner.train(min(parsed.report_every, parsed.steps - learner.n_steps))
+                elapsed = time.perf_counter() - start
+                print(f'[{learner.n_steps}/{parsed.steps}] {learner.n_transitions / elapsed:,.0f} transitions/s, '
+                      f'{learner.n_games / elapsed:.1f} games/s, {learner.n_steps / elapsed:.1f} steps/s, '
+                      f'replay {len(learner.agent.memory)}')
+    if parsed.out:
+        torch.save(learner.agent.policy_net.state_dict(), parsed.out)
+
+
+if __name__ == '__main__':
+    main()
@@ -11,6 +11,12 @@ _tb = TensorBuilder
 class Action(metaclass=ABCMeta):
     tensor_size = NotImplemented
 
+    @property
+    @abstractmethod
+    def index(self) -> int:
+        """Position of the one of `tensor`"""
+        raise NotImplementedError
+
     @property
     @abstractmethod
     def tensor(self) -> torch.Tensor:
@@ -28,6 +34,10 @@ class PlayCardAction(Action):
     def __init__(self, card_to_play: Card):
         self.card_to_play = card_to_play
 
+    @property
+    def index(self) -> int:
+        return self.card_to_play.order_value
+
     @property
     def tensor(self) -> torch.Tensor:
         return _tb.one_hot(self.card_to_play).squeeze()
@@ -46,6 +56,10 @@ class ChooseTrumpAction(Action):
     def __init__(self, suit: Suit = None):
         self.suit = suit
 
+    @property
+    def index(self) -> int:
+        return 4 if self.suit is None else self.suit.order_value
+
     @property
     def tensor(self) -> torch.Tensor:
         vector = torch.zeros(5).long()
@@ -1,3 +1,5 @@
+import time
+
 import torch
 import torch.nn.functional as F
 from torch import nn
@@ -8,7 +10,8 @@ from jass.agents.agent import Agent
 from jass.agents.impl.random_agent import RandomAgent
 from jass.agents.state import ChooseTrumpState, PlayCardState, State
 from jass.agents.util.policy import Policy, EpsilonGreedyPolicy
-from jass.agents.util.replay_memory import ReplayMemory, SARS
+from jass.agents.util.replay_memory import SARS, PrioritizedReplayMemory, TensorReplayMemory
+from jass.metrics import LearnerMetrics
 from jass.models.linear_dqn import LinearDQN
 
 BATCH_SIZE = 128
@@ -18,6 +21,9 @@ EPS_END = 0.05
 EPS_DECAY = 200
 TARGET_UPDATE = 10
 MEMORY_CAPACITY = 10000
+PRIORITY_ALPHA = 0.6
+PRIORITY_BETA_START = 0.4
+PRIORITY_BETA_EPISODES = 1000  # episodes to anneal the importance sampling exponent to 1
 
 device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 
@@ -28,23 +34,26 @@ class DQNPolicy(Policy):
 
     def __call__(self, state: State) -> State:
         with torch.no_grad():
-            action_tensor = self.policy_net(state.tensor.unsqueeze(0)).squeeze()
-            action_tensor -= action_tensor.min()
-            action_tensor += 1
-            action_tensor *= state.action_tensor_mask.float()
-            # print(action_tensor)
+            action_tensor = self.policy_net(state.tensor.unsqueeze(0)).squeeze(0)
+            action_tensor = action_tensor.masked_fill(~state.action_tensor_mask, float('-inf'))
             return state.action_type.from_tensor(action_tensor)
 
 
 class DQNAgent(Agent):
 
-    def __init__(self, train=True, state_dict=None):
+    def __init__(self, train=True, state_dict=None, prioritized=False, memory=None, script=False, quantize=False,
+                 metrics: LearnerMetrics = None):
         self.num_episode = 0
+        self.metrics = metrics
         self.train = train
+        self.prioritized = prioritized
         self.policy_net = LinearDQN.for_state(PlayCardState).to(device)
-        self.policy = DQNPolicy(self.policy_net)
         if state_dict is not None:
             self.policy_net.load_state_dict(state_dict)
+        if self.train:
+            self.policy = DQNPolicy(self.policy_net)
+        else:  # frozen snapshot, optionally traced (`script`) and with int8 Linear layers (`quantize`)
+            self.policy = DQNPolicy(self.policy_net.frozen(script=script, quantize=quantize))
 
         if self.train:
             self.target_net = LinearDQN.for_state(PlayCardState).to(device)
@@ -52,7 +61,15 @@ class DQNAgent(Agent):
             self.target_net.eval()
 
             self.optimizer = optim.RMSprop(self.policy_net.parameters())
-            self.memory = ReplayMemory(MEMORY_CAPACITY)
+            if memory is not None:  # e.g. a DiskReplayMemory
+                if self.prioritized and not hasattr(memory, 'update_priorities'):
+                    raise ValueError(f'{type(memory).__name__} does not support prioritized replay')
+                self.memory = memory
+            elif self.prioritized:
+                self.memory = PrioritizedReplayMemory(MEMORY_CAPACITY, PlayCardState, alpha=PRIORITY_ALPHA,
+                                                      beta=PRIORITY_BETA_START)
+            else:
+                self.memory = TensorReplayMemory(MEMORY_CAPACITY, PlayCardState)
 
             self.policy = EpsilonGreedyPolicy(
                 original_policy=self.policy,
@@ -81,6 +98,9 @@ class DQNAgent(Agent):
             if self.num_episode % TARGET_UPDATE == 0:
                 self.target_net.load_state_dict(self.policy_net.state_dict())
             self.num_episode += 1
+            if self.prioritized:
+                self.memory.beta = min(1.0, PRIORITY_BETA_START +
+                                       (1 - PRIORITY_BETA_START) * self.num_episode / PRIORITY_BETA_EPISODES)
             if self.num_episode % 20 == 0:
                 torch.save(self.policy_net.state_dict(),
                            f'/Users/greg/Data/AI/jass/policy_net_v1/policy_net_v2_ep_{self.num_episode // 20:04d}.ckpt')
@@ -95,21 +115,18 @@ class DQNAgent(Agent):
     def optimize_model(self):
         if len(self.memory) < BATCH_SIZE:
             return
+        start = time.perf_counter()
         batch = self.memory.sample(BATCH_SIZE)
 
         # Compute a mask of non-final states and concatenate the batch elements
         # (a final state would've been the one after which simulation ended)
-        non_final_mask = torch.tensor([not sars.is_final for sars in batch], device=device, dtype=torch.bool)
-        non_final_next_states = torch.stack([sars.next_state.tensor for sars in batch if not sars.is_final])
-
-        state_batch = torch.stack([sars.state.tensor for sars in batch])
-        action_batch = torch.stack([sars.action.tensor for sars in batch])
-        reward_batch = torch.tensor([sars.reward for sars in batch])
+        non_final_mask = ~batch.dones
+        non_final_next_states = batch.next_states[non_final_mask]
 
         # Compute Q(s_t, a) - the model computes Q(s_t), then we select the
         # columns of actions taken. These are the actions which would've been taken
         # for each batch state according to policy_net
-        state_action_values = self.policy_net(state_batch)[action_batch.bool()]  # .gather(1, action_batch)
+        state_action_values = self.policy_net(batch.states).gather(1, batch.actions.unsqueeze(1)).squeeze(1)
 
         # Compute V(s_{t+1}) for all next states.
         # Expected values of actions for non_final_next_states are computed based
@@ -119,10 +136,13 @@ class DQNAgent(Agent):
         next_state_values = torch.zeros(BATCH_SIZE, device=device)
         next_state_values[non_final_mask] = self.target_net(non_final_next_states).max(1)[0].detach()
         # Compute the expected Q values
-        expected_state_action_values = (next_state_values * GAMMA) + reward_batch.float()
+        expected_state_action_values = (next_state_values * GAMMA) + batch.rewards
 
-        # Compute Huber loss
-        loss = F.smooth_l1_loss(state_action_values, expected_state_action_values)
+        # Compute Huber loss, weighted to correct the bias of prioritized sampling (weights are 1 otherwise)
+        losses = F.smooth_l1_loss(state_action_values, expected_state_action_values, reduction='none')
+        loss = (losses * batch.weights).mean()
+        if self.prioritized:
+            self.memory.update_priorities(batch.indices, expected_state_action_values - state_action_values)
 
         # Optimize the model
         self.optimizer.zero_grad()
@@ -131,6 +151,12 @@ class DQNAgent(Agent):
             param.grad.data.clamp_(-1, 1)
         self.optimizer.step()
 
+        if self.metrics is not None:
+            # an agent which never acted (e.g. the one of an actor-learner `Learner`) does not explore
+            acted = isinstance(self.policy, EpsilonGreedyPolicy) and self.policy.steps_done > 0
+            epsilon = self.policy.epsilon if acted else None
+            self.metrics.step(time.perf_counter() - start, len(self.memory), loss.item(), epsilon)
+
 #
 # num_episodes = 50
 # for i_episode in range(num_episodes):
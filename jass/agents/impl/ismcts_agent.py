@@ -0,0 +1,259 @@
+import math
+import random
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from jass.agents.action import ChooseTrumpAction, PlayCardAction
+from jass.agents.agent import Agent
+from jass.agents.state import ChooseTrumpState, PlayCardState
+from jass.logic import bitboard as bb
+from jass.logic.card import Card, Suit
+from jass.logic.round_state import RoundState, TEAM_OF_SEAT
+from jass.logic.sampler import DealSampler
+
+# Seats are relative to the agent: it sits on seat 0, its partner on seat 2.
+
+EXPLORATION = 0.7
+MAX_POINTS = 257  # points of a round with the match bonus, to scale the rewards
+DEALS_PER_BATCH = 64  # deals sampled at once
+
+
+class SearchStats:
+    """Latency of each decision and number of search iterations, to tune the budget of the agent"""
+
+    def __init__(self):
+        self.latencies: List[float] = []  # seconds
+        self.iterations = 0
+
+    def add(self, latency: float, iterations: int) -> None:
+        self.latencies.append(latency)
+        self.iterations += iterations
+
+    def percentile(self, q: float) -> float:
+        """Latency (seconds) below which `q` percent of the decisions were taken"""
+        if not self.latencies:
+            return math.nan
+        latencies = sorted(self.latencies)
+        return latencies[min(len(latencies) - 1, max(0, math.ceil(q / 100 * len(latencies)) - 1))]
+
+    @property
+    def iterations_per_second(self) -> float:
+        total = sum(self.latencies)
+        return self.iterations / total if total > 0 else math.nan
+
+    def __str__(self):
+        return f'{len(self.latencies)} decisions, latency p50 {1e3 * self.percentile(50):.1f} ms, ' \
+               f'p90 {1e3 * self.percentile(90):.1f} ms, p99 {1e3 * self.percentile(99):.1f} ms, ' \
+               f'{self.iterations_per_second:.0f} iterations/s'
+
+
+class ISMCTSAgent(Agent):
+    """
+    Single observer information set Monte Carlo tree search.
+
+    Every iteration deals the unseen cards to the other players consistently with what the agent saw (cards played,
+    suits a player showed it does not have), then walks down one tree shared by all these deals, only considering the
+    moves legal in the current deal, and finishes the round with random moves.
+
+    The search stops after `iterations` iterations or `time_budget` seconds, whichever comes first. With `workers` > 1,
+    that many independent searches run in a pool of threads or processes (`executor`) and their root visits are
+    summed (root parallelization). Threads share the GIL, so only processes actually search faster.
+    """
+
+    def __init__(self, iterations: Optional[int] = 1000, time_budget: Optional[float] = None, workers: int = 1,
+                 executor: str = 'process', exploration: float = EXPLORATION, seed: Optional[int] = None):
+        assert iterations is not None or time_budget is not None, 'need a budget: iterations and/or time_budget'
+        assert executor in ('thread', 'process')
+        self.iterations = iterations
+        self.time_budget = time_budget
+        self.workers = workers
+        self.executor = executor
+        self.exploration = exploration
+        self.stats = SearchStats()
+        self.__rng = random.Random(seed)
+        self.__pool: Optional[Executor] = None
+
+    def play_card(self, state: PlayCardState) -> PlayCardAction:
+        if len(state.playable_cards) == 1:
+            return PlayCardAction(card_to_play=state.playable_cards[0])
+
+        start = time.perf_counter()
+        root, sampler = observe(state)
+        searches = self.__run(_search, root, sampler, self.exploration)
+        visits: Dict[int, int] = {}
+        for search_visits, _ in searches:
+            for card, n in search_visits.items():
+                visits[card] = visits.get(card, 0) + n
+        card = max(visits, key=visits.get)
+        self.stats.add(time.perf_counter() - start, sum(n for _, n in searches))
+        return PlayCardAction(card_to_play=Card[card])
+
+    def choose_trump(self, state: ChooseTrumpState) -> ChooseTrumpAction:
+        start = time.perf_counter()
+        hand = bb.mask_of(card.order_value for card in state.hand)
+        leader = 0 if state.can_chibre else 2  # the player asked first leads, even if the partner chose the trump
+        searches = self.__run(_evaluate_trumps, hand, leader)
+        totals = [0.] * bb.N_SUITS
+        for values, _ in searches:
+            for suit, value in enumerate(values):
+                totals[suit] += value
+        suit = max(range(bb.N_SUITS), key=totals.__getitem__)
+        self.stats.add(time.perf_counter() - start, sum(n for _, n in searches))
+        return ChooseTrumpAction(suit=Suit[suit])
+
+    def close(self) -> None:
+        if self.__pool is not None:
+            self.__pool.shutdown()
+            self.__pool = None
+
+    def __run(self, fn, *args) -> list:
+        """Results of `fn(*args, iterations, time_budget, seed)` for each worker"""
+        seeds = [self.__rng.getrandbits(32) for _ in range(self.workers)]
+        budget = (self.iterations, self.time_budget)
+        if self.workers <= 1:
+            return [fn(*args, *budget, seeds[0])]
+        if self.__pool is None:
+            pool_type = ProcessPoolExecutor if self.executor == 'process' else ThreadPoolExecutor
+            self.__pool = pool_type(max_workers=self.workers)
+        futures = [self.__pool.submit(fn, *args, *budget, seed) for seed in seeds]
+        return [future.result() for future in futures]
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state[f'_{ISMCTSAgent.__name__}__pool'] = None
+        return state
+
+    def __del__(self):
+        self.close()
+
+
+###############
+# OBSERVATION #
+###############
+
+def observe(state: PlayCardState) -> Tuple[RoundState, DealSampler]:
+    """
+    Replays what the agent saw of the round. Returns the round state (seat 0 is the agent, the other hands are empty)
+    and a sampler of the hands of the other players.
+    """
+    trump = state.trump.order_value
+    hand = bb.mask_of(card.order_value for card in state.hand_cards)
+    tricks = [[card.order_value for card in trick] for trick in state.round_history]  # by seat
+    table = [card.order_value for card in state.trick_history]  # in playing order, the agent plays next
+
+    hands = [0, 0, 0, 0]
+    for trick in tricks:
+        for seat, card in enumerate(trick):
+            hands[seat] |= bb.bit(card)
+    for position, card in enumerate(table):
+        hands[(position - len(table)) % 4] |= bb.bit(card)
+    hands[0] |= hand
+
+    observed = RoundState(hands=hands, trump=trump, chooser=state.trump_chooser)
+    sampler = DealSampler(hand=hands[0], trump=trump)
+    for trick in tricks:
+        leader = observed.to_play
+        for i in range(4):
+            seat = (leader + i) % 4
+            sampler.play(seat, trick[seat])
+            observed.apply(trick[seat])
+    for card in table:
+        sampler.play(observed.to_play, card)
+        observed.apply(card)
+    return observed, sampler
+
+
+##########
+# SEARCH #
+##########
+
+class _Node:
+    __slots__ = ('children', 'visits', 'reward', 'available', 'team')
+
+    def __init__(self, team: int):
+        self.children: Dict[int, '_Node'] = {}
+        self.visits = 0
+        self.reward = 0.  # sum of the rewards of `team`, the team which played the move leading here
+        self.available = 1  # number of iterations in which the move leading here was legal
+        self.team = team
+
+
+def _search(observed: RoundState, sampler: DealSampler, exploration: float, iterations: Optional[int],
+            time_budget: Optional[float], seed: int) -> Tuple[Dict[int, int], int]:
+    """Searches from the point of view of seat 0, returns the visits of each of its moves and the iterations done"""
+    rng = random.Random(seed)
+    deal_rng = np.random.default_rng(seed)
+    root = _Node(team=TEAM_OF_SEAT[observed.to_play])
+    base = observed.scores[0] - observed.scores[1]
+    deadline = None if time_budget is None else time.perf_counter() + time_budget
+
+    deals: List[List[int]] = []
+    n = 0
+    while (iterations is None or n < iterations) and (deadline is None or time.perf_counter() < deadline):
+        n += 1
+        if not deals:
+            batch_size = DEALS_PER_BATCH if iterations is None else min(DEALS_PER_BATCH, iterations - n + 1)
+            deals = sampler.sample(batch_size, deal_rng).tolist()
+        state = observed.clone()
+        state.hands[1:] = deals.pop()[1:]
+        node, path = root, [root]
+
+        # selection and expansion
+        while not state.is_over:
+            legal = state.legal_cards()
+            untried = [card for card in legal if card not in node.children]
+            if untried:
+                card = rng.choice(untried)
+                child = node.children[card] = _Node(team=TEAM_OF_SEAT[state.to_play])
+                state.apply(card)
+                path.append(child)
+                break
+            best_card, best_score = -1, -math.inf
+            for card in legal:
+                child = node.children[card]
+                score = child.reward / child.visits + exploration * math.sqrt(math.log(child.available) / child.visits)
+                child.available += 1
+                if score > best_score:
+                    best_card, best_score = card, score
+            node = node.children[best_card]
+            state.apply(best_card)
+            path.append(node)
+
+        # random playout
+        while not state.is_over:
+            state.apply(rng.choice(state.legal_cards()))
+
+        # back propagation
+        value = (state.scores[0] - state.scores[1] - base) / MAX_POINTS
+        for node in path:
+            node.visits += 1
+            node.reward += value if node.team == 0 else -value
+
+    return {card: child.visits for card, child in root.children.items()}, n
+
+
+def _evaluate_trumps(hand: int, leader: int, iterations: Optional[int], time_budget: Optional[float],
+                     seed: int) -> Tuple[List[float], int]:
+    """
+    Flat Monte Carlo: mean points difference of the agent team when playing each trump suit randomly on random deals
+    """
+    rng = random.Random(seed)
+    unseen = bb.indices_of(bb.FULL_MASK & ~hand)
+    deadline = None if time_budget is None else time.perf_counter() + time_budget
+    totals = [0.] * bb.N_SUITS
+    counts = [0] * bb.N_SUITS
+    n = 0
+    while (iterations is None or n < iterations) and (deadline is None or time.perf_counter() < deadline):
+        trump = n % bb.N_SUITS
+        n += 1
+        rng.shuffle(unseen)
+        hands = [hand] + [bb.mask_of(unseen[9 * i:9 * (i + 1)]) for i in range(3)]
+        state = RoundState(hands=hands, trump=trump, chooser=leader)
+        while not state.is_over:
+            state.apply(rng.choice(state.legal_cards()))
+        totals[trump] += state.scores[0] - state.scores[1]
+        counts[trump] += 1
+    return [total / max(count, 1) for total, count in zip(totals, counts)], n
@@ -1,8 +1,7 @@
 from abc import ABCMeta, abstractmethod
-from typing import List
+from typing import List, Optional, Sequence
 
 import torch
-from torch.nn import functional as F
 from werkzeug.utils import cached_property
 
 from jass.agents.action import ChooseTrumpAction, PlayCardAction, Action
@@ -14,6 +13,7 @@ _tb = TensorBuilder
 
 class State(metaclass=ABCMeta):
     tensor_size: int = NotImplemented
+    max_tensor_indices: int = NotImplemented  # maximum number of ones in `tensor`
     action_type: Action = NotImplemented
 
     @property
@@ -26,13 +26,49 @@ class State(metaclass=ABCMeta):
     def tensor(self) -> torch.Tensor:
         raise NotImplementedError
 
+    @property
+    def tensor_indices(self) -> List[int]:
+        """Positions of the ones of `tensor`"""
+        raise NotImplementedError
+
+    @property
+    def action_indices(self) -> List[int]:
+        """Positions of the legal actions in `action_tensor_mask`"""
+        return list(range(self.action_type.tensor_size))
+
     @property
     def action_tensor_mask(self) -> torch.Tensor:
         return torch.ones(self.action_type.tensor_size, dtype=torch.bool)
 
+    @classmethod
+    def encode_batch(cls, states: Sequence['State'], out: Optional[torch.Tensor] = None) -> torch.Tensor:
+        """`tensor` of each state stacked in a (N, tensor_size) tensor, built with one indexing op"""
+        return _tb.indicator_batch([state.tensor_indices for state in states], cls.tensor_size, out=out)
+
+    @classmethod
+    def action_mask_batch(cls, states: Sequence['State']) -> torch.Tensor:
+        """`action_tensor_mask` of each state stacked in a (N, action tensor_size) tensor"""
+        masks = _tb.indicator_batch([state.action_indices for state in states], cls.action_type.tensor_size)
+        return masks.bool()
+
+
+# Layout of `PlayCardState.tensor`: trump (4), trump chooser (4), hand (36), cards on the table (3 x 36) and cards of
+# the previous tricks (4 x 7 x 36). The cards of the previous tricks, flattened in (trick, seat) order, fill the first
+# columns of the (4, 7) grid row after row: the card number i of the R tricks played goes to row i // R, column i % R.
+_TRUMP_OFFSET = 0
+_CHOOSER_OFFSET = 4
+_HAND_OFFSET = 8
+_TABLE_OFFSETS = tuple(44 + 36 * i for i in range(3))
+_HISTORY_OFFSET = 152
+_HISTORY_OFFSETS = tuple(
+    tuple(_HISTORY_OFFSET + 36 * (7 * (i // n_tricks) + i % n_tricks) for i in range(4 * n_tricks))
+    for n_tricks in range(8)
+)
+
 
 class PlayCardState(State):
     tensor_size = 4 + 4 + 36 * (1 + 3 + 28)
+    max_tensor_indices = 1 + 1 + 9 + 3 + 28
     action_type = PlayCardAction
 
     def __init__(self, trick_trump: Suit, trump_chooser_idx: int, player_hand: List[Card], playable_cards: List[Card],
@@ -52,24 +88,27 @@ class PlayCardState(State):
         return [PlayCardAction(card_to_play=card) for card in self.playable_cards]
 
     @cached_property
-    def tensor(self) -> torch.Tensor:
-        trump = _tb.one_hot(self.trump)  # size = (4)
-        trump_chooser = F.one_hot(torch.tensor(self.trump_chooser), num_classes=4)  # size = (4)
+    def tensor_indices(self) -> List[int]:
+        """Positions of the ones of `tensor`"""
+        indices = [_TRUMP_OFFSET + self.trump.order_value, _CHOOSER_OFFSET + self.trump_chooser]
+        indices += [_HAND_OFFSET + c.order_value for c in self.hand_cards]
+        indices += [offset + c.order_value for offset, c in zip(_TABLE_OFFSETS, self.trick_history)]
+        history_offsets = _HISTORY_OFFSETS[len(self.round_history)]
+        indices += [offset + c.order_value
+                    for offset, c in zip(history_offsets, [c for trick in self.round_history for c in trick])]
+        return indices
 
-        hand = _tb.bow(*self.hand_cards)  # size = (36)
-
-        table_cards = _tb.empty(3 - len(self.trick_history), obj_type=Card)
-        if len(self.trick_history) > 0:
-            cards_played = _tb.one_hot(*self.trick_history)
-            table_cards = torch.cat([cards_played, table_cards])  # size = (3, 36)
+    @cached_property
+    def tensor(self) -> torch.Tensor:
+        return _tb.indicator(self.tensor_indices, self.tensor_size)
 
-        trick_cards = _tb.empty(4, 7 - len(self.round_history), obj_type=Card)
-        if len(self.round_history) > 0:
-            trick_played = _tb.one_hot(*[c for trick in self.round_history for c in trick]).view(4, -1, len(Card))
-            trick_cards = torch.cat([trick_played, trick_cards], dim=1)  # size = (4, 8, 36)
+    def write_tensor(self, out: torch.Tensor) -> torch.Tensor:
+        """Writes `tensor` into `out` (a vector of `tensor_size` elements) without allocating it"""
+        return _tb.indicator(self.tensor_indices, self.tensor_size, out=out)
 
-        vectors = [trump, trump_chooser, hand, table_cards, trick_cards]
-        return torch.cat([v.view(-1) for v in vectors])
+    @cached_property
+    def action_indices(self) -> List[int]:
+        return [c.order_value for c in self.playable_cards]
 
     @cached_property
     def action_tensor_mask(self) -> torch.Tensor:
@@ -78,6 +117,7 @@ class PlayCardState(State):
 
 class ChooseTrumpState(State):
     tensor_size = 36 + 1
+    max_tensor_indices = 9 + 1
     action_type = ChooseTrumpAction
 
     def __init__(self, hand: List[Card], can_chibre: bool):
@@ -92,11 +132,25 @@ class ChooseTrumpState(State):
             actions.append(ChooseTrumpAction(suit=None))
         return actions
 
+    @cached_property
+    def tensor_indices(self) -> List[int]:
+        """Positions of the ones of `tensor`"""
+        indices = [c.order_value for c in self.hand]
+        if self.can_chibre:
+            indices.append(len(Card))
+        return indices
+
     @cached_property
     def tensor(self) -> torch.Tensor:
-        hand = _tb.bow(*self.hand)  # size = (36)
-        can_chibre = torch.tensor([self.can_chibre], dtype=torch.long)  # size = (1)
-        return torch.cat((hand, can_chibre))
+        return _tb.indicator(self.tensor_indices, self.tensor_size)
+
+    def write_tensor(self, out: torch.Tensor) -> torch.Tensor:
+        """Writes `tensor` into `out` (a vector of `tensor_size` elements) without allocating it"""
+        return _tb.indicator(self.tensor_indices, self.tensor_size, out=out)
+
+    @cached_property
+    def action_indices(self) -> List[int]:
+        return list(range(5 if self.can_chibre else 4))
 
     @cached_property
     def action_tensor_mask(self) -> torch.Tensor:
@@ -1,32 +1,57 @@
-from typing import Union, Type
+import itertools
+from typing import Optional, Sequence, Type, Union
 
 import torch
-from torch.nn import functional as F
 
 from jass.logic.card import Suit, Card
 
 
 class TensorBuilder:
+    """
+    Encodings of suits and cards built from their order values with a single indexing operation. The `out` variants
+    write into a buffer given by the caller (zeroed first) instead of allocating a new tensor.
+    """
+
+    @classmethod
+    def bow(cls, *objects: Union[Suit, Card], out: Optional[torch.Tensor] = None) -> torch.Tensor:
+        vector = cls.__zeros(out, len(type(objects[0])))
+        vector.index_put_((cls.indices(objects),), torch.ones((), dtype=vector.dtype), accumulate=True)
+        return vector
+
     @classmethod
-    def bow(cls, *objects: Union[Suit, Card]) -> torch.Tensor:
-        obj_type = type(objects[0])
-        vector = cls.empty(obj_type=obj_type)
-        for o in objects:
-            assert obj_type == type(o), \
-                f'cannot create a vector with objects of different type ({obj_type} != {type(o)})'
-            vector[o.order_value] += 1
+    def one_hot(cls, *objects: Union[Suit, Card], out: Optional[torch.Tensor] = None) -> torch.Tensor:
+        matrix = cls.__zeros(out, len(objects), len(type(objects[0])))
+        matrix.scatter_(1, cls.indices(objects).unsqueeze(1), 1)
+        return matrix
+
+    @classmethod
+    def indicator(cls, indices: Sequence[int], size: int, out: Optional[torch.Tensor] = None) -> torch.Tensor:
+        """Vector of `size` zeros with ones at `indices`"""
+        vector = cls.__zeros(out, size)
+        vector[torch.as_tensor(indices, dtype=torch.long)] = 1
         return vector
 
     @classmethod
-    def one_hot(cls, *objects: Union[Suit, Card]) -> torch.Tensor:
-        obj_type = type(objects[0])
-        obj_values = []
-        for o in objects:
-            assert obj_type == type(o), \
-                f'cannot create a vector with objects of different type ({obj_type} != {type(o)})'
-            obj_values.append(o.order_value)
-        return F.one_hot(torch.tensor(obj_values), num_classes=len(obj_type))
+    def indicator_batch(cls, indices: Sequence[Sequence[int]], size: int,
+                        out: Optional[torch.Tensor] = None) -> torch.Tensor:
+        """(N, `size`) matrix of zeros with ones at `indices[i]` in its row i"""
+        matrix = cls.__zeros(out, len(indices), size)
+        lengths = torch.tensor([len(row) for row in indices], dtype=torch.long)
+        rows = torch.repeat_interleave(torch.arange(len(indices)), lengths)
+        matrix[rows, torch.tensor(list(itertools.chain.from_iterable(indices)), dtype=torch.long)] = 1
+        return matrix
 
     @classmethod
     def empty(cls, *size: int, obj_type: Type[Union[Suit, Card]]) -> torch.Tensor:
         return torch.zeros(*size, len(obj_type), dtype=torch.long)
+
+    @staticmethod
+    def indices(objects: Sequence[Union[Suit, Card]]) -> torch.Tensor:
+        return torch.tensor([o.order_value for o in objects], dtype=torch.long)
+
+    @staticmethod
+    def __zeros(out: Optional[torch.Tensor], *size: int) -> torch.Tensor:
+        if out is None:
+            return torch.zeros(*size, dtype=torch.long)
+        assert out.shape == size, f'out has shape {tuple(out.shape)} instead of {size}'
+        return out.zero_()
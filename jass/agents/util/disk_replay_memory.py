@@ -0,0 +1,218 @@
+import os
+import queue
+import threading
+from typing import Optional, Type, Union
+
+import numpy as np
+import torch
+
+from jass.agents.state import State
+from jass.agents.util.replay_memory import SARS, Transitions, decode_states, transition_dtype, write_transition
+
+# A replay file is a header followed by `capacity` transition records (see `transition_dtype`), overwritten in a ring.
+# The header records the layout and how far the ring was written, so that a memory reopened on the file goes on where
+# it stopped.
+
+MAGIC = b'JASSRPL1'
+HEADER_DTYPE = np.dtype([
+    ('magic', 'S8'),
+    ('capacity', '<u8'),
+    ('position', '<u8'),
+    ('size', '<u8'),
+    ('tensor_size', '<u4'),
+    ('width', '<u4'),
+    ('n_actions', '<u4'),
+])
+HEADER_SIZE = 64
+
+PathLike = Union[str, os.PathLike]
+
+
+class DiskReplayMemory:
+    """
+    Replay memory of transitions between states of `state_type` stored in a memory mapped file, for capacities which
+    do not fit in RAM (tens of millions of transitions). The last `hot_size` transitions pushed are kept in RAM and
+    written to the file a block at a time. The file is created (sparse) for `capacity` transitions if it does not
+    exist, otherwise the memory goes on with the transitions it holds.
+
+    With `prefetch` > 0, a background thread samples batches ahead of `sample`, reading the file while the caller
+    trains on the previous batch. Prefetched batches are drawn from the memory as it was a few pushes before.
+
+        with DiskReplayMemory('replay.bin', 50_000_000, PlayCardState) as memory:
+            agent = DQNAgent(memory=memory)
+            ...
+    """
+
+    def __init__(self, path: PathLike, capacity: int, state_type: Type[State], hot_size: int = 65536,
+                 prefetch: int = 2, seed: Optional[int] = None):
+        self.path = path
+        self.capacity = capacity
+        self.state_type = state_type
+        self.dtype = transition_dtype(state_type)
+        layout = (capacity, state_type.tensor_size, state_type.max_tensor_indices, state_type.action_type.tensor_size)
+
+        if not os.path.exists(path):
+            with open(path, 'wb') as f:
+                header = np.zeros(1, dtype=HEADER_DTYPE)
+                header[0] = (MAGIC, capacity, 0, 0) + layout[1:]
+                f.write(header.tobytes().ljust(HEADER_SIZE, b'\0'))
+                f.truncate(HEADER_SIZE + capacity * self.dtype.itemsize)
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f'{path} is not a replay file')
+        self.__header = np.memmap(path, dtype=HEADER_DTYPE, mode='r+', shape=(1,))
+        header = self.__header[0]
+        if (int(header['capacity']), int(header['tensor_size']), int(header['width']),
+                int(header['n_actions'])) != layout:
+            raise ValueError(f'{path} holds transitions of another capacity or state type')
+        self.__records = np.memmap(path, dtype=self.dtype, mode='r+', offset=HEADER_SIZE, shape=(capacity,))
+
+        # transitions pushed since the last flush, to be written from the ring position `__flushed` on
+        self.__hot = np.zeros(min(hot_size, capacity), dtype=self.dtype)
+        self.__n_hot = 0
+        self.__flushed = int(header['position'])
+        self.__size = int(header['size'])
+        self.__n_flushes = 0
+
+        self.__lock = threading.Lock()
+        self.__rng = np.random.default_rng(seed)
+        self.__prefetch = prefetch
+        self.__batches: Optional[queue.Queue] = None
+        self.__batch_size = None
+        self.__thread: Optional[threading.Thread] = None
+        self.__stop = threading.Event()
+
+    @property
+    def position(self) -> int:
+        """Ring position of the next transition pushed"""
+        return (self.__flushed + self.__n_hot) % self.capacity
+
+    def push(self, sars: SARS) -> None:
+        """Saves a transition, overwriting the oldest one when the memory is full"""
+        with self.__lock:
+            write_transition(self.__hot[self.__n_hot], sars)
+            self.__n_hot += 1
+            self.__size = min(self.__size + 1, self.capacity)
+            if self.__n_hot == len(self.__hot):
+                self.__flush()
+
+    def push_records(self, records: np.ndarray) -> None:
+        """Saves transitions already encoded (see `encode_transitions`)"""
+        with self.__lock:
+            start = 0
+            while start < len(records):
+                n = min(len(records) - start, len(self.__hot) - self.__n_hot)
+                self.__hot[self.__n_hot:self.__n_hot + n] = records[start:start + n]
+                self.__n_hot += n
+                self.__size = min(self.__size + n, self.capacity)
+                start += n
+                if self.__n_hot == len(self.__hot):
+                    self.__flush()
+
+    def sample(self, batch_size: int) -> Transitions:
+        """`batch_size` transitions drawn uniformly (with replacement)"""
+        if not self.__prefetch:
+            return self.__sample(batch_size)
+        if self.__batch_size != batch_size:
+            self.__stop_prefetching()
+            self.__start_prefetching(batch_size)
+        batch = self.__batches.get()
+        if isinstance(batch, Exception):  # raised by the prefetching thread, which stopped
+            self.__stop_prefetching()
+            raise batch
+        return batch
+
+    def flush(self) -> None:
+        """Writes the transitions kept in RAM to the file"""
+        with self.__lock:
+            self.__flush()
+
+    def close(self) -> None:
+        self.__stop_prefetching()
+        self.flush()
+
+    def __len__(self) -> int:
+        return self.__size
+
+    def __enter__(self) -> 'DiskReplayMemory':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __flush(self) -> None:
+        """Writes the hot records to the ring, the lock being held"""
+        start, n = self.__flushed, self.__n_hot
+        first = min(n, self.capacity - start)
+        self.__records[start:start + first] = self.__hot[:first]
+        self.__records[:n - first] = self.__hot[first:n]
+        self.__records.flush()
+        self.__flushed = (start + n) % self.capacity
+        self.__n_hot = 0
+        self.__n_flushes += 1
+        self.__header['position'] = self.__flushed
+        self.__header['size'] = self.__size
+        self.__header.flush()
+
+    def __sample(self, batch_size: int) -> Transitions:
+        while True:
+            with self.__lock:
+                indices = self.__rng.integers(self.__size, size=batch_size)
+                # transitions not flushed yet are read from RAM, their records in the file being older ones
+                offsets = (indices - self.__flushed) % self.capacity
+                hot = offsets < self.__n_hot
+                hot_records = self.__hot[offsets[hot]]
+                n_flushes = self.__n_flushes
+            records = self.__records[indices]  # read without blocking the pushes...
+            with self.__lock:
+                if self.__n_flushes == n_flushes:  # ...unless the records were overwritten meanwhile
+                    break
+        records[hot] = hot_records
+
+        def field(name: str) -> torch.Tensor:
+            return torch.from_numpy(np.ascontiguousarray(records[name]))
+
+        tensor_size = self.state_type.tensor_size
+        return Transitions(
+            states=decode_states(field('state'), tensor_size),
+            actions=field('action').long(),
+            rewards=field('reward').float(),
+            next_states=decode_states(field('next_state'), tensor_size),
+            dones=field('done').bool(),
+            next_masks=field('next_mask').bool(),
+            indices=torch.from_numpy(indices),
+            weights=torch.ones(batch_size),
+        )
+
+    ###############
+    # PREFETCHING #
+    ###############
+
+    def __start_prefetching(self, batch_size: int) -> None:
+        self.__batch_size = batch_size
+        self.__batches = queue.Queue(maxsize=self.__prefetch)
+        self.__stop.clear()
+        self.__thread = threading.Thread(target=self.__prefetch_loop, args=(batch_size, self.__batches), daemon=True)
+        self.__thread.start()
+
+    def __prefetch_loop(self, batch_size: int, batches: queue.Queue) -> None:
+        failed = False
+        while not self.__stop.is_set() and not failed:
+            try:
+                batch = self.__sample(batch_size)
+            except Exception as e:  # e.g. an empty memory, raised again by `sample`
+                batch, failed = e, True
+            while not self.__stop.is_set():
+                try:
+                    batches.put(batch, timeout=0.1)
+                    break
+                except queue.Full:
+                    pass
+
+    def __stop_prefetching(self) -> None:
+        if self.__thread is None:
+            return
+        self.__stop.set()
+        self.__thread.join()
+        self.__thread = None
+        self.__batch_size = None
@@ -0,0 +1,171 @@
+import multiprocessing
+import queue
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional, Type
+
+import torch
+from torch import nn
+
+from jass.agents.action import Action
+from jass.agents.state import State
+from jass.agents.tensor_builder import TensorBuilder
+from jass.agents.util.policy import Policy
+from jass.metrics import Histogram, Registry, exponential_buckets
+
+_tb = TensorBuilder
+
+POLL_SECONDS = 0.1  # how often a waiting policy checks that the broker is still running
+
+
+class _Request(NamedTuple):
+    client_id: int
+    tensor_indices: List[int]
+    action_indices: List[int]
+    submitted: float  # time.monotonic(), the same clock in every process
+
+
+class InferenceBroker:
+    """
+    Serves the decisions of one model to many games played at the same time: the policies it hands out (one per agent)
+    send their states to the broker, which runs the model on batches of up to `max_batch_size` states, waiting at most
+    `max_wait_us` microseconds after the first one for the others. The best legal action of each state is sent back.
+
+    The policies can be used by threads or, with `processes=True`, by other processes (created after the policies and
+    given them as arguments). The broker itself runs in a thread of the process which created it.
+
+        with InferenceBroker(policy_net, PlayCardState, processes=True) as broker:
+            workers = [Process(target=play_games, args=([broker.policy() for _ in range(4)],)) for _ in range(8)]
+            ...
+        print(broker.latencies, broker.batch_sizes)
+    """
+
+    def __init__(self, model: nn.Module, state_type: Type[State], max_batch_size: int = 256,
+                 max_wait_us: float = 200, processes: bool = False, mp_context: Optional[str] = None,
+                 registry: Optional[Registry] = None):
+        self.model = model
+        self.state_type = state_type
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_us / 1e6
+        context = multiprocessing.get_context(mp_context) if processes else None
+        self.__queue_type = context.Queue if processes else queue.Queue
+        self.__running = context.Event() if processes else threading.Event()  # seen by the policies
+        self.__requests = self.__queue_type()
+        self.__responses: Dict[int, queue.Queue] = {}
+
+        self.batch_sizes = Histogram('jass_inference_batch_size',
+                                     exponential_buckets(1, 2, max_batch_size.bit_length()),
+                                     help='states per forward pass')
+        self.latencies = Histogram('jass_inference_latency_us', exponential_buckets(10, 2, 16),
+                                   help='microseconds from the submission of a state to its decision')
+        self.forward_times = Histogram('jass_inference_forward_us', exponential_buckets(10, 2, 16),
+                                       help='microseconds per forward pass')
+        if registry is not None:  # e.g. to serve them with a `MetricsServer`
+            for histogram in (self.batch_sizes, self.latencies, self.forward_times):
+                registry.register(histogram)
+        self.n_requests = 0
+        self.__started: Optional[float] = None
+        self.__thread: Optional[threading.Thread] = None
+        self.__stop = threading.Event()
+
+    def policy(self) -> 'BrokerPolicy':
+        """Policy of one agent, whose decisions are made by the broker"""
+        client_id = len(self.__responses)
+        self.__responses[client_id] = self.__queue_type()
+        return BrokerPolicy(client_id, self.__requests, self.__responses[client_id], self.__running)
+
+    @property
+    def throughput(self) -> float:
+        """Decisions per second since the start"""
+        if self.__started is None:
+            return 0.0
+        return self.n_requests / (time.monotonic() - self.__started)
+
+    def start(self) -> 'InferenceBroker':
+        self.__started = time.monotonic()
+        self.__stop.clear()
+        self.__running.set()
+        self.__thread = threading.Thread(target=self.__serve, daemon=True)
+        self.__thread.start()
+        return self
+
+    def close(self) -> None:
+        if self.__thread is not None:
+            self.__stop.set()
+            self.__thread.join()
+            self.__thread = None
+
+    def __enter__(self) -> 'InferenceBroker':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __serve(self) -> None:
+        requests = self.__requests
+        try:
+            while not self.__stop.is_set():
+                try:
+                    batch = [requests.get(timeout=0.05)]
+                except queue.Empty:
+                    continue
+                deadline = time.monotonic() + self.max_wait
+                while len(batch) < self.max_batch_size:
+                    timeout = deadline - time.monotonic()
+                    try:
+                        batch.append(requests.get(timeout=timeout) if timeout > 0 else requests.get_nowait())
+                    except queue.Empty:
+                        break
+                self.__run(batch)
+        finally:  # the policies waiting for a decision give up
+            self.__running.clear()
+
+    def __run(self, batch: List[_Request]) -> None:
+        start = time.monotonic()
+        try:
+            states = _tb.indicator_batch([r.tensor_indices for r in batch], self.state_type.tensor_size)
+            masks = _tb.indicator_batch([r.action_indices for r in batch],
+                                        self.state_type.action_type.tensor_size).bool()
+            with torch.no_grad():
+                values = self.model(states)
+            choices = values.masked_fill(~masks, float('-inf')).argmax(dim=1).tolist()
+        except Exception as e:  # raised by the policies of the batch, the broker serves the next ones
+            error = RuntimeError(f'inference failed: {e!r}')
+            for request in batch:
+                self.__responses[request.client_id].put(error)
+            return
+        end = time.monotonic()
+
+        for request, choice in zip(batch, choices):
+            self.__responses[request.client_id].put(choice)
+            self.latencies.observe((end - request.submitted) * 1e6)
+        self.forward_times.observe((end - start) * 1e6)
+        self.batch_sizes.observe(len(batch))
+        self.n_requests += len(batch)
+
+
+class BrokerPolicy(Policy):
+    """
+    Policy sending its states to an `InferenceBroker` and waiting for its decisions, see `InferenceBroker.policy`.
+    Raises a RuntimeError if the model failed on its state or if the broker is not running.
+    """
+
+    def __init__(self, client_id: int, requests: queue.Queue, responses: queue.Queue, running):
+        self.client_id = client_id
+        self.__requests = requests
+        self.__responses = responses
+        self.__running = running
+
+    def __call__(self, state: State) -> Action:
+        action_indices = state.action_indices
+        self.__requests.put(_Request(self.client_id, state.tensor_indices, action_indices, time.monotonic()))
+        while True:
+            try:
+                choice = self.__responses.get(timeout=POLL_SECONDS)
+                break
+            except queue.Empty:
+                if not self.__running.is_set():
+                    raise RuntimeError('the inference broker is not running')
+        if isinstance(choice, Exception):
+            raise choice
+        return state.actions[action_indices.index(choice)]
@@ -20,9 +20,13 @@ class EpsilonGreedyPolicy(Policy):
         self.steps_done = 0
         self.original_policy = original_policy
 
+    @property
+    def epsilon(self) -> float:
+        """Probability of the next action to be random"""
+        return self.eps_end + (self.eps_start - self.eps_end) * math.exp(-1. * self.steps_done / self.eps_decay)
+
     def __call__(self, state: State) -> Action:
-        eps_threshold = self.eps_end + (self.eps_start - self.eps_end) \
-                        * math.exp(-1. * self.steps_done / self.eps_decay)
+        eps_threshold = self.epsilon
         self.steps_done += 1
         if random.random() > eps_threshold:
             return self.original_policy(state)
@@ -1,8 +1,12 @@
 import random
-from typing import List
+from typing import List, NamedTuple, Optional, Sequence, Type
+
+import numpy as np
+import torch
 
 from jass.agents.action import Action
 from jass.agents.state import State
+from jass.agents.util.sum_tree import SumTree
 
 
 class SARS:
@@ -35,3 +39,195 @@ class ReplayMemory:
 
     def __len__(self):
         return len(self.memory)
+
+
+class Transitions(NamedTuple):
+    """Batch of transitions, one row per transition"""
+    states: torch.Tensor  # (N, tensor_size) uint8
+    actions: torch.Tensor  # (N,) long, `index` of the actions
+    rewards: torch.Tensor  # (N,) float
+    next_states: torch.Tensor  # (N, tensor_size) uint8, zeros for the final transitions
+    dones: torch.Tensor  # (N,) bool, whether the transition is final
+    next_masks: torch.Tensor  # (N, action tensor_size) bool, legal actions of the next states
+    indices: torch.Tensor  # (N,) long, positions of the transitions in the memory
+    weights: torch.Tensor  # (N,) float, importance sampling weights of the transitions in the loss
+
+
+def write_state(row: torch.Tensor, state: State) -> None:
+    """Stores `state` in `row` (of `max_tensor_indices` int16) as the positions of the ones of its tensor"""
+    indices = state.tensor_indices
+    row[:len(indices)] = torch.as_tensor(indices, dtype=torch.int16)
+    row[len(indices):] = state.tensor_size
+
+
+def decode_states(rows: torch.Tensor, tensor_size: int) -> torch.Tensor:
+    """(N, tensor_size) uint8 tensors of the states stored in `rows`, the padding going to an extra column dropped"""
+    tensors = torch.zeros(len(rows), tensor_size + 1, dtype=torch.uint8)
+    tensors.scatter_(1, rows.long(), 1)
+    return tensors[:, :-1]
+
+
+# Transitions as fixed width records, e.g. to store them in a file or to send them to another process:
+#
+#   state       max_tensor_indices x int16  positions of the ones of the state tensor, padded with tensor_size
+#   next_state  max_tensor_indices x int16  same for the next state, only padding for the final transitions
+#   action      int16                       `index` of the action
+#   reward      int16
+#   done        uint8                       1 if the transition is final
+#   next_mask   n_actions x uint8           1 for the legal actions of the next state
+
+def transition_dtype(state_type: Type[State]) -> np.dtype:
+    return np.dtype([
+        ('state', '<i2', (state_type.max_tensor_indices,)),
+        ('next_state', '<i2', (state_type.max_tensor_indices,)),
+        ('action', '<i2'),
+        ('reward', '<i2'),
+        ('done', 'u1'),
+        ('next_mask', 'u1', (state_type.action_type.tensor_size,)),
+    ])
+
+
+def write_transition(record: np.void, sars: SARS) -> None:
+    """Stores `sars` in `record` (of `transition_dtype`)"""
+    write_state(record['state'], sars.state)
+    record['action'] = sars.action.index
+    record['reward'] = sars.reward
+    record['done'] = sars.is_final
+    record['next_mask'] = 0
+    if sars.is_final:
+        record['next_state'] = sars.state.tensor_size
+    else:
+        write_state(record['next_state'], sars.next_state)
+        record['next_mask'][sars.next_state.action_indices] = 1
+
+
+def encode_transitions(transitions: Sequence[SARS], state_type: Type[State]) -> np.ndarray:
+    records = np.zeros(len(transitions), dtype=transition_dtype(state_type))
+    for record, sars in zip(records, transitions):
+        write_transition(record, sars)
+    return records
+
+
+class TensorReplayMemory:
+    """
+    Replay memory of transitions between states of `state_type`, stored in tensors allocated once for `capacity`
+    transitions and overwritten in a ring. A state is stored as the positions of the ones of its tensor (int16, padded
+    with `tensor_size`), i.e. tens of bytes instead of the thousand of its tensor, so the capacity can be in the
+    millions. Tensors of a batch are built back when it is sampled.
+    """
+
+    def __init__(self, capacity: int, state_type: Type[State]):
+        self.capacity = capacity
+        self.state_type = state_type
+        width = state_type.max_tensor_indices
+        self.__states = torch.full((capacity, width), state_type.tensor_size, dtype=torch.int16)
+        self.__next_states = torch.full((capacity, width), state_type.tensor_size, dtype=torch.int16)
+        self.__actions = torch.zeros(capacity, dtype=torch.int16)
+        self.__rewards = torch.zeros(capacity, dtype=torch.int16)
+        self.__dones = torch.zeros(capacity, dtype=torch.bool)
+        self.__next_masks = torch.zeros(capacity, state_type.action_type.tensor_size, dtype=torch.bool)
+        self.position = 0
+        self.__size = 0
+
+    def push(self, sars: SARS) -> None:
+        """Saves a transition, overwriting the oldest one when the memory is full"""
+        pos = self.position
+        write_state(self.__states[pos], sars.state)
+        self.__actions[pos] = sars.action.index
+        self.__rewards[pos] = sars.reward
+        self.__dones[pos] = sars.is_final
+        self.__next_masks[pos] = False
+        if sars.is_final:
+            self.__next_states[pos] = self.state_type.tensor_size
+        else:
+            write_state(self.__next_states[pos], sars.next_state)
+            self.__next_masks[pos, sars.next_state.action_indices] = True
+        self.position = (pos + 1) % self.capacity
+        self.__size = min(self.__size + 1, self.capacity)
+
+    def push_records(self, records: np.ndarray) -> None:
+        """Saves transitions already encoded (see `encode_transitions`)"""
+        positions = torch.from_numpy(self._positions(len(records)))
+        records = records[len(records) - len(positions):]
+
+        def field(name: str) -> torch.Tensor:
+            return torch.from_numpy(np.ascontiguousarray(records[name]))
+
+        self.__states[positions] = field('state')
+        self.__next_states[positions] = field('next_state')
+        self.__actions[positions] = field('action')
+        self.__rewards[positions] = field('reward')
+        self.__dones[positions] = field('done').bool()
+        self.__next_masks[positions] = field('next_mask').bool()
+        self.position = (self.position + len(records)) % self.capacity
+        self.__size = min(self.__size + len(records), self.capacity)
+
+    def _positions(self, n: int) -> np.ndarray:
+        """Ring positions of the next `n` transitions pushed, only the last `capacity` ones if there are more"""
+        skipped = max(n - self.capacity, 0)
+        return (self.position + skipped + np.arange(n - skipped)) % self.capacity
+
+    def sample(self, batch_size: int, generator: Optional[torch.Generator] = None) -> Transitions:
+        """`batch_size` transitions drawn uniformly (with replacement)"""
+        return self.gather(torch.randint(self.__size, (batch_size,), generator=generator))
+
+    def gather(self, indices: torch.Tensor) -> Transitions:
+        """Transitions stored at `indices`"""
+        return Transitions(
+            states=decode_states(self.__states.index_select(0, indices), self.state_type.tensor_size),
+            actions=self.__actions.index_select(0, indices).long(),
+            rewards=self.__rewards.index_select(0, indices).float(),
+            next_states=decode_states(self.__next_states.index_select(0, indices), self.state_type.tensor_size),
+            dones=self.__dones.index_select(0, indices),
+            next_masks=self.__next_masks.index_select(0, indices),
+            indices=indices,
+            weights=torch.ones(len(indices)),
+        )
+
+    def __len__(self) -> int:
+        return self.__size
+
+
+class PrioritizedReplayMemory(TensorReplayMemory):
+    """
+    Tensor replay memory sampling transitions in proportion to their priority (|TD error| + `epsilon`) ** `alpha`,
+    kept in a sum tree. New transitions get the highest priority seen so far, so they are sampled at least once.
+    The bias of the sampling is corrected by the importance sampling weights (N * P(i)) ** -`beta` of the batches,
+    normalized by their maximum; `beta` is usually annealed to 1 during training.
+    """
+
+    def __init__(self, capacity: int, state_type: Type[State], alpha: float = 0.6, beta: float = 0.4,
+                 epsilon: float = 1e-2):
+        super().__init__(capacity, state_type)
+        self.alpha = alpha
+        self.beta = beta
+        self.epsilon = epsilon
+        self.tree = SumTree(capacity)
+        self.__max_priority = 1.0
+
+    def push(self, sars: SARS) -> None:
+        position = self.position
+        super().push(sars)
+        self.tree.update(np.array([position]), np.array([self.__max_priority]))
+
+    def push_records(self, records: np.ndarray) -> None:
+        positions = self._positions(len(records))
+        super().push_records(records)
+        self.tree.update(positions, np.full(len(positions), self.__max_priority))
+
+    def sample(self, batch_size: int, generator: Optional[torch.Generator] = None) -> Transitions:
+        """`batch_size` transitions drawn in proportion to their priority, one in each of `batch_size` equal ranges"""
+        offsets = torch.rand(batch_size, generator=generator, dtype=torch.float64).numpy()
+        total = self.tree.total
+        sums = np.minimum((np.arange(batch_size) + offsets) * (total / batch_size), np.nextafter(total, 0))
+        indices = np.minimum(self.tree.find(sums), len(self) - 1)
+
+        weights = (len(self) * self.tree[indices] / total) ** -self.beta
+        weights /= weights.max()
+        return self.gather(torch.from_numpy(indices))._replace(weights=torch.from_numpy(weights).float())
+
+    def update_priorities(self, indices: torch.Tensor, td_errors: torch.Tensor) -> None:
+        """Sets the priorities of the transitions at `indices` (of a sampled batch) from their new TD errors"""
+        priorities = (td_errors.detach().abs().double().cpu().numpy() + self.epsilon) ** self.alpha
+        self.tree.update(indices.cpu().numpy(), priorities)
+        self.__max_priority = max(self.__max_priority, float(priorities.max()))
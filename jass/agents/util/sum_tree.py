@@ -0,0 +1,48 @@
+import numpy as np
+
+
+class SumTree:
+    """
+    Binary tree of sums over `capacity` non negative values, stored in one array: the root is at 1, the children of the
+    node i at 2i and 2i + 1 and the values at the leaves, from `size` on (`size` being a power of 2). Updating values
+    and finding the value at a given cumulated sum take O(log n), a batch at a time.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.size = 1 << max(capacity - 1, 1).bit_length()
+        self.depth = self.size.bit_length() - 1
+        self.nodes = np.zeros(2 * self.size, dtype=np.float64)
+
+    @property
+    def total(self) -> float:
+        return float(self.nodes[1])
+
+    @property
+    def values(self) -> np.ndarray:
+        return self.nodes[self.size:self.size + self.capacity]
+
+    def __getitem__(self, indices) -> np.ndarray:
+        return self.nodes[self.size + np.asarray(indices)]
+
+    def update(self, indices: np.ndarray, values: np.ndarray) -> None:
+        """Sets the values at `indices` (the last one wins for repeated indices) and the sums above them"""
+        nodes = np.unique(np.asarray(indices, dtype=np.intp) + self.size)
+        self.nodes[np.asarray(indices, dtype=np.intp) + self.size] = values
+        for _ in range(self.depth):
+            nodes = np.unique(nodes // 2)
+            self.nodes[nodes] = self.nodes[2 * nodes] + self.nodes[2 * nodes + 1]
+
+    def find(self, sums: np.ndarray) -> np.ndarray:
+        """Index of the value in which each of `sums` (in [0, total)) falls when the values are laid end to end"""
+        sums = np.array(sums, dtype=np.float64)
+        nodes = np.ones(len(sums), dtype=np.intp)
+        for _ in range(self.depth):
+            left = self.nodes[2 * nodes]
+            right = sums >= left
+            # rounding errors may lead to an empty subtree, never go there
+            right &= self.nodes[2 * nodes + 1] > 0
+            right |= left <= 0
+            sums -= np.where(right, left, 0)
+            nodes = 2 * nodes + right
+        return nodes - self.size
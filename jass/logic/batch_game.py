@@ -0,0 +1,236 @@
+from typing import Callable, Sequence, Union, Optional
+
+import numpy as np
+
+from jass.logic import bitboard as bb
+from jass.logic.tables import N_CARDS, N_RANKS, N_SUITS, STRENGTH_TABLE, POINTS_TABLE, TRUMP_POWER
+
+# A policy maps the state of the batch (the `BatchGame` itself, whose arrays describe every game) and the legal
+# moves of the players to play, a bool array of shape (n, 36), to the card indices to play, an int array of shape (n,).
+BatchPolicy = Callable[['BatchGame', np.ndarray], np.ndarray]
+# A trump policy maps the batch and the hands of the trump choosers, a bool array of shape (n, 36), to suit indices.
+BatchTrumpPolicy = Callable[['BatchGame', np.ndarray], np.ndarray]
+
+SEVEN_OF_DIAMONDS = 1
+LAST_TRICK_POINTS = 5
+MATCH_POINTS = 100
+
+_SUIT_OF = np.arange(N_CARDS) // N_RANKS
+_RANK_OF = np.arange(N_CARDS) % N_RANKS
+_SUIT_CARDS = _SUIT_OF[None, :] == np.arange(N_SUITS)[:, None]  # (4, 36)
+
+# bitboards as uint64, see `jass.logic.bitboard`, index 36 stands for "no card"
+_NO_CARD = N_CARDS
+_BITS = np.array([1 << i for i in range(N_CARDS)] + [0], dtype=np.uint64)
+_SUIT_MASKS = np.array(bb.SUIT_MASKS, dtype=np.uint64)
+_NON_JACK_MASKS = np.array([m & ~j for m, j in zip(bb.SUIT_MASKS, bb.JACK_BITS)], dtype=np.uint64)
+_STRONGER_TRUMPS = np.array(bb.STRONGER_TRUMPS + (bb.FULL_MASK,), dtype=np.uint64)
+_TRUMP_POWER = np.array([TRUMP_POWER[r] for r in _RANK_OF] + [-1], dtype=np.int64)
+
+
+def unpack(masks: np.ndarray) -> np.ndarray:
+    """Bitboards (uint64) to bool arrays with an extra last dimension of size 36"""
+    masks = np.ascontiguousarray(masks, dtype='<u8')
+    bits = np.unpackbits(masks.view(np.uint8).reshape(masks.shape + (8,)), axis=-1, bitorder='little')
+    return bits[..., :N_CARDS].view(bool)
+
+
+class BatchGame:
+    """
+    Plays `n` independent rounds in lockstep, one card per step for every game, with NumPy arrays.
+
+    Hands are uint64 bitboards (same layout as `jass.logic.bitboard`) and legal moves are computed with mask
+    operations for the whole batch at once. Seats 0 and 2 are the first team, seats 1 and 3 the second one.
+    The first trump chooser of each game is the holder of the 7♢, then it rotates like in `Game`.
+    Chibre is not supported.
+    """
+
+    def __init__(self, n: int, seed: Optional[int] = None):
+        self.n = n
+        self.rng = np.random.default_rng(seed)
+        self.rows = np.arange(n)
+
+        self.deals = np.zeros((n, N_CARDS), dtype=np.int64)  # card indices, 9 first cards for seat 0, ...
+        self.hands = np.zeros((n, 4), dtype=np.uint64)
+        self.chooser = np.full(n, -1, dtype=np.int64)
+        self.trump = np.zeros(n, dtype=np.int64)
+
+        self.tricks = np.full((n, 9, 4), -1, dtype=np.int64)  # card indices in playing order
+        self.trick_leaders = np.zeros((n, 9), dtype=np.int64)
+        self.trick_winners = np.zeros((n, 9), dtype=np.int64)
+        self.trick_idx = 0
+        self.trick_size = 0
+        self.best_trump = np.full(n, _NO_CARD, dtype=np.int64)  # best trump card of the current trick
+
+        self.round_points = np.zeros((n, 2), dtype=np.int64)
+        self.scores = np.zeros((n, 2), dtype=np.int64)
+        self.rounds = 0
+
+    @property
+    def trick(self) -> np.ndarray:
+        """Cards of the current trick, shape (n, 4), -1 for the cards not played yet"""
+        return self.tricks[:, self.trick_idx]
+
+    @property
+    def leader(self) -> np.ndarray:
+        return self.trick_leaders[:, self.trick_idx]
+
+    @property
+    def seat(self) -> np.ndarray:
+        """Seat of the players to play"""
+        return (self.leader + self.trick_size) % 4
+
+    def deal(self, deals: np.ndarray = None) -> None:
+        if deals is None:
+            deals = self.rng.permuted(np.tile(np.arange(N_CARDS), (self.n, 1)), axis=1)
+        self.deals[:] = deals
+        self.hands[:] = np.bitwise_or.reduce(_BITS[self.deals].reshape(self.n, 4, 9), axis=2)
+
+        first_round = self.chooser < 0
+        if first_round.any():
+            holder = np.argmax(self.deals == SEVEN_OF_DIAMONDS, axis=1) // 9
+            self.chooser[first_round] = holder[first_round]
+
+        self.tricks[:] = -1
+        self.trick_idx = 0
+        self.trick_size = 0
+        self.round_points[:] = 0
+
+    def choose_trump(self, trump_policy: BatchTrumpPolicy) -> None:
+        self.trump[:] = trump_policy(self, unpack(self.hands[self.rows, self.chooser]))
+        self.trick_leaders[:, 0] = self.chooser
+
+    def legal_mask(self) -> np.ndarray:
+        """Legal moves of the players to play as bitboards, shape (n,)"""
+        hands = self.hands[self.rows, self.seat]
+        if self.trick_size == 0:
+            return hands
+
+        served = self.trick[:, 0] // N_RANKS
+        served_cards = hands & _SUIT_MASKS[served]
+        trumps = hands & _SUIT_MASKS[self.trump]
+        stronger_trumps = trumps & _STRONGER_TRUMPS[self.best_trump]
+
+        # must serve or play a stronger trump card, when not serving can play anything but a weaker trump card
+        legal = np.where(served_cards != 0, served_cards | stronger_trumps, (hands ^ trumps) | stronger_trumps)
+        # only weaker trump cards left -> they can be played
+        legal = np.where(legal != 0, legal, hands)
+        # trump served -> must play a trump card, except when only holding the trump jack
+        must_trump = (served == self.trump) & (hands & _NON_JACK_MASKS[self.trump] != 0)
+        return np.where(served == self.trump, np.where(must_trump, trumps, hands), legal)
+
+    def legal_moves(self) -> np.ndarray:
+        """Legal moves of the players to play, bool array of shape (n, 36)"""
+        return unpack(self.legal_mask())
+
+    def step(self, policies: Union[BatchPolicy, Sequence[BatchPolicy]]) -> None:
+        """Every player to play plays one card"""
+        legal = self.legal_moves()
+        seat = self.seat
+        if callable(policies):
+            cards = policies(self, legal)
+        else:
+            cards = np.zeros(self.n, dtype=np.int64)
+            for policy in dict.fromkeys(policies):  # each policy is called once for all the seats it plays
+                seats = [s for s, p in enumerate(policies) if p is policy]
+                cards = np.where(np.isin(seat, seats), policy(self, legal), cards)
+
+        self.hands[self.rows, seat] &= ~_BITS[cards]
+        self.tricks[:, self.trick_idx, self.trick_size] = cards
+
+        is_better_trump = (cards // N_RANKS == self.trump) & (_TRUMP_POWER[cards] > _TRUMP_POWER[self.best_trump])
+        self.best_trump = np.where(is_better_trump, cards, self.best_trump)
+
+        self.trick_size += 1
+        if self.trick_size == 4:
+            self.__end_trick()
+
+    def play_round(self, policies: Union[BatchPolicy, Sequence[BatchPolicy]],
+                   trump_policy: BatchTrumpPolicy = None, deals: np.ndarray = None) -> np.ndarray:
+        """Plays one round of every game and returns the points of each team, shape (n, 2)"""
+        self.deal(deals)
+        self.choose_trump(greedy_trump_policy if trump_policy is None else trump_policy)
+        for _ in range(N_CARDS):
+            self.step(policies)
+        self.scores += self.round_points
+        self.chooser = (self.chooser + 1) % 4
+        self.rounds += 1
+        return self.round_points.copy()
+
+    def __end_trick(self) -> None:
+        trick = self.trick
+        trump = self.trump[:, None]
+        served = trick[:, :1] // N_RANKS
+        winner = (self.leader + STRENGTH_TABLE[trick, served, trump].argmax(axis=1)) % 4
+        points = POINTS_TABLE[trick, trump].sum(axis=1)
+        team = winner % 2
+
+        self.trick_winners[:, self.trick_idx] = winner
+        if self.trick_idx == 8:
+            points += LAST_TRICK_POINTS
+            match = (self.trick_winners % 2 == team[:, None]).all(axis=1)
+            points[match] += MATCH_POINTS
+        self.round_points[self.rows, team] += points
+
+        self.trick_idx += 1
+        self.trick_size = 0
+        self.best_trump[:] = _NO_CARD
+        if self.trick_idx < 9:
+            self.trick_leaders[:, self.trick_idx] = winner
+
+
+##################
+# BATCH POLICIES #
+##################
+
+def random_policy(game: BatchGame, legal: np.ndarray) -> np.ndarray:
+    scores = game.rng.random(legal.shape, dtype=np.float32)
+    scores *= legal
+    return scores.argmax(axis=1)
+
+
+# heuristic scores of each card, rows indexed by trump (leading) or by served * 4 + trump (following)
+_TRUMP_ROWS = _SUIT_CARDS
+_STRENGTH_ROWS = STRENGTH_TABLE.transpose(1, 2, 0).reshape(N_SUITS * N_SUITS, N_CARDS).astype(np.int16)
+_POINTS_ROWS = np.tile(POINTS_TABLE.T, (N_SUITS, 1))
+_LEAD_SCORES = np.where(_TRUMP_ROWS, -1, _RANK_OF[None, :]).astype(np.int16)
+_COSTS = (100 * _POINTS_ROWS + _STRENGTH_ROWS).astype(np.int16)
+_SMEAR_SCORES = (100 * _POINTS_ROWS - _STRENGTH_ROWS - 1000 * np.tile(_TRUMP_ROWS, (N_SUITS, 1))).astype(np.int16)
+_WORST = np.int16(30000)
+
+
+def heuristic_policy(game: BatchGame, legal: np.ndarray) -> np.ndarray:
+    """
+    Leading: plays its highest non trump card (trump cards only when nothing else is left).
+    Following: gives its most valuable non trump card when the partner wins the trick, otherwise plays the cheapest
+    card winning the trick or, if none, the card with the fewest points.
+    """
+    if game.trick_size == 0:
+        return np.where(legal, _LEAD_SCORES[game.trump], -_WORST).argmax(axis=1)
+
+    trick = game.trick[:, :game.trick_size]
+    row = (trick[:, 0] // N_RANKS) * N_SUITS + game.trump
+    strength = _STRENGTH_ROWS[row]
+    table_strength = _STRENGTH_ROWS[row[:, None], trick]
+    best = table_strength.max(axis=1)
+    partner_wins = table_strength.argmax(axis=1) == game.trick_size - 2
+
+    winning = legal & (strength > best[:, None])
+    costs = _COSTS[row]
+    cheapest_win = np.where(winning, costs, _WORST).argmin(axis=1)
+    lowest = np.where(legal, costs, _WORST).argmin(axis=1)
+    smear = np.where(legal, _SMEAR_SCORES[row], -_WORST).argmax(axis=1)
+
+    return np.where(partner_wins, smear, np.where(winning.any(axis=1), cheapest_win, lowest))
+
+
+def random_trump_policy(game: BatchGame, hands: np.ndarray) -> np.ndarray:
+    return game.rng.integers(N_SUITS, size=len(hands))
+
+
+_TRUMP_WEIGHTS = np.array([1, 1, 1, 2, 1, 2.5, 1.1, 1.2, 1.5])[_RANK_OF]
+
+
+def greedy_trump_policy(game: BatchGame, hands: np.ndarray) -> np.ndarray:
+    """Same choice as `GreedyAgent.choose_trump`"""
+    return ((hands * _TRUMP_WEIGHTS) @ _SUIT_CARDS.T).argmax(axis=1)
@@ -0,0 +1,139 @@
+from functools import lru_cache
+from typing import Iterable, List, Sequence, Tuple
+
+from jass.logic.tables import TRUMP_POWER
+
+# A set of cards is a 36-bit integer where bit `i` is the card `Card[i]`.
+# Each suit owns a lane of 9 consecutive bits (same layout as `Card.order_value`).
+
+N_RANKS = 9
+N_SUITS = 4
+N_CARDS = N_RANKS * N_SUITS
+
+LANE_MASK = (1 << N_RANKS) - 1
+FULL_MASK = (1 << N_CARDS) - 1
+SUIT_MASKS = tuple(LANE_MASK << (suit * N_RANKS) for suit in range(N_SUITS))
+
+JACK_RANK = 5  # Rank.jack.order_value
+JACK_BITS = tuple(1 << (suit * N_RANKS + JACK_RANK) for suit in range(N_SUITS))
+
+
+def _stronger_trumps(card_idx: int) -> int:
+    suit, rank = divmod(card_idx, N_RANKS)
+    lane = 0
+    for other_rank in range(N_RANKS):
+        if TRUMP_POWER[other_rank] > TRUMP_POWER[rank]:
+            lane |= 1 << other_rank
+    return lane << (suit * N_RANKS)
+
+
+# for a card of the trump suit, the mask of the trump cards beating it
+STRONGER_TRUMPS = tuple(_stronger_trumps(i) for i in range(N_CARDS))
+
+
+def bit(card_idx: int) -> int:
+    return 1 << card_idx
+
+
+def mask_of(card_indices: Iterable[int]) -> int:
+    mask = 0
+    for card_idx in card_indices:
+        mask |= 1 << card_idx
+    return mask
+
+
+def indices_of(mask: int) -> List[int]:
+    indices = []
+    while mask:
+        lowest = mask & -mask
+        indices.append(lowest.bit_length() - 1)
+        mask ^= lowest
+    return indices
+
+
+def count(mask: int) -> int:
+    return bin(mask).count('1')
+
+
+def suit_of(card_idx: int) -> int:
+    return card_idx // N_RANKS
+
+
+def best_trump(table: Sequence[int], trump: int) -> int:
+    """Returns the index of the strongest trump card in `table` or -1 if no trump card was played"""
+    best = -1
+    for card_idx in table:
+        if card_idx // N_RANKS == trump:
+            if best < 0 or TRUMP_POWER[card_idx % N_RANKS] > TRUMP_POWER[best % N_RANKS]:
+                best = card_idx
+    return best
+
+
+def playable_mask(hand: int, table: Sequence[int], trump: int) -> int:
+    """
+    Legal moves of `hand` given the card indices already on the table (in playing order) and the trump suit index.
+    Same rules as the original set based implementation of `Hand`, expressed as mask operations.
+    """
+    # we are the first to play -> all cards are playable
+    if len(table) == 0:
+        return hand
+
+    served = table[0] // N_RANKS
+    trumps = hand & SUIT_MASKS[trump]
+
+    # first played a trump card -> must play a trump card (except if we only have the trump jack)
+    if served == trump:
+        if trumps & ~JACK_BITS[trump]:
+            return trumps
+        return hand
+
+    best = best_trump(table, trump)
+    served_cards = hand & SUIT_MASKS[served]
+
+    if served_cards:
+        if best < 0:  # no trump card played yet
+            return served_cards | trumps
+        # someone played a trump card -> can serve or play a stronger trump card
+        return served_cards | (trumps & STRONGER_TRUMPS[best])
+
+    if best < 0:  # cannot serve and no trump card played -> all cards are playable
+        return hand
+
+    # someone played a trump card -> can play any non trump card and stronger trump cards
+    playable = (hand & ~SUIT_MASKS[trump]) | (trumps & STRONGER_TRUMPS[best])
+    # if only weaker trump cards remain, it is okay to play them
+    return playable if playable else hand
+
+
+#################################
+# MEMOIZED LEGAL MOVE GENERATOR #
+#################################
+
+PLAYABLE_CACHE_SIZE = 1 << 16
+
+
+def _make_cached_playable_mask(maxsize: int):
+    @lru_cache(maxsize=maxsize)
+    def cached_playable_mask(hand: int, table: Tuple[int, ...], trump: int) -> int:
+        """Same as `playable_mask`, memoized in a LRU shared by every hand of the process"""
+        return playable_mask(hand, table, trump)
+
+    return cached_playable_mask
+
+
+cached_playable_mask = _make_cached_playable_mask(PLAYABLE_CACHE_SIZE)
+
+
+def playable_cache_info():
+    """Hits, misses, maximum and current size of the legal moves cache"""
+    return cached_playable_mask.cache_info()
+
+
+def set_playable_cache_size(maxsize: int) -> None:
+    """Replaces the legal moves cache by an empty one holding at most `maxsize` positions"""
+    global cached_playable_mask
+    cached_playable_mask = _make_cached_playable_mask(maxsize)
+
+
+def clear_playable_cache() -> None:
+    cached_playable_mask.cache_clear()
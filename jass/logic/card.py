@@ -3,10 +3,12 @@ from typing import Union
 
 from werkzeug.utils import cached_property
 
+from jass.logic import tables as _tables
+
 
 class _IndexEnumMeta(EnumMeta):
     def __getitem__(cls, item: int):
-        return list(cls)[item]
+        return cls._member_map_[cls._member_names_[item]]
 
 
 @unique
@@ -68,22 +70,7 @@ class Rank(IntEnum, metaclass=_IndexEnumMeta):
 
 class _MetaCard(type):
 
-    def __getitem__(cls, item: int):
-        rank_value = item % len(Rank)
-        suit_value = item // len(Rank)
-        return Card(rank=Rank[rank_value], suit=Suit[suit_value])
-
-    def __iter__(cls):
-        for i in range(len(cls)):
-            yield Card[i]
-
-    def __len__(cls):
-        return len(Suit) * len(Rank)
-
-
-class Card(object, metaclass=_MetaCard):
-    def __init__(self, rank: Union[int, str, Rank], suit: Union[str, Suit]):
-
+    def __call__(cls, rank: Union[int, str, Rank], suit: Union[str, Suit]) -> 'Card':
         if isinstance(rank, str):
             try:
                 rank = int(rank)
@@ -103,8 +90,29 @@ class Card(object, metaclass=_MetaCard):
                 'C': '♣',
             }.get(suit.upper(), suit)
 
-        self.__rank: Rank = Rank(rank)
-        self.__suit: Suit = Suit(suit)
+        return _CARDS[Rank(rank).order_value + Suit(suit).order_value * len(Rank)]
+
+    def __getitem__(cls, item: int) -> 'Card':
+        return _CARDS[item]
+
+    def __iter__(cls):
+        return iter(_CARDS)
+
+    def __len__(cls):
+        return len(_CARDS)
+
+
+class Card(object, metaclass=_MetaCard):
+    """
+    The 36 cards are interned: `Card[i]`, `Card(rank, suit)` and `iter(Card)` always return the same instances,
+    created once at import. Cards hash as their index and compare by identity.
+    """
+    __slots__ = ('__rank', '__suit', 'order_value')
+
+    def __init__(self, rank: Rank, suit: Suit):
+        self.__rank: Rank = rank
+        self.__suit: Suit = suit
+        self.order_value: int = rank.order_value + suit.order_value * len(Rank)
 
     @property
     def rank(self) -> Rank:
@@ -115,33 +123,11 @@ class Card(object, metaclass=_MetaCard):
         return self.__suit
 
     def beats(self, other: 'Card', served: Suit, trump: Suit) -> bool:
-        return self.__strength_value(served=served, trump=trump) >= other.__strength_value(served=served, trump=trump)
+        return _tables.strength(self.order_value, served.order_value, trump.order_value) \
+               >= _tables.strength(other.order_value, served.order_value, trump.order_value)
 
     def points(self, trump: Suit) -> int:
-        points = {  # points of non-trump cards
-            Rank.ace: 11,
-            Rank.king: 4,
-            Rank.queen: 3,
-            Rank.jack: 2,
-            Rank.ten: 10,
-        }
-        if self.suit is trump:  # editing trump points
-            points.update({
-                Rank.jack: 20,
-                Rank.nine: 14,
-            })
-        return points.get(self.rank, 0)
-
-    def __strength_value(self, served: Suit, trump: Suit) -> int:
-        if self.suit is trump:
-            return self.rank._trump_order_value + Rank.ace.order_value + 2
-        if self.suit is served:
-            return self.rank.order_value + 1
-        return 0
-
-    @cached_property
-    def order_value(self) -> int:
-        return self.rank.order_value + self.suit.order_value * len(Rank)
+        return _tables.POINTS[self.order_value * _tables.N_SUITS + trump.order_value]
 
     def __repr__(self) -> str:
         return f'Card({str(self.rank)}{str(self.suit)})'
@@ -149,9 +135,6 @@ class Card(object, metaclass=_MetaCard):
     def __str__(self):
         return f'{str(self.rank)}{str(self.suit)}'
 
-    def __eq__(self, other: 'Card') -> bool:
-        return self.order_value == other.order_value
-
     def __lt__(self, other: 'Card') -> bool:
         return self.order_value < other.order_value
 
@@ -165,4 +148,21 @@ class Card(object, metaclass=_MetaCard):
         return other.__le__(self)
 
     def __hash__(self) -> int:
-        return hash((self.rank, self.suit))
+        return self.order_value
+
+    def __reduce__(self):
+        # copies and unpickled cards resolve to the interned instances
+        return _card_at, (self.order_value,)
+
+
+def _new_card(rank: Rank, suit: Suit) -> Card:
+    card = object.__new__(Card)
+    card.__init__(rank, suit)
+    return card
+
+
+def _card_at(order_value: int) -> Card:
+    return _CARDS[order_value]
+
+
+_CARDS = tuple(_new_card(rank, suit) for suit in Suit for rank in Rank)
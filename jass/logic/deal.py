@@ -0,0 +1,52 @@
+from typing import Iterator, Optional
+
+import numpy as np
+
+from jass.logic.tables import N_CARDS
+
+DEALS_PER_BLOCK = 1024
+
+
+class DealStream:
+    """
+    Deterministic stream of deals identified by a seed and a stream id.
+
+    A deal is a permutation of the 36 card indices, the 9 first cards go to the first player, and so on.
+    Deals are generated by blocks of `block_size` in one vectorized call, each block with its own generator derived
+    from (seed, stream_id, block index). Any deal can thus be replayed from its index and different stream ids
+    (e.g. one per worker process) never share RNG state.
+    """
+
+    def __init__(self, seed: int, stream_id: int = 0, block_size: int = DEALS_PER_BLOCK):
+        self.seed = seed
+        self.stream_id = stream_id
+        self.block_size = block_size
+        self.__cached_block_idx: Optional[int] = None
+        self.__cached_block: Optional[np.ndarray] = None
+
+    def block(self, block_idx: int) -> np.ndarray:
+        """Deals `block_idx * block_size` to `(block_idx + 1) * block_size`, uint8 array of shape (block_size, 36)"""
+        if block_idx != self.__cached_block_idx:
+            seed_seq = np.random.SeedSequence(self.seed, spawn_key=(self.stream_id, block_idx))
+            rng = np.random.Generator(np.random.PCG64(seed_seq))
+            cards = np.broadcast_to(np.arange(N_CARDS, dtype=np.uint8), (self.block_size, N_CARDS))
+            self.__cached_block = rng.permuted(cards, axis=1)
+            self.__cached_block_idx = block_idx
+        return self.__cached_block
+
+    def deals(self, start: int, count: int) -> np.ndarray:
+        """Deals `start` to `start + count`, uint8 array of shape (count, 36)"""
+        first_block, last_block = start // self.block_size, (start + count - 1) // self.block_size
+        blocks = [self.block(b) for b in range(first_block, last_block + 1)]
+        offset = start - first_block * self.block_size
+        return np.concatenate(blocks)[offset:offset + count] if count > 0 else np.zeros((0, N_CARDS), np.uint8)
+
+    def deal(self, idx: int) -> np.ndarray:
+        """Replays the deal number `idx`, uint8 array of shape (36,)"""
+        return self.block(idx // self.block_size)[idx % self.block_size].copy()
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        block_idx = 0
+        while True:
+            yield from self.block(block_idx).copy()
+            block_idx += 1
@@ -1,21 +1,39 @@
 import random
-from typing import Tuple, List
+from typing import Tuple, List, Optional
 
 from jass.logic.card import Card
+from jass.logic.deal import DealStream
 from jass.logic.hand import Hand
 
 
 class Deck:
     __cards = list(Card)
 
+    def __init__(self, seed: Optional[int] = None, stream_id: int = 0, first_deal: int = 0):
+        """
+        Without seed, shuffles use the `random` module, otherwise the deals are the ones of the
+        `DealStream(seed, stream_id)`, starting from its deal number `first_deal`.
+        """
+        self.__stream: Optional[DealStream] = None if seed is None else DealStream(seed, stream_id)
+        self.__order: List[Card] = self.__cards if self.__stream is None else list(Card)
+        self.deal_idx = first_deal
+
     def shuffle(self) -> 'Deck':
-        random.shuffle(self.__cards)
+        if self.__stream is None:
+            random.shuffle(self.__order)
+        else:
+            self.__order = [Card[i] for i in self.__stream.deal(self.deal_idx)]
+            self.deal_idx += 1
         return self
 
     def give_hands(self) -> Tuple[Hand, Hand, Hand, Hand]:
-        hand1, hand2, hand3, hand4 = [Hand(self.__cards[i * 9:(i + 1) * 9]) for i in range(4)]
+        hand1, hand2, hand3, hand4 = [Hand(self.__order[i * 9:(i + 1) * 9]) for i in range(4)]
         return hand1, hand2, hand3, hand4
 
+    def dealt_cards(self) -> List[Card]:
+        """Cards of this deck in the order of its last shuffle, i.e. of its last deal for a seeded deck"""
+        return self.__order
+
     @staticmethod
     def cards() -> List[Card]:
         return Deck().__cards
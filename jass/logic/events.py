@@ -0,0 +1,155 @@
+from typing import Callable, List, NamedTuple, Sequence, Tuple, Union
+
+from jass.logic.card import Card, Suit
+
+# Events published by `Game`. Players are referred to by their seat (0 to 3), teams by their index (0 for seats 0
+# and 2, 1 for seats 1 and 3). Events are only built when at least one subscriber is registered.
+
+
+class Deal(NamedTuple):
+    round_idx: int
+    hands: Tuple[Tuple[Card, ...], ...]  # cards of each seat
+
+
+class TrumpChosen(NamedTuple):
+    round_idx: int
+    chooser: int
+    trump: Suit
+    chibre: bool  # if True, the partner of the chooser chose the trump suit
+
+
+class CardPlayed(NamedTuple):
+    round_idx: int
+    trick_idx: int
+    seat: int
+    card: Card
+
+
+class TrickWon(NamedTuple):
+    round_idx: int
+    trick_idx: int
+    seat: int
+    points: int  # including the last trick and match bonuses
+    match: bool
+
+
+class RoundScored(NamedTuple):
+    round_idx: int
+    scores: Tuple[int, int]
+
+
+class GameEnded(NamedTuple):
+    round_idx: int
+    winning_team: int
+    scores: Tuple[int, int]
+
+
+Event = Union[Deal, TrumpChosen, CardPlayed, TrickWon, RoundScored, GameEnded]
+Subscriber = Callable[[List[Event]], None]
+
+
+class _Subscription:
+    def __init__(self, subscriber: Subscriber, batch_size: int):
+        self.subscriber = subscriber
+        self.batch_size = batch_size
+        self.events: List[Event] = []
+
+
+class EventStream:
+    """
+    Dispatches the events of a game to its subscribers. A subscriber is called with lists of events, of
+    `batch_size` events or fewer when the stream is flushed (at the end of every game).
+    """
+
+    def __init__(self):
+        self.__subscriptions: List[_Subscription] = []
+
+    @property
+    def active(self) -> bool:
+        """Whether anyone listens, check it before building an event"""
+        return len(self.__subscriptions) > 0
+
+    def subscribe(self, subscriber: Subscriber, batch_size: int = 1) -> None:
+        self.__subscriptions.append(_Subscription(subscriber, batch_size))
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        for subscription in [s for s in self.__subscriptions if s.subscriber is subscriber]:
+            self.__flush(subscription)
+            self.__subscriptions.remove(subscription)
+
+    def publish(self, event: Event) -> None:
+        for subscription in self.__subscriptions:
+            subscription.events.append(event)
+            if len(subscription.events) >= subscription.batch_size:
+                self.__flush(subscription)
+
+    def flush(self) -> None:
+        for subscription in self.__subscriptions:
+            self.__flush(subscription)
+
+    @staticmethod
+    def __flush(subscription: _Subscription) -> None:
+        if subscription.events:
+            events, subscription.events = subscription.events, []
+            subscription.subscriber(events)
+
+
+###############
+# SUBSCRIBERS #
+###############
+
+class TextLogger:
+    """Describes the game in plain text, one `log_fn` call per line"""
+
+    def __init__(self, names: Sequence[str], log_fn: Callable[[str], None] = print):
+        self.names = names
+        self.log_fn = log_fn
+
+    def __call__(self, events: List[Event]) -> None:
+        for event in events:
+            self.__log_event(event)
+
+    def __log_event(self, event: Event) -> None:
+        log, names = self.log_fn, self.names
+        if isinstance(event, Deal):
+            if event.round_idx == 0:
+                log('Let\'s start a Jass Game :)')
+        elif isinstance(event, TrumpChosen):
+            if event.round_idx == 0:
+                log(f'{names[event.chooser]} has the {Card(7, Suit.diamonds)}!')
+            chooser = event.chooser
+            if event.chibre:
+                log(f'{names[chooser]} chibre!')
+                chooser = (chooser + 2) % 4
+            log(f'{names[chooser]} choose trump suit = {event.trump}')
+        elif isinstance(event, CardPlayed):
+            log(f'{names[event.seat]} played {event.card}')
+        elif isinstance(event, TrickWon):
+            if event.match:
+                log('Match!')
+            log(f'{names[event.seat]} wins the trick ({event.points} points)')
+        elif isinstance(event, RoundScored):
+            self.__log_scores(event.scores)
+        elif isinstance(event, GameEnded):
+            log(f'{self.__team_name(event.winning_team)} team won')
+            self.__log_scores(event.scores)
+
+    def __team_name(self, team_idx: int) -> str:
+        return f'{self.names[team_idx]}-{self.names[team_idx + 2]}'
+
+    def __log_scores(self, scores: Tuple[int, int]) -> None:
+        for team_idx, score in enumerate(scores):
+            self.log_fn(f'{self.__team_name(team_idx)} team score: {score}')
+
+
+class ScoreDifferencePrinter:
+    """Prints the score difference between the two teams every `every` rounds"""
+
+    def __init__(self, every: int = 20, print_fn: Callable[[str], None] = print):
+        self.every = every
+        self.print_fn = print_fn
+
+    def __call__(self, events: List[Event]) -> None:
+        for event in events:
+            if isinstance(event, RoundScored) and (event.round_idx + 1) % self.every == 0:
+                self.print_fn(f'Score difference: {event.scores[0] - event.scores[1]}')
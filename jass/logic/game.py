@@ -1,12 +1,15 @@
 import random
-from typing import List, Tuple, Any
+import time
+from typing import List, Tuple, Optional
 
 from jass.agents.agent import Agent
 from jass.logic.card import Card, Suit
 from jass.logic.deck import Deck
+from jass.logic.events import EventStream, TextLogger, Deal, TrumpChosen, CardPlayed, TrickWon, RoundScored, GameEnded
 from jass.logic.exceptions import GameOver
 from jass.logic.player import Player
-from jass.logic.trick import Trick
+from jass.logic.round_state import RoundState, TEAM_OF_SEAT
+from jass.metrics import GameMetrics
 
 GOAL = 1000
 
@@ -26,7 +29,12 @@ class Team:
 
 
 class Game:
-    def __init__(self, agents: List[Agent], names: List[str] = None, log_fn=None, goal=GOAL):
+    def __init__(self, agents: List[Agent], names: List[str] = None, log_fn=None, goal=GOAL, deck: Deck = None,
+                 metrics: GameMetrics = None):
+        """
+        :param log_fn: if given, the game is described in plain text through it (see `TextLogger`)
+        :param metrics: if given, the rounds and the game played are counted and timed in it
+        """
         assert len(agents) == 4, 'It is a 4 players game, need 4 agents'
         if names is None:
             names = [f'{a.__class__.__name__}{random.randint(1e6, 1e7 - 1)}' for a in agents]
@@ -42,9 +50,17 @@ class Game:
             player2=self.__players[3],
         )
         self.__goal = goal
+        self.__deck = Deck() if deck is None else deck  # e.g. `Deck(seed=...)` for reproducible deals
         self.__teams = (team1, team2)
-        self.__log_fn = log_fn
-        self.n = 0
+        self.__round_idx = 0
+
+        # subscribe to it to follow the game, events are only built when someone listens
+        self.events = EventStream()
+        if log_fn is not None:
+            self.events.subscribe(TextLogger(names=names, log_fn=log_fn))
+
+        self.__state: Optional[RoundState] = None
+        self.__metrics = metrics
 
     @property
     def players(self) -> Tuple[Player, Player, Player, Player]:
@@ -55,15 +71,26 @@ class Game:
     def teams(self) -> Tuple[Team, Team]:
         return self.__teams
 
-    def start(self) -> None:
+    @property
+    def state(self) -> Optional[RoundState]:
+        """State of the current (or last) round"""
+        return self.__state
 
-        self.__log('Let\'s start a Jass Game :)')
+    @property
+    def round_idx(self) -> int:
+        """Index of the current round (of the last one once the game is over)"""
+        return self.__round_idx
 
-        trump_chooser: Player = None
-        deck = Deck()  # this reuses the same cards object -> slight memory/performance gain
+    def start(self) -> None:
+        trump_chooser: Optional[int] = None
+        deck = self.__deck
+        events = self.events
+        self.__round_idx = 0
 
         try:
             while True:
+                round_start = time.perf_counter()
+                agent_seconds = sum(p.agent_seconds for p in self.__players)
 
                 #########################
                 # GIVE CARDS TO PLAYERS #
@@ -71,16 +98,17 @@ class Game:
 
                 for player, hand in zip(self.__players, deck.shuffle().give_hands()):
                     player.give(hand)
+                if events.active:
+                    events.publish(Deal(self.__round_idx, tuple([tuple(p.hand_cards) for p in self.__players])))
 
                 ################
                 # CHOOSE TRUMP #
                 ################
 
                 if trump_chooser is None:
-                    for p in self.__players:
+                    for seat, p in enumerate(self.__players):
                         if p.has_7_diamonds():
-                            trump_chooser = p
-                            self.__log(f'{p} has the {Card(7, Suit.diamonds)}!')
+                            trump_chooser = seat
                             break
 
                 trump = self.choose_trump(
@@ -100,130 +128,104 @@ class Game:
                 # RESTART #
                 ###########
 
-                trump_chooser = self.__next_player(trump_chooser)
-                self.__log_score()
-
-                self.n += 1
-                if self.n % 20 == 0:
-                    self.n = 0
-                    print(f'Score difference: {self.teams[0].score - self.teams[1].score}')
-
-        except GameOver as e:
-            self.__log(e)
-            self.__log_score()
-
-    def choose_trump(self, trump_chooser: Player) -> Suit:
-        trump = trump_chooser.choose_trump(can_chibre=True)
-        if trump is None:  # chibre!
-            self.__log(f'{trump_chooser} chibre!')
-            partner = self.__partner_of(trump_chooser)
+                trump_chooser = (trump_chooser + 1) % 4
+                if events.active:
+                    events.publish(RoundScored(self.__round_idx, self.__scores()))
+                self.__record_round(round_start, agent_seconds)
+                self.__round_idx += 1
+
+        except GameOver:
+            self.__record_round(round_start, agent_seconds)
+            if self.__metrics is not None:
+                self.__metrics.game_played()
+            if events.active:
+                winning_team = 0 if self.__has_won(self.__teams[0]) else 1
+                events.publish(GameEnded(self.__round_idx, winning_team, self.__scores()))
+        finally:
+            events.flush()
+
+    def choose_trump(self, trump_chooser: int) -> Suit:
+        trump = self.__players[trump_chooser].choose_trump(can_chibre=True)
+        chibre = trump is None
+        if chibre:
+            partner = self.__players[(trump_chooser + 2) % 4]
             trump = partner.choose_trump(can_chibre=False)
-            self.__log(f'{partner} choose trump suit = {trump}')
-        else:
-            self.__log(f'{trump_chooser} choose trump suit = {trump}')
+        if self.events.active:
+            self.events.publish(TrumpChosen(self.__round_idx, trump_chooser, trump, chibre))
         return trump
 
-    def play_9_tricks(self, trump: Suit, trump_chooser: Player) -> None:
-        next_trick_starter: Player = trump_chooser
-        prev_tricks: List[Trick] = []
+    def play_9_tricks(self, trump: Suit, trump_chooser: int) -> None:
+        players = self.__players
+        state = RoundState(hands=[p.hand_mask for p in players], trump=trump.order_value, chooser=trump_chooser)
+        self.__state = state
 
-        trick_7 = None
         for trick_idx in range(9):
+            is_last_trick = trick_idx == 8
 
-            trick, points = self.play_trick(
-                trump=trump,
-                trump_chooser=trump_chooser,
-                starter=next_trick_starter,
-                is_last_trick=trick_idx == 8,
-                prev_tricks=prev_tricks,
-            )
-            prev_tricks.append(trick)
-            winner = trick.winner
+            winner, points = self.play_trick(state)
 
             ##############
             # ADD POINTS #
             ##############
 
-            winning_team = self.__team_of(winner)
+            winning_team_idx = TEAM_OF_SEAT[winner]
+            winning_team = self.__teams[winning_team_idx]
             winning_team.score += points
-            if trick_idx == 7:
-                trick_7 = trick
-            else:
-                if trick_idx == 8:
-                    if trick_7.winner in winning_team:
-                        points += trick_7.points
+            if trick_idx != 7:  # the rewards of the 8th trick are given with the ones of the last trick
+                if is_last_trick:
+                    if TEAM_OF_SEAT[state.winners[7]] == winning_team_idx:
+                        points += state.trick_scores[7]
                     else:
-                        points -= trick_7.points
-                for p in self.__players:
-                    if p in winning_team:
-                        p.reward(points=points, is_last_trick=trick_idx == 8)
+                        points -= state.trick_scores[7]
+                for seat in range(4):
+                    if TEAM_OF_SEAT[seat] == winning_team_idx:
+                        players[seat].reward(points=points, is_last_trick=is_last_trick)
                     else:
-                        p.reward(points=-points, is_last_trick=trick_idx == 8)
-
-            next_trick_starter = winner
+                        players[seat].reward(points=-points, is_last_trick=is_last_trick)
 
             if self.__has_won(winning_team):
                 raise GameOver(f'{winning_team.player1}-{winning_team.player2} team won')
 
-    def play_trick(self, trump: Suit, trump_chooser: Player, starter: Player, is_last_trick: bool,
-                   prev_tricks: List[Trick]):
-
-        trick = Trick(trump)
+    def play_trick(self, state: RoundState) -> Tuple[int, int]:
+        """Plays the next trick of the round and returns the seat of its winner and its points"""
+        trick_idx = state.trick_idx
+        is_last_trick = trick_idx == 8
+        events = self.events
 
         ####################
         # PLAY EACH A CARD #
         ####################
 
-        for player in self.__players_order_from(starter):
+        for _ in range(4):
+            seat = state.to_play
             if is_last_trick:
-                card_played = player.hand_cards[0]
+                card_played = Card[state.hands[seat].bit_length() - 1]  # only one card left
             else:
-                card_played = player.play(
-                    trump=trump,
-                    trump_chooser=trump_chooser,
-                    players=self.__players_order_from(player),
-                    trick_cards=trick.played_cards,
-                    round_tricks=[trick.played_cards for trick in prev_tricks],
-                )
-            self.__log(f'{player} played {card_played}')
-            trick.add_card(card_played, player)
+                card_played = self.__players[seat].play(state)
+            if events.active:
+                events.publish(CardPlayed(self.__round_idx, trick_idx, seat, card_played))
+            state.apply(card_played.order_value)
 
         ####################
         # DETERMINE WINNER #
         ####################
 
-        winner = trick.winner
-        points = trick.points
-        if is_last_trick:
-            points += 5
-            if all([self.__team_of(t.winner) == self.__team_of(winner) for t in prev_tricks]):
-                points += 100
-                self.__log(f'Match!')
+        winner = state.winners[-1]
+        points = state.trick_scores[-1]
+        if events.active:
+            events.publish(TrickWon(self.__round_idx, trick_idx, winner, points, is_last_trick and state.is_match))
 
-        self.__log(f'{winner} wins the trick ({points} points)')
+        return winner, points
 
-        return trick, points
+    def __record_round(self, start: float, agent_seconds: float) -> None:
+        """Adds the round started at `start` to the metrics, the agents having spent `agent_seconds` before it"""
+        if self.__metrics is not None:
+            agent_seconds = sum(p.agent_seconds for p in self.__players) - agent_seconds
+            n_cards = len(self.__state.cards) if self.__state is not None else 0
+            self.__metrics.round_played(time.perf_counter() - start, agent_seconds, n_cards)
 
     def __has_won(self, team: Team) -> bool:
         return team.score >= self.__goal
 
-    def __players_order_from(self, player: Player) -> List[Player]:
-        player_idx = self.__players.index(player)
-        return self.__players[player_idx:] + self.__players[:player_idx]
-
-    def __next_player(self, player) -> Player:
-        return self.__players_order_from(player)[1]
-
-    def __partner_of(self, player: Player) -> Player:
-        return self.__players_order_from(player)[2]
-
-    def __team_of(self, player: Player) -> Team:
-        return [t for t in self.teams if player in t][0]
-
-    def __log(self, s: Any) -> None:
-        if self.__log_fn is not None:
-            self.__log_fn(s)
-
-    def __log_score(self):
-        for team in self.__teams:
-            self.__log(f'{team.player1}-{team.player2} team score: {team.score}')
+    def __scores(self) -> Tuple[int, int]:
+        return self.__teams[0].score, self.__teams[1].score
@@ -1,86 +1,41 @@
-from typing import Sequence, List, Dict
+from typing import Sequence, List
 
-from jass.logic.card import Card, Suit, Rank
+from jass.logic import bitboard as bb
+from jass.logic.card import Card, Suit
 from jass.logic.exceptions import IllegalMoveError
 
 
 class Hand:
     def __init__(self, cards: Sequence[Card]):
-        self.__cards = set(cards)
-        if len(cards) != 9:
+        self.__mask: int = bb.mask_of(card.order_value for card in cards)
+        if len(cards) != 9 or bb.count(self.__mask) != 9:
             raise ValueError('A hand must contains exactly 9 unique cards at the start')
-        self.__playable_cards_cached: Dict[int, List[Card]] = dict()
+
+    @property
+    def mask(self) -> int:
+        return self.__mask
 
     @property
     def cards(self) -> List[Card]:
-        return list(self.__cards)
+        return [Card[i] for i in bb.indices_of(self.__mask)]
 
     def play(self, card: Card, cards_played: List[Card], trump: Suit) -> None:
-        playable_cards = self.playable_cards(cards_played=cards_played, trump=trump)
-        if card not in playable_cards:
+        playable_mask = self.playable_mask(cards_played=cards_played, trump=trump)
+        if not playable_mask & bb.bit(card.order_value):
+            playable_cards = [Card[i] for i in bb.indices_of(playable_mask)]
             raise IllegalMoveError(f'Cannot play {card} when cards played are {cards_played}, trump is {trump}'
                                    f', hand is {self} and playable cards are {playable_cards}')
-        self.__cards.remove(card)
+        self.__mask &= ~bb.bit(card.order_value)
         # return self
 
     def has(self, card: Card) -> bool:
-        return card in self.__cards
-
-    def playable_cards(self, cards_played: List[Card], trump: Suit):
-        return self.__cached_playable_cards(cards_played=cards_played, trump=trump)
-
-    def __cached_playable_cards(self, cards_played: List[Card], trump: Suit):
-        key = len(self.__cards)
-        if key not in self.__playable_cards_cached:
-            # using dict but not keeping previous cached playable cards
-            self.__playable_cards_cached = {key: self.__find_playable_cards(cards_played=cards_played, trump=trump)}
-        return self.__playable_cards_cached[key]
-
-    def __find_playable_cards(self, cards_played: List[Card], trump: Suit) -> List[Card]:
-        # we are the first to play -> all cards are playable
-        if len(cards_played) == 0:
-            return self.cards
-        else:
-            served: Suit = cards_played[0].suit
-
-            # first played a trump card -> must play a trump card (except if none available)
-            if served is trump:
-                if self.__can_serve(trump, including_jack=False):
-                    # must serve a trump card
-                    return [card for card in self.cards if card.suit is trump]
-                else:
-                    # no trump or only the trump jack -> all cards are playable
-                    return self.cards
-            else:
-                # checking if any trump cards have been played yet (keeping the best of them)
-                trump_card = None
-                for card_played in cards_played:
-                    if card_played.suit is trump:
-                        if trump_card is None or card_played.beats(trump_card, served=served, trump=trump):
-                            trump_card = card_played
-
-                if self.__can_serve(served):  # can serve
-                    if trump_card is None:  # no trump card played yet
-                        return [card for card in self.cards if card.suit is served or card.suit is trump]
-                    else:  # someone played a trump card -> can serve or play stronger trump card
-                        return [card for card in self.cards
-                                if card.suit is served or card.beats(trump_card, served=served, trump=trump)]
+        return bool(self.__mask & bb.bit(card.order_value))
 
-                else:  # cannot serve
-                    if trump_card is None:  # cannot serve and no trump card played -> all cards are playable
-                        return self.cards
-                    else:  # someone played a trump card -> can play any non trump card and stronger trump card
-                        playable_cards = [card for card in self.cards
-                                          if card.suit is not trump
-                                          or card.beats(trump_card, served=served, trump=trump)]
-                        if len(playable_cards) == 0:
-                            # this means all remaining cards are weaker trump cards, then it is okay to play them
-                            return self.cards
-                        else:
-                            return playable_cards
+    def playable_cards(self, cards_played: List[Card], trump: Suit) -> List[Card]:
+        return [Card[i] for i in bb.indices_of(self.playable_mask(cards_played=cards_played, trump=trump))]
 
-    def __can_serve(self, suit: Suit, including_jack=True) -> bool:
-        return suit in {card.suit for card in self.__cards if including_jack or card.rank is not Rank.jack}
+    def playable_mask(self, cards_played: List[Card], trump: Suit) -> int:
+        return bb.cached_playable_mask(self.__mask, tuple([c.order_value for c in cards_played]), trump.order_value)
 
     def __str__(self):
         return f'[{" ".join([str(c) for c in sorted(self.cards)])}]'
@@ -1,10 +1,12 @@
-from typing import List, Dict, Optional
+import time
+from typing import List, Optional
 
 from jass.agents.agent import Agent
 from jass.agents.state import PlayCardState, ChooseTrumpState
 from jass.logic.card import Card, Suit
 from jass.logic.exceptions import IllegalMoveError
 from jass.logic.hand import Hand
+from jass.logic.round_state import RoundState
 
 
 class Player:
@@ -12,6 +14,7 @@ class Player:
         self.__name: str = name
         self.__agent: Agent = agent
         self.__hand: Hand = None
+        self.agent_seconds = 0.  # time spent in the agent, e.g. for `GameMetrics`
 
     @property
     def hand_cards(self) -> List[Card]:
@@ -20,34 +23,46 @@ class Player:
     def give(self, hand: Hand) -> None:
         self.__hand = hand
 
-    def play(self, trump: Suit, trump_chooser: 'Player', players: List['Player'], trick_cards: Dict['Player', Card],
-             round_tricks: List[Dict['Player', Card]]) -> Card:
+    @property
+    def hand_mask(self) -> int:
+        return self.__hand.mask
+
+    def play(self, state: RoundState) -> Card:
+        """Asks the agent which card to play, this player being the one to play in `state`"""
         assert self.__hand is not None
-        assert self == players[0]
 
-        cards_on_table = [trick_cards[p] for p in players if p in trick_cards]
-        cards_playable = self.__hand.playable_cards(cards_played=cards_on_table, trump=trump)
+        seat = state.to_play
+        trump = Suit[state.trump]
+        trick_cards = [Card[c] for c in state.table]
+        cards_playable = self.__hand.playable_cards(cards_played=trick_cards, trump=trump)
 
-        state = PlayCardState(
+        agent_state = PlayCardState(
             trick_trump=trump,
-            trump_chooser_idx=players.index(trump_chooser),
+            trump_chooser_idx=(state.chooser - seat) % 4,
             player_hand=self.__hand.cards,
             playable_cards=cards_playable,
-            trick_history=cards_on_table,
-            round_history=[[trick[p] for p in players] for trick in round_tricks]
+            trick_history=trick_cards,
+            round_history=[[Card[c] for c in trick] for trick in state.tricks_from(seat)],
         )
-        card = self.__agent.play_card(state).card_to_play
-        self.__hand.play(card, cards_played=cards_on_table, trump=trump)
+        start = time.perf_counter()
+        card = self.__agent.play_card(agent_state).card_to_play
+        self.agent_seconds += time.perf_counter() - start
+        self.__hand.play(card, cards_played=trick_cards, trump=trump)
         return card
 
     def choose_trump(self, can_chibre) -> Optional[Suit]:
         if self.__hand is None:
             raise IllegalMoveError('Cannot choose trump before having cards')
         state = ChooseTrumpState(self.__hand.cards, can_chibre=can_chibre)  # todo: allow chibre
-        return self.__agent.choose_trump(state).suit
+        start = time.perf_counter()
+        suit = self.__agent.choose_trump(state).suit
+        self.agent_seconds += time.perf_counter() - start
+        return suit
 
     def reward(self, points: int, is_last_trick: bool) -> None:
+        start = time.perf_counter()
         self.__agent.trick_end(reward=points, done=is_last_trick)
+        self.agent_seconds += time.perf_counter() - start
 
     def has_7_diamonds(self) -> bool:
         return self.__hand.has(Card(7, Suit.diamonds))
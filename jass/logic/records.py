@@ -0,0 +1,177 @@
+import os
+from typing import List, Optional, Union
+
+import numpy as np
+
+from jass.logic import tables
+from jass.logic.events import Event, Deal, TrumpChosen, CardPlayed, GameEnded
+from jass.logic.round_state import RoundState
+
+# Fixed width binary records of the rounds played, one 40 bytes record per round:
+#
+#   cards      36 x uint8  card indices in playing order, NO_CARD after the last card if the game ended in the round
+#   trump      uint8       trump suit index
+#   chooser    uint8       seat of the player asked to choose the trump (who leads the first trick)
+#   chibre     uint8       1 if the partner of the chooser chose the trump
+#   round_idx  uint8       index of the round in its game (255 for the rounds after the 255th), 0 starts a new game
+#
+# A file is a header of the same width followed by the records, so it can be memory mapped as one array.
+
+RECORD_DTYPE = np.dtype([
+    ('cards', np.uint8, (tables.N_CARDS,)),
+    ('trump', np.uint8),
+    ('chooser', np.uint8),
+    ('chibre', np.uint8),
+    ('round_idx', np.uint8),
+])
+RECORD_SIZE = RECORD_DTYPE.itemsize
+MAGIC = b'JASSREC1'
+HEADER = MAGIC.ljust(RECORD_SIZE, b'\0')
+NO_CARD = 255
+
+PathLike = Union[str, os.PathLike]
+
+
+class GameRecordWriter:
+    """
+    Appends the rounds of the games it is subscribed to to a record file, e.g.
+
+        with GameRecordWriter('games.jrec') as writer:
+            for _ in range(n_games):
+                game = Game(agents)
+                game.events.subscribe(writer, batch_size=256)
+                game.start()
+
+    Records are buffered and written `buffer_size` at a time, and when the writer is closed.
+    """
+
+    def __init__(self, path: PathLike, buffer_size: int = 4096):
+        self.path = path
+        self.__file = open(path, 'ab')
+        if self.__file.tell() == 0:
+            self.__file.write(HEADER)
+        self.__buffer = np.zeros(buffer_size, dtype=RECORD_DTYPE)
+        self.__n_buffered = 0
+        self.__current: Optional[int] = None  # index in the buffer of the record of the round being played
+        self.__n_cards = 0
+        self.n_records = 0
+
+    def __call__(self, events: List[Event]) -> None:
+        buffer = self.__buffer
+        for event in events:
+            if isinstance(event, Deal):
+                self.__end_round()
+                self.__current = self.__n_buffered
+                buffer[self.__current] = (NO_CARD, 0, 0, 0, min(event.round_idx, 255))
+                self.__n_cards = 0
+            elif isinstance(event, TrumpChosen):
+                buffer['trump'][self.__current] = event.trump.order_value
+                buffer['chooser'][self.__current] = event.chooser
+                buffer['chibre'][self.__current] = event.chibre
+            elif isinstance(event, CardPlayed):
+                buffer['cards'][self.__current, self.__n_cards] = event.card.order_value
+                self.__n_cards += 1
+            elif isinstance(event, GameEnded):
+                self.__end_round()
+
+    def __end_round(self) -> None:
+        """Validates the record of the current round"""
+        if self.__current is None:
+            return
+        self.__current = None
+        self.__n_buffered += 1
+        self.n_records += 1
+        if self.__n_buffered == len(self.__buffer):
+            self.flush()
+
+    def flush(self) -> None:
+        """Writes the records of the rounds played, the one of the round being played stays in the buffer"""
+        self.__file.write(self.__buffer[:self.__n_buffered].tobytes())
+        self.__file.flush()
+        if self.__current is not None:
+            self.__buffer[0] = self.__buffer[self.__current]
+            self.__current = 0
+        self.__n_buffered = 0
+
+    def close(self) -> None:
+        self.__end_round()
+        self.flush()
+        self.__file.close()
+
+    def __enter__(self) -> 'GameRecordWriter':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class GameRecords:
+    """
+    Read only view of a record file, memory mapped: indexing or slicing it returns views of the file, not copies.
+
+        records = GameRecords('games.jrec')
+        records[10_000:20_000]['cards']  # (10000, 36) uint8 array of rounds 10000 to 20000
+        records.game(42)  # the rounds of the 43rd game
+    """
+
+    def __init__(self, path: PathLike):
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f'{path} is not a game record file')
+        size = os.path.getsize(path) - RECORD_SIZE
+        if size > 0:
+            self.records = np.memmap(path, dtype=RECORD_DTYPE, mode='r', offset=RECORD_SIZE,
+                                     shape=(size // RECORD_SIZE,))
+        else:
+            self.records = np.zeros(0, dtype=RECORD_DTYPE)
+        self.__game_starts: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __getitem__(self, item) -> np.ndarray:
+        return self.records[item]
+
+    @property
+    def game_starts(self) -> np.ndarray:
+        """Index of the first round of each game"""
+        if self.__game_starts is None:
+            self.__game_starts = np.flatnonzero(self.records['round_idx'] == 0)
+        return self.__game_starts
+
+    @property
+    def n_games(self) -> int:
+        return len(self.game_starts)
+
+    def game(self, game_idx: int) -> np.ndarray:
+        starts = self.game_starts
+        end = starts[game_idx + 1] if game_idx + 1 < len(starts) else len(self.records)
+        return self.records[starts[game_idx]:end]
+
+
+def replay(record: np.void) -> RoundState:
+    """
+    Round state after the cards of `record`, the hands being deduced from the playing order (they only hold the cards
+    played if the game ended during the round)
+    """
+    cards = [int(card) for card in record['cards'] if card != NO_CARD]
+    trump, chooser = int(record['trump']), int(record['chooser'])
+
+    # who played each card: the winner of a trick leads the next one
+    seats = []
+    leader = chooser
+    for start in range(0, len(cards), 4):
+        trick = cards[start:start + 4]
+        seats += [(leader + i) % 4 for i in range(len(trick))]
+        if len(trick) == 4:
+            served = trick[0] // tables.N_RANKS
+            strengths = [tables.strength(card, served, trump) for card in trick]
+            leader = (leader + strengths.index(max(strengths))) % 4
+
+    hands = [0, 0, 0, 0]
+    for seat, card in zip(seats, cards):
+        hands[seat] |= 1 << card
+    state = RoundState(hands=hands, trump=trump, chooser=chooser)
+    for card in cards:
+        state.apply(card)
+    return state
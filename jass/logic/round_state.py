@@ -0,0 +1,135 @@
+from typing import List, Sequence
+
+from jass.logic import bitboard as bb, tables
+
+LAST_TRICK_POINTS = 5
+MATCH_POINTS = 100
+
+# seat -> team index (seats 0 and 2 against seats 1 and 3)
+TEAM_OF_SEAT = (0, 1, 0, 1)
+
+
+class RoundState:
+    """
+    Complete state of a round: hands, trick in progress, history, trump, trump chooser and scores.
+
+    Cards are integers (`Card.order_value`), hands are bitboards (see `jass.logic.bitboard`), seats go from 0 to 3 and
+    suits are integers (`Suit.order_value`). Moves are applied with `apply` and taken back with `undo`, `clone` only
+    copies a few small lists, so search code can explore ahead without copying players or agents.
+    """
+    __slots__ = ('hands', 'trump', 'chooser', 'played', 'cards', 'leaders', 'winners', 'trick_scores', 'scores')
+
+    def __init__(self, hands: Sequence[int], trump: int, chooser: int):
+        self.hands: List[int] = list(hands)
+        self.trump: int = trump
+        self.chooser: int = chooser  # seat leading the first trick
+        self.played: int = 0  # bitboard of the cards played so far
+        self.cards: List[int] = []  # cards played, in playing order (trick `i` is `cards[4 * i:4 * (i + 1)]`)
+        self.leaders: List[int] = [chooser]  # leader of each trick started
+        self.winners: List[int] = []  # winner of each complete trick
+        self.trick_scores: List[int] = []  # points won with each complete trick, including bonuses
+        self.scores: List[int] = [0, 0]  # points of each team in this round
+
+    @property
+    def trick_idx(self) -> int:
+        return len(self.winners)
+
+    @property
+    def trick_size(self) -> int:
+        """Number of cards on the table"""
+        return len(self.cards) - 4 * len(self.winners)
+
+    @property
+    def table(self) -> List[int]:
+        """Cards of the trick in progress, in playing order"""
+        return self.cards[4 * len(self.winners):]
+
+    @property
+    def leader(self) -> int:
+        return self.leaders[-1]
+
+    @property
+    def to_play(self) -> int:
+        """Seat of the player to play"""
+        return (self.leaders[-1] + len(self.cards) - 4 * len(self.winners)) % 4
+
+    @property
+    def is_over(self) -> bool:
+        return len(self.winners) == 9
+
+    @property
+    def is_match(self) -> bool:
+        """Whether one team won all the tricks of the (finished) round"""
+        return len(self.winners) == 9 and len({TEAM_OF_SEAT[w] for w in self.winners}) == 1
+
+    def legal_moves(self) -> int:
+        """Bitboard of the cards the player to play can play"""
+        return bb.playable_mask(self.hands[self.to_play], self.table, self.trump)
+
+    def legal_cards(self) -> List[int]:
+        return bb.indices_of(self.legal_moves())
+
+    def trick_winner(self) -> int:
+        """Seat currently winning the trick in progress (its leader if no card was played)"""
+        table = self.table
+        if not table:
+            return self.leaders[-1]
+        served = table[0] // 9
+        strengths = [tables.strength(card, served, self.trump) for card in table]
+        return (self.leaders[-1] + strengths.index(max(strengths))) % 4
+
+    def tricks_from(self, seat: int) -> List[List[int]]:
+        """Complete tricks of the round, the cards of each trick ordered by seat starting from `seat`"""
+        cards, leaders = self.cards, self.leaders
+        return [[cards[4 * i + (seat + j - leaders[i]) % 4] for j in range(4)] for i in range(len(self.winners))]
+
+    def apply(self, card: int) -> None:
+        """Plays `card` for the player to play (the move is assumed legal, see `legal_moves`)"""
+        seat = self.to_play
+        bit = 1 << card
+        self.hands[seat] &= ~bit
+        self.played |= bit
+        self.cards.append(card)
+
+        if len(self.cards) - 4 * len(self.winners) == 4:
+            winner = self.trick_winner()
+            trump = self.trump
+            points = sum([tables.points(c, trump) for c in self.cards[-4:]])
+            self.winners.append(winner)
+            if len(self.winners) == 9:
+                points += LAST_TRICK_POINTS
+                if self.is_match:
+                    points += MATCH_POINTS
+            else:
+                self.leaders.append(winner)
+            self.trick_scores.append(points)
+            self.scores[TEAM_OF_SEAT[winner]] += points
+
+    def undo(self) -> int:
+        """Takes back the last card played and returns it"""
+        if len(self.cards) > 0 and len(self.cards) == 4 * len(self.winners):  # the last card completed a trick
+            winner = self.winners.pop()
+            self.scores[TEAM_OF_SEAT[winner]] -= self.trick_scores.pop()
+            if len(self.leaders) > len(self.winners) + 1:
+                self.leaders.pop()
+        card = self.cards.pop()
+        bit = 1 << card
+        self.hands[self.to_play] |= bit
+        self.played &= ~bit
+        return card
+
+    def clone(self) -> 'RoundState':
+        state = RoundState.__new__(RoundState)
+        state.hands = self.hands[:]
+        state.trump = self.trump
+        state.chooser = self.chooser
+        state.played = self.played
+        state.cards = self.cards[:]
+        state.leaders = self.leaders[:]
+        state.winners = self.winners[:]
+        state.trick_scores = self.trick_scores[:]
+        state.scores = self.scores[:]
+        return state
+
+    def __repr__(self):
+        return f'RoundState(trump={self.trump}, chooser={self.chooser}, cards={self.cards}, scores={self.scores})'
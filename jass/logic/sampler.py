@@ -0,0 +1,211 @@
+import random
+from math import comb
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from jass.logic import bitboard as bb
+
+# Deals of the hidden cards consistent with what a player saw of the round.
+#
+# Every unseen card can be held by some of the 3 other seats: all of them at first, fewer once a seat showed it does
+# not have it. Cards are grouped by the set of seats which may hold them (at most 7 groups), and a deal is the number
+# of cards of each group given to each seat (which must add up to the size of each hand) followed by a random
+# permutation of each group. Counting the deals completing every partial choice (a small dynamic program over the
+# groups and the hand sizes left) lets us draw these numbers with the right probabilities: deals are uniform among the
+# consistent ones and there are no rejected draws.
+
+
+_CARD_BITS = np.uint64(1) << np.arange(bb.N_CARDS, dtype=np.uint64)
+
+
+class InconsistentDealError(Exception):
+    pass
+
+
+class DealSampler:
+    """
+    Samples the hands of the other players from the point of view of `seat`, given its hand and the trump suit.
+    Feed it every card played of the round, in playing order, with `play` (the first card being led by the chooser).
+    """
+
+    def __init__(self, hand: int, trump: int, seat: int = 0):
+        self.seat = seat
+        self.trump = trump
+        self.others = tuple((seat + i) % 4 for i in range(1, 4))
+        self.hand = hand
+        self.sizes = [9, 9, 9, 9]  # cards left in each hand
+        self.candidates = [0, 0, 0, 0]  # cards each seat may hold
+        for other in self.others:
+            self.candidates[other] = bb.FULL_MASK & ~hand
+        self.candidates[seat] = hand
+        self.table: List[int] = []
+        self.__plan: Optional[_Plan] = None
+
+    def play(self, seat: int, card: int) -> None:
+        """Updates the candidates after `seat` played `card`"""
+        table, trump = self.table, self.trump
+        if len(table) == 4:
+            table.clear()
+        card_bit = bb.bit(card)
+        if seat == self.seat:
+            self.hand &= ~card_bit
+        for s in range(4):
+            self.candidates[s] &= ~card_bit
+        self.sizes[seat] -= 1
+
+        if table:
+            served = table[0] // bb.N_RANKS
+            suit = card // bb.N_RANKS
+            trumps = bb.SUIT_MASKS[trump]
+            if served == trump:
+                if suit != trump:  # has no trump, except maybe the jack which can be kept
+                    self.candidates[seat] &= ~trumps | bb.JACK_BITS[trump]
+            elif suit != served:
+                best = bb.best_trump(table, trump)
+                if suit != trump:  # has no card of the served suit
+                    self.candidates[seat] &= ~bb.SUIT_MASKS[served]
+                elif best >= 0 and not bb.STRONGER_TRUMPS[best] & card_bit:
+                    # under trumped: only weaker trumps were left in the hand
+                    self.candidates[seat] &= trumps & ~bb.STRONGER_TRUMPS[best]
+        table.append(card)
+        self.__plan = None
+
+    @property
+    def unseen(self) -> int:
+        """Cards held by the other players"""
+        unseen = 0
+        for other in self.others:
+            unseen |= self.candidates[other]
+        return unseen
+
+    def count(self) -> int:
+        """Number of consistent deals"""
+        return self.__get_plan().count
+
+    def sample_one(self, rng: random.Random = random) -> List[int]:
+        """One deal: the hand (bitboard) of each seat, the hand of `seat` being the known one"""
+        plan = self.__get_plan()
+        hands = [0, 0, 0, 0]
+        hands[self.seat] = self.hand
+        left = list(plan.sizes)
+        for k, (cards, allowed) in enumerate(plan.groups):
+            u = rng.random()
+            split = None
+            for split, p in zip(*plan.choices[k][left[0]][left[1]]):
+                if u < p:
+                    break
+            cards = list(cards)
+            rng.shuffle(cards)
+            start = 0
+            for i, n in enumerate(split):
+                if n:
+                    hands[self.others[i]] |= bb.mask_of(cards[start:start + n])
+                    start += n
+                    left[i] -= n
+        return hands
+
+    def sample(self, n: int, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+        """`n` deals at once, uint64 array of shape (n, 4) of the hand (bitboard) of each seat"""
+        rng = np.random.default_rng() if rng is None else rng
+        plan = self.__get_plan()
+        rows = np.arange(n)[:, None]
+        # the bits of the unseen cards, group by group, each group shuffled on every row
+        shuffled = np.tile(_CARD_BITS[plan.cards], (n, 1))
+        for start, end in zip(plan.starts, plan.starts[1:] + [len(plan.cards)]):
+            group = shuffled[:, start:end]
+            rng.permuted(group, axis=1, out=group)
+        # bits of the first j shuffled cards, so the hand of the cards between 2 bounds is a difference
+        prefix = np.zeros((n, len(plan.cards) + 1), dtype=np.uint64)
+        np.cumsum(shuffled, axis=1, out=prefix[:, 1:])
+
+        hands = np.zeros((n, 4), dtype=np.uint64)
+        hands[:, self.seat] = self.hand
+        left = np.tile(np.array(plan.sizes[:2], dtype=np.intp), (n, 1))
+        for k, start in enumerate(plan.starts):
+            splits, cdf = plan.tables[k]  # (n_splits, 3), (10, 10, n_splits)
+            choice = (rng.random((n, 1)) >= cdf[left[:, 0], left[:, 1]]).sum(axis=1)
+            split = splits[np.minimum(choice, len(splits) - 1)]  # (n, 3)
+            left -= split[:, :2]
+            # the first split[0] cards of the group go to the first seat, the next split[1] to the second...
+            bounds = start + np.concatenate([np.zeros((n, 1), dtype=np.intp), split.cumsum(axis=1)], axis=1)
+            between = prefix[rows, bounds[:, 1:]] - prefix[rows, bounds[:, :-1]]  # (n, 3)
+            hands[:, list(self.others)] |= between
+        return hands
+
+    def __get_plan(self) -> '_Plan':
+        if self.__plan is None:
+            self.__plan = _Plan(self.candidates, self.others, [self.sizes[other] for other in self.others])
+        return self.__plan
+
+
+class _Plan:
+    """Groups of cards and probabilities of each split of each group, for given candidates and hand sizes"""
+
+    def __init__(self, candidates: Sequence[int], others: Sequence[int], sizes: Sequence[int]):
+        self.sizes = tuple(sizes)
+        unseen = 0
+        for other in others:
+            unseen |= candidates[other]
+        by_allowed: Dict[Tuple[bool, ...], List[int]] = {}
+        for card in bb.indices_of(unseen):
+            allowed = tuple(bool(candidates[other] >> card & 1) for other in others)
+            by_allowed.setdefault(allowed, []).append(card)
+        if sum(len(cards) for cards in by_allowed.values()) != sum(sizes):
+            raise InconsistentDealError(f'{bb.count(unseen)} unseen cards for hands of {sizes} cards')
+        self.groups: List[Tuple[Tuple[int, ...], Tuple[bool, ...]]] = [
+            (tuple(cards), allowed) for allowed, cards in sorted(by_allowed.items(), key=lambda item: len(item[1]))
+        ]
+        # the unseen cards group by group and the start of each group (for `sample`)
+        self.cards = np.array([card for cards, _ in self.groups for card in cards], dtype=np.intp)
+        self.starts = np.cumsum([0] + [len(cards) for cards, _ in self.groups])[:-1].tolist()
+
+        # ways[k][(a, b)]: number of deals of the groups k, k + 1, ... with a and b cards missing in the first two
+        # hands, only for the (a, b) reachable from the hand sizes
+        n_groups = len(self.groups)
+        totals = [sum(len(cards) for cards, _ in self.groups[k:]) for k in range(n_groups + 1)]
+        splits = [list(_splits(len(cards), allowed)) for cards, allowed in self.groups]
+        reachable = [{(sizes[0], sizes[1])}]
+        for k in range(n_groups):
+            reachable.append({(a - x[0], b - x[1]) for a, b in reachable[k] for x in splits[k]
+                              if x[0] <= a and x[1] <= b and x[2] <= totals[k] - a - b})
+        ways: List[Dict[Tuple[int, int], int]] = [{} for _ in range(n_groups)] + [{(0, 0): 1}]
+        for k in range(n_groups - 1, -1, -1):
+            following = ways[k + 1]
+            for a, b in reachable[k]:
+                ways[k][a, b] = sum(_multinomial(x) * following.get((a - x[0], b - x[1]), 0) for x in splits[k])
+        self.count = ways[0][sizes[0], sizes[1]]
+        if self.count == 0:
+            raise InconsistentDealError('no deal matches the cards played')
+
+        # cumulated probability of each split of each group given the cards missing, as lists (for `sample_one`) and
+        # as arrays (for `sample`)
+        self.choices = []
+        self.tables = []
+        for k in range(n_groups):
+            group_choices = [[([], []) for _ in range(10)] for _ in range(10)]
+            cdf = np.ones((10, 10, len(splits[k])))
+            following = ways[k + 1]
+            for (a, b), total in ways[k].items():
+                if total == 0:
+                    continue
+                cumulated = 0
+                for i, x in enumerate(splits[k]):
+                    cumulated += _multinomial(x) * following.get((a - x[0], b - x[1]), 0)
+                    cdf[a, b, i] = cumulated / total
+                group_choices[a][b] = (splits[k], list(cdf[a, b]))
+            self.choices.append(group_choices)
+            self.tables.append((np.array(splits[k], dtype=np.intp).reshape(-1, 3), cdf))
+
+
+def _splits(n: int, allowed: Tuple[bool, ...]):
+    """Numbers of cards (x0, x1, x2) of a group of `n` cards given to each of the 3 other seats"""
+    for x0 in range(n + 1 if allowed[0] else 1):
+        for x1 in range(n - x0 + 1 if allowed[1] else 1):
+            x2 = n - x0 - x1
+            if x2 == 0 or allowed[2]:
+                yield x0, x1, x2
+
+
+def _multinomial(x: Tuple[int, int, int]) -> int:
+    return comb(x[0] + x[1] + x[2], x[0]) * comb(x[1] + x[2], x[1])
@@ -0,0 +1,309 @@
+import random
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from jass.logic import bitboard as bb, tables
+from jass.logic.round_state import RoundState, TEAM_OF_SEAT, LAST_TRICK_POINTS, MATCH_POINTS
+
+# Double dummy solver: best play for the rest of a round when the four hands are known.
+#
+# The value searched is the difference between the points team 0 (seats 0 and 2) and team 1 (seats 1 and 3) win from
+# the current position on, including the last trick and match bonuses. Team 0 maximizes it, team 1 minimizes it.
+
+TT_BITS = 18  # default transposition table size: 2 ** TT_BITS buckets of 2 entries
+
+_EXACT, _LOWER, _UPPER = 0, 1, 2
+_INFINITY = 1000  # more than the points of a round
+_TABLEBASE_START = 4 * 6  # cards played before the tablebase positions (3 cards per hand)
+
+# whether a match (all the tricks to one team) is still possible: no trick yet, all to team 0, all to team 1, neither
+_MATCH_NONE, _MATCH_TEAM_0, _MATCH_TEAM_1, _MATCH_MIXED = range(4)
+
+_rng = random.Random(0x7a55)
+_ZOBRIST_CARDS = tuple(tuple(_rng.getrandbits(64) for _ in range(4)) for _ in range(bb.N_CARDS))  # [card][seat]
+_ZOBRIST_LEADER = tuple(_rng.getrandbits(64) for _ in range(4))
+_ZOBRIST_TRUMP = tuple(_rng.getrandbits(64) for _ in range(bb.N_SUITS))
+_ZOBRIST_MATCH = tuple(_rng.getrandbits(64) for _ in range(4))
+
+
+def _power_order(trump: int) -> Tuple[Tuple[int, ...], ...]:
+    """Cards of each suit from the weakest to the strongest"""
+    orders = []
+    for suit in range(bb.N_SUITS):
+        ranks = range(bb.N_RANKS)
+        if suit == trump:
+            ranks = sorted(ranks, key=lambda rank: tables.TRUMP_POWER[rank])
+        orders.append(tuple(suit * bb.N_RANKS + rank for rank in ranks))
+    return tuple(orders)
+
+
+_POWER_ORDERS = tuple(_power_order(trump) for trump in range(bb.N_SUITS))
+
+
+class SolverResult(NamedTuple):
+    card: int  # best card for the player to play, -1 if the round is over
+    scores: Tuple[int, int]  # points of each team at the end of the round with optimal play from both sides
+    value: int  # points team 0 wins minus points team 1 wins from the position on
+
+
+class TranspositionTable:
+    """
+    Fixed size table of search results at the start of tricks, indexed by Zobrist keys.
+
+    Each bucket holds 2 entries: the first one is only replaced by results of larger (or equal) subtrees, the second
+    one always, so that the table keeps the expensive results without refusing the recent ones.
+    """
+
+    def __init__(self, bits: int = TT_BITS):
+        self.mask = (1 << bits) - 1
+        size = 2 << bits
+        self.keys: List[int] = [0] * size
+        self.values: List[int] = [0] * size
+        self.flags: List[int] = [0] * size
+        self.moves: List[int] = [-1] * size
+        self.sizes: List[int] = [-1] * size  # number of cards left when stored, -1 for empty entries
+        self.probes = 0
+        self.hits = 0
+
+    def probe(self, key: int) -> int:
+        """Index of the entry of `key` or -1"""
+        self.probes += 1
+        idx = (key & self.mask) << 1
+        if self.keys[idx] == key and self.sizes[idx] >= 0:
+            self.hits += 1
+            return idx
+        if self.keys[idx + 1] == key and self.sizes[idx + 1] >= 0:
+            self.hits += 1
+            return idx + 1
+        return -1
+
+    def store(self, key: int, value: int, flag: int, move: int, size: int) -> None:
+        idx = (key & self.mask) << 1
+        if self.keys[idx] != key and self.sizes[idx] > size:
+            idx += 1
+        self.keys[idx] = key
+        self.values[idx] = value
+        self.flags[idx] = flag
+        self.moves[idx] = move
+        self.sizes[idx] = size
+
+    def clear(self) -> None:
+        self.sizes = [-1] * len(self.sizes)
+        self.probes = 0
+        self.hits = 0
+
+    @property
+    def fill(self) -> float:
+        return 1 - self.sizes.count(-1) / len(self.sizes)
+
+
+class Solver:
+    """
+    Alpha-beta search of the rest of a round with all the hands known, e.g.
+
+        result = Solver().solve(game.state)
+
+    Results at the start of tricks are kept in a bounded `TranspositionTable`, shared by the successive calls of a
+    solver (it can solve positions of different deals and trumps). Moves are ordered with the best move of the table
+    first, then winning cards by decreasing points and losing cards by increasing points (decreasing when the partner
+    wins the trick), and only one of the cards worth the same that follow each other in a hand is searched.
+    """
+
+    def __init__(self, tt_bits: int = TT_BITS, tablebase=None):
+        """
+        :param tablebase: if given, a `jass.logic.tablebase.Tablebase` whose values replace the search of the endgames,
+            and which stores the values of the endgames searched if it is writable
+        """
+        self.tt = TranspositionTable(tt_bits)
+        self.tablebase = tablebase
+        self.nodes = 0
+        self.__state: Optional[RoundState] = None
+
+    def solve(self, state: RoundState) -> SolverResult:
+        """Best move and final scores of the round from `state` (which is left unchanged)"""
+        if state.is_over:
+            return SolverResult(card=-1, scores=(state.scores[0], state.scores[1]), value=0)
+        card, value = self.__root(state, values=None)
+        return SolverResult(card=card, scores=self.__final_scores(state, value), value=value)
+
+    def move_values(self, state: RoundState) -> Dict[int, int]:
+        """
+        Exact value (points of team 0 minus points of team 1 from the position on) of every legal move of the player
+        to play, best moves first, e.g. to label training data
+        """
+        values = {}
+        if not state.is_over:
+            self.__root(state, values=values)
+        maximize = TEAM_OF_SEAT[state.to_play] == 0
+        return dict(sorted(values.items(), key=lambda item: -item[1] if maximize else item[1]))
+
+    def __root(self, state: RoundState, values: Optional[Dict[int, int]]) -> Tuple[int, int]:
+        """Best move and its value, the exact value of every move is written in `values` if given"""
+        self.__state = s = state.clone()
+        seat = s.to_play
+        maximize = TEAM_OF_SEAT[seat] == 0
+        base = s.scores[0] - s.scores[1]
+        key = self.__hands_key(s)
+        alpha, beta = -_INFINITY, _INFINITY
+
+        best_card, best_value = -1, None
+        for card in self.__ordered_moves(s, s.legal_moves(), -1):
+            s.apply(card)
+            value = self.__search(key ^ _ZOBRIST_CARDS[card][seat], alpha, beta)
+            s.undo()
+            if values is not None:  # full window, the value of each move is exact
+                values[card] = value - base
+            if best_value is None or (value > best_value if maximize else value < best_value):
+                best_card, best_value = card, value
+                if values is None:
+                    if maximize:
+                        alpha = value
+                    else:
+                        beta = value
+        self.__state = None
+        return best_card, best_value - base
+
+    def __search(self, key: int, alpha: int, beta: int) -> int:
+        """Points of team 0 minus points of team 1 at the end of the round (fail soft alpha-beta)"""
+        s = self.__state
+        self.nodes += 1
+        n_winners = len(s.winners)
+        if n_winners == 9:
+            return s.scores[0] - s.scores[1]
+
+        n_played = len(s.cards)
+        trick_start = n_played == 4 * n_winners
+        tt_move = -1
+        to_store = False  # whether the exact value of the position goes to the tablebase
+        if trick_start:
+            base = s.scores[0] - s.scores[1]
+            full_key = key ^ _ZOBRIST_LEADER[s.leaders[-1]] ^ _ZOBRIST_TRUMP[s.trump] ^ _ZOBRIST_MATCH[_match_state(s)]
+            tt = self.tt
+            idx = tt.probe(full_key)
+            if idx >= 0 and tt.flags[idx] == _EXACT:
+                return tt.values[idx] + base
+            if self.tablebase is not None and n_played >= _TABLEBASE_START:
+                value = self.tablebase.probe(s.hands, s.trump, s.leaders[-1], s.winners)
+                if value is not None:
+                    return base + value
+                if self.tablebase.writable:  # searched with a full window for its exact value
+                    to_store = True
+                    alpha, beta = -_INFINITY, _INFINITY
+            if idx >= 0:
+                value, flag = tt.values[idx] + base, tt.flags[idx]
+                if flag == _LOWER and value >= beta:
+                    return value
+                if flag == _UPPER and value <= alpha:
+                    return value
+                tt_move = tt.moves[idx]
+            alpha_start, beta_start = alpha, beta
+
+        seat = s.to_play
+        maximize = TEAM_OF_SEAT[seat] == 0
+        legal = bb.cached_playable_mask(s.hands[seat], tuple(s.cards[4 * n_winners:]), s.trump)
+        best_value = None
+        best_move = -1
+        for card in self.__ordered_moves(s, legal, tt_move):
+            s.apply(card)
+            value = self.__search(key ^ _ZOBRIST_CARDS[card][seat], alpha, beta)
+            s.undo()
+            if maximize:
+                if best_value is None or value > best_value:
+                    best_value, best_move = value, card
+                    alpha = max(alpha, value)
+            elif best_value is None or value < best_value:
+                best_value, best_move = value, card
+                beta = min(beta, value)
+            if alpha >= beta:
+                break
+
+        if trick_start:
+            if best_value <= alpha_start:
+                flag = _UPPER
+            elif best_value >= beta_start:
+                flag = _LOWER
+            else:
+                flag = _EXACT
+            self.tt.store(full_key, best_value - base, flag, best_move, 36 - n_played)
+            if to_store:
+                self.tablebase.store(s.hands, s.trump, s.leaders[-1], s.winners, best_value - base)
+        return best_value
+
+    @staticmethod
+    def __ordered_moves(s: RoundState, legal: int, tt_move: int) -> List[int]:
+        if legal & (legal - 1) == 0:  # only one legal move
+            return [legal.bit_length() - 1]
+        trump = s.trump
+        table = s.cards[4 * len(s.winners):]
+        seat = s.to_play
+        hand = s.hands[seat]
+        in_play = bb.mask_of(table)
+        for h in s.hands:
+            in_play |= h
+
+        # rank equivalence: among cards of a hand following each other (no card of another hand or of the table in
+        # between) and worth the same points, only the strongest one needs to be searched
+        moves = []
+        for suit, suit_order in enumerate(_POWER_ORDERS[trump]):
+            if not legal & bb.SUIT_MASKS[suit]:
+                continue
+            previous = -1
+            for card in suit_order:
+                card_bit = 1 << card
+                if not in_play & card_bit:
+                    continue
+                if legal & card_bit and previous >= 0 and tables.POINTS[previous * 4 + trump] == \
+                        tables.POINTS[card * 4 + trump]:
+                    moves[-1] = card
+                elif legal & card_bit:
+                    moves.append(card)
+                previous = card if hand & card_bit and legal & card_bit else -1
+
+        if table:
+            served = table[0] // bb.N_RANKS
+            best = max(tables.STRENGTH[(c * 4 + served) * 4 + trump] for c in table)
+            winner = s.trick_winner()
+            partner_wins = TEAM_OF_SEAT[winner] == TEAM_OF_SEAT[seat]
+
+            def order(c: int):
+                pts = tables.POINTS[c * 4 + trump]
+                if tables.STRENGTH[(c * 4 + served) * 4 + trump] > best:
+                    return 0, -pts
+                return 1, -pts if partner_wins else pts
+        else:
+            def order(c: int):
+                return -tables.STRENGTH[(c * 4 + c // bb.N_RANKS) * 4 + trump], -tables.POINTS[c * 4 + trump]
+        moves.sort(key=order)
+
+        if tt_move in moves:
+            moves.remove(tt_move)
+            moves.insert(0, tt_move)
+        return moves
+
+    @staticmethod
+    def __hands_key(s: RoundState) -> int:
+        key = 0
+        for seat, hand in enumerate(s.hands):
+            for card in bb.indices_of(hand):
+                key ^= _ZOBRIST_CARDS[card][seat]
+        return key
+
+    @staticmethod
+    def __final_scores(s: RoundState, value: int) -> Tuple[int, int]:
+        """Splits the points won from `s` on between the teams from their difference `value`"""
+        in_play = bb.mask_of(s.cards[4 * len(s.winners):])
+        for hand in s.hands:
+            in_play |= hand
+        remaining = sum(tables.points(card, s.trump) for card in bb.indices_of(in_play)) + LAST_TRICK_POINTS
+        if abs(value) > remaining:  # only a match gives more points than the ones left
+            remaining += MATCH_POINTS
+        won_0 = (remaining + value) // 2
+        return s.scores[0] + won_0, s.scores[1] + remaining - won_0
+
+
+def _match_state(s: RoundState) -> int:
+    teams = {TEAM_OF_SEAT[winner] for winner in s.winners}
+    if not teams:
+        return _MATCH_NONE
+    if len(teams) == 2:
+        return _MATCH_MIXED
+    return _MATCH_TEAM_0 if 0 in teams else _MATCH_TEAM_1
@@ -0,0 +1,295 @@
+"""
+Endgame tablebase: exact values of the last tricks of a round, looked up instead of searched.
+
+    python -m jass.logic.tablebase --out endgames.jtb --random 100000 --records games.jrec
+
+A position is the start of a trick with at most MAX_CARDS cards in every hand. There are far too many of them to
+enumerate (more than 10^10 with 3 cards per hand, even up to suit isomorphism), so the table holds the positions
+actually met. It is filled by the solver: a writable table given to `Solver(tablebase=...)` stores the exact value of
+every endgame position the search goes through, and `save` merges them into the file. The last tricks of different
+random deals rarely match beyond the last one, so the table pays off for searches coming back to the same deals, e.g.
+labelling every move of recorded rounds, in other processes or later runs.
+
+Positions are canonicalized before being stored or looked up: seats are rotated so that the leader sits on seat 0,
+the pointless 6, 7, 8 (and 9 but for the trump) in play in each suit are moved to the lowest of these ranks, the trump
+suit becomes suit 0 and the other suits are sorted by the cards each seat holds in them. The key of a position ranks
+the hand of each seat among the subsets of its size (combinatorial number system) in a uint64. The file is a header
+and the sorted (key, values) records, memory mapped and searched by bisection.
+"""
+import argparse
+import itertools
+import os
+import random
+from functools import lru_cache
+from math import comb
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from jass.logic import bitboard as bb
+from jass.logic.records import GameRecords, replay, NO_CARD
+from jass.logic.round_state import RoundState, TEAM_OF_SEAT
+from jass.logic.solver import Solver
+
+MAX_CARDS = 3  # cards per hand
+
+# values of a position for each match state: a match is not possible anymore or the leader team won all the tricks so
+# far (the leader won the last trick, so the other team cannot have won them all)
+N_MATCH_STATES = 2
+NO_MATCH, LEADER_MATCH = range(N_MATCH_STATES)
+UNKNOWN = np.iinfo(np.int16).min  # value of a match state not solved yet
+
+ENTRY_DTYPE = np.dtype([('key', '<u8'), ('values', '<i2', (N_MATCH_STATES,))])
+MAGIC = b'JASSTB02'  # 01 had other keys
+HEADER_SIZE = 16
+
+PathLike = Union[str, os.PathLike]
+
+_SUBSETS = comb(bb.N_CARDS, MAX_CARDS) + 1  # number of subsets of at most MAX_CARDS cards of a suit-ordered hand
+_SHIFTS = tuple(suit * bb.N_RANKS for suit in range(bb.N_SUITS))
+
+# The 6, 7, 8 (and 9 if not trump) of a suit are worth no point and only beat the cards below them: which ones are
+# still in play does not change the value of a position, as long as they keep their order. _PACKED[in_play][cards]
+# moves the `cards` among the `in_play` ones of these ranks to the lowest ranks.
+_LOW_CARDS = 0b1111
+_LOW_TRUMPS = 0b111
+_PACKED = tuple(
+    tuple(sum(1 << i for i, rank in enumerate(r for r in range(4) if in_play >> r & 1) if cards >> rank & 1)
+          for cards in range(_LOW_CARDS + 1))
+    for in_play in range(_LOW_CARDS + 1)
+)
+
+
+@lru_cache(maxsize=None)
+def _rank(mask: int) -> int:
+    """Rank of a set of cards among the sets of the same size (colexicographic order)"""
+    return sum(comb(card, i + 1) for i, card in enumerate(bb.indices_of(mask)))
+
+
+def canonical_key(hands: Sequence[int], trump: int, leader: int) -> int:
+    """Key of the position up to suit isomorphism and pointless ranks, seats being rotated to put `leader` on seat 0"""
+    seats = [hands[(leader + i) % 4] for i in range(4)]
+    # the cards of each seat in a suit, pointless cards packed at the bottom of the suit, then the trump suit first and
+    # the other suits sorted by them
+    suits = []
+    for suit, shift in enumerate(_SHIFTS):
+        lanes = [(hand >> shift) & bb.LANE_MASK for hand in seats]
+        low = _LOW_TRUMPS if suit == trump else _LOW_CARDS
+        packed = _PACKED[(lanes[0] | lanes[1] | lanes[2] | lanes[3]) & low]
+        suits.append(tuple(lane & ~low | packed[lane & low] for lane in lanes))
+    trump_lanes = suits.pop(trump)
+    suits = [trump_lanes] + sorted(suits)
+    key = 0
+    for seat in (3, 2, 1, 0):
+        key = key * _SUBSETS + _rank(suits[0][seat] | suits[1][seat] << _SHIFTS[1] | suits[2][seat] << _SHIFTS[2]
+                                     | suits[3][seat] << _SHIFTS[3])
+    return key * (MAX_CARDS + 1) + bb.count(seats[0])
+
+
+def match_state(winners: Sequence[int]) -> int:
+    return LEADER_MATCH if len({TEAM_OF_SEAT[winner] for winner in winners}) == 1 else NO_MATCH
+
+
+def is_endgame(state: RoundState) -> bool:
+    """Whether `state` is the start of a trick with at most MAX_CARDS cards per hand"""
+    return state.trick_size == 0 and 0 < 9 - state.trick_idx <= MAX_CARDS
+
+
+class Tablebase:
+    """
+    Sorted table of positions and of their values, memory mapped from a file written by `build` or `save`.
+
+    With `writable=True` (the file may then not exist yet) the values given to `store`, e.g. by a solver searching
+    with this table, are kept in memory and found by `probe` until `save` writes them to the file.
+    """
+
+    def __init__(self, path: PathLike, writable: bool = False):
+        self.path = path
+        self.writable = writable
+        self.__new: Dict[int, List[int]] = {}  # values stored since the file was read, by key
+        self.probes = 0
+        self.hits = 0
+        self.__load()
+
+    def __load(self) -> None:
+        if self.writable and not os.path.exists(self.path):
+            self.entries = np.zeros(0, dtype=ENTRY_DTYPE)
+        else:
+            with open(self.path, 'rb') as f:
+                if f.read(len(MAGIC)) != MAGIC:
+                    raise ValueError(f'{self.path} is not a tablebase file')
+            n = (os.path.getsize(self.path) - HEADER_SIZE) // ENTRY_DTYPE.itemsize
+            if n > 0:
+                self.entries = np.memmap(self.path, dtype=ENTRY_DTYPE, mode='r', offset=HEADER_SIZE, shape=(n,))
+            else:
+                self.entries = np.zeros(0, dtype=ENTRY_DTYPE)
+        self.keys = np.ascontiguousarray(self.entries['key'])
+        self.values = self.entries['values']
+
+    def __len__(self) -> int:
+        return len(self.entries) + sum(1 for key in self.__new if self.__find(key) < 0)
+
+    def probe(self, hands: Sequence[int], trump: int, leader: int, winners: Sequence[int]) -> Optional[int]:
+        """
+        Points of team 0 minus points of team 1 won in the rest of the round with optimal play (last trick and match
+        bonuses included) or None if the position is not in the table
+        """
+        self.probes += 1
+        key = canonical_key(hands, trump, leader)
+        state = match_state(winners)
+        value = UNKNOWN
+        idx = self.__find(key)
+        if idx >= 0:
+            value = int(self.values[idx, state])
+        if value == UNKNOWN and key in self.__new:
+            value = self.__new[key][state]
+        if value == UNKNOWN:
+            return None
+        self.hits += 1
+        return value if TEAM_OF_SEAT[leader] == 0 else -value
+
+    def lookup(self, state: RoundState) -> Optional[int]:
+        """Same as `probe` for a round state"""
+        if not is_endgame(state):
+            return None
+        return self.probe(state.hands, state.trump, state.leader, state.winners)
+
+    def store(self, hands: Sequence[int], trump: int, leader: int, winners: Sequence[int], value: int) -> None:
+        """Keeps the value of a position (as returned by `probe`) until the next `save`"""
+        if not self.writable:
+            raise ValueError('the tablebase is read only')
+        values = self.__new.setdefault(canonical_key(hands, trump, leader), [UNKNOWN] * N_MATCH_STATES)
+        values[match_state(winners)] = value if TEAM_OF_SEAT[leader] == 0 else -value
+
+    def save(self) -> int:
+        """Merges the values stored into the file, returns its number of positions"""
+        if not self.writable:
+            raise ValueError('the tablebase is read only')
+        table = {key: values for key, values in zip(self.keys.tolist(), self.values.tolist())}
+        for key, values in self.__new.items():
+            known = table.setdefault(key, [UNKNOWN] * N_MATCH_STATES)
+            for state, value in enumerate(values):
+                if value != UNKNOWN:
+                    known[state] = value
+        _write(table, self.path)
+        self.__new.clear()
+        self.__load()
+        return len(self.entries)
+
+    def __find(self, key: int) -> int:
+        """Index of `key` in the file or -1"""
+        idx = int(self.keys.searchsorted(np.uint64(key)))  # much slower with a python int
+        return idx if idx < len(self.keys) and self.keys[idx] == key else -1
+
+
+##############
+# GENERATION #
+##############
+
+def solve(hands: Sequence[int], trump: int, leader: int, solver: Solver) -> Tuple[int, ...]:
+    """Values of a position for each match state, from the point of view of the leader team"""
+    values = []
+    for winners in _match_winners(hands, leader):
+        value = solver.solve(_endgame_state(hands, trump, leader, winners)).value
+        values.append(value if TEAM_OF_SEAT[leader] == 0 else -value)
+    return tuple(values)
+
+
+def _match_winners(hands: Sequence[int], leader: int) -> Tuple[List[int], ...]:
+    """Winners of the tricks already played giving each match state (NO_MATCH, LEADER_MATCH)"""
+    n_done = 9 - bb.count(hands[leader])
+    return [(leader + 1) % 4] + [leader] * (n_done - 1), [leader] * n_done
+
+
+def _endgame_state(hands: Sequence[int], trump: int, leader: int, winners: Sequence[int]) -> RoundState:
+    """Round state with the hands given and `winners` for the tricks already played (whose cards do not matter)"""
+    state = RoundState(hands=hands, trump=trump, chooser=leader)
+    state.winners = list(winners)
+    state.leaders = [state.chooser] + list(winners)
+    state.trick_scores = [0] * len(winners)
+    state.cards = [NO_CARD] * (4 * len(winners))
+    state.played = bb.FULL_MASK & ~bb.mask_of(card for hand in hands for card in bb.indices_of(hand))
+    return state
+
+
+def _write(table: Dict[int, Sequence[int]], path: PathLike) -> None:
+    """Writes the values of each key as a tablebase file, replacing the file at once as it may be memory mapped"""
+    entries = np.zeros(len(table), dtype=ENTRY_DTYPE)
+    entries['key'] = sorted(table)
+    entries['values'] = np.array([table[key] for key in entries['key'].tolist()]).reshape(-1, N_MATCH_STATES)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC.ljust(HEADER_SIZE, b'\0'))
+        f.write(entries.tobytes())
+    os.replace(tmp_path, path)
+
+
+def build(positions: Iterable[RoundState], path: PathLike, solver: Optional[Solver] = None) -> int:
+    """
+    Solves the endgame positions (see `is_endgame`) given for both match states and writes the table, with the
+    positions met by the searches, returns its number of positions. A table already at `path` is only replaced once
+    the new one is written.
+    """
+    build_path = f'{path}.build'
+    if os.path.exists(build_path):  # left by a build which did not finish
+        os.remove(build_path)
+    tablebase = Tablebase(build_path, writable=True)
+    solver = Solver() if solver is None else solver
+    previous, solver.tablebase = solver.tablebase, tablebase
+    try:
+        for state in positions:
+            if not is_endgame(state):
+                continue
+            for winners in _match_winners(state.hands, state.leader):
+                if tablebase.probe(state.hands, state.trump, state.leader, winners) is None:
+                    value = solver.solve(_endgame_state(state.hands, state.trump, state.leader, winners)).value
+                    tablebase.store(state.hands, state.trump, state.leader, winners, value)
+        n = tablebase.save()
+    finally:
+        solver.tablebase = previous
+    os.replace(build_path, path)
+    return n
+
+
+def random_positions(n: int, seed: int = 0, n_cards: int = MAX_CARDS) -> Iterator[RoundState]:
+    """Positions with `n_cards` cards per hand of random deals played randomly"""
+    rng = random.Random(seed)
+    cards = list(range(bb.N_CARDS))
+    for _ in range(n):
+        rng.shuffle(cards)
+        state = RoundState(hands=[bb.mask_of(cards[i * 9:(i + 1) * 9]) for i in range(4)], trump=rng.randrange(4),
+                           chooser=rng.randrange(4))
+        while 9 - state.trick_idx > n_cards:
+            state.apply(rng.choice(state.legal_cards()))
+        yield state
+
+
+def record_positions(records: GameRecords, n_cards: int = MAX_CARDS) -> Iterator[RoundState]:
+    """Positions with `n_cards` cards per hand of the complete recorded rounds"""
+    for record in records:
+        if record['cards'][-1] == NO_CARD:
+            continue
+        state = replay(record)
+        while len(state.cards) > 4 * (9 - n_cards):
+            state.undo()
+        yield state
+
+
+def main(args: Sequence[str] = None) -> None:
+    parser = argparse.ArgumentParser(prog='python -m jass.logic.tablebase', description=__doc__.split('\n\n')[0])
+    parser.add_argument('--out', required=True)
+    parser.add_argument('--random', type=int, default=0, help='number of random deals')
+    parser.add_argument('--records', nargs='*', default=[], help='game record files')
+    parser.add_argument('--seed', type=int, default=0)
+    parsed = parser.parse_args(args)
+
+    positions: List[Iterable[RoundState]] = []
+    for n_cards in range(1, MAX_CARDS + 1):
+        positions.append(random_positions(parsed.random, seed=parsed.seed + n_cards, n_cards=n_cards))
+        positions += [record_positions(GameRecords(path), n_cards=n_cards) for path in parsed.records]
+    n = build(itertools.chain(*positions), parsed.out)
+    print(f'{n} positions written to {parsed.out}')
+
+
+if __name__ == '__main__':
+    main()
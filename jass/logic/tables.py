@@ -0,0 +1,63 @@
+from typing import Tuple, Union
+
+import numpy as np
+
+# Precomputed lookup tables for the card strengths and points.
+# Cards, suits and ranks are referred to by their order value (`Card.order_value`, `Suit.order_value`, ...):
+# card = suit * 9 + rank.
+
+N_RANKS = 9
+N_SUITS = 4
+N_CARDS = N_RANKS * N_SUITS
+
+# power of each rank when it is trump: 6 < 7 < 8 < 10 < Q < K < A < 9 < J
+TRUMP_POWER = (0, 1, 2, 7, 3, 8, 4, 5, 6)
+RANK_POINTS = (0, 0, 0, 0, 10, 2, 3, 4, 11)
+TRUMP_RANK_POINTS = (0, 0, 0, 14, 10, 20, 3, 4, 11)
+
+
+def _strength(card: int, served: int, trump: int) -> int:
+    suit, rank = divmod(card, N_RANKS)
+    if suit == trump:
+        return TRUMP_POWER[rank] + N_RANKS + 1
+    if suit == served:
+        return rank + 1
+    return 0
+
+
+def _points(card: int, trump: int) -> int:
+    suit, rank = divmod(card, N_RANKS)
+    return TRUMP_RANK_POINTS[rank] if suit == trump else RANK_POINTS[rank]
+
+
+# flat tables, STRENGTH[(card * 4 + served) * 4 + trump] and POINTS[card * 4 + trump]
+STRENGTH = tuple(_strength(c, s, t) for c in range(N_CARDS) for s in range(N_SUITS) for t in range(N_SUITS))
+POINTS = tuple(_points(c, t) for c in range(N_CARDS) for t in range(N_SUITS))
+
+# same tables for vectorized lookups, STRENGTH_TABLE[card, served, trump] and POINTS_TABLE[card, trump]
+STRENGTH_TABLE = np.array(STRENGTH, dtype=np.int8).reshape(N_CARDS, N_SUITS, N_SUITS)
+POINTS_TABLE = np.array(POINTS, dtype=np.int16).reshape(N_CARDS, N_SUITS)
+
+
+def strength(card: int, served: int, trump: int) -> int:
+    return STRENGTH[(card * N_SUITS + served) * N_SUITS + trump]
+
+
+def points(card: int, trump: int) -> int:
+    return POINTS[card * N_SUITS + trump]
+
+
+def score_tricks(tricks: np.ndarray, trumps: Union[int, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Scores many complete tricks at once.
+
+    :param tricks: integer array of shape (N, 4), the card indices of each trick in playing order
+    :param trumps: trump suit index, either shared by all tricks or one per trick (shape (N,))
+    :return: the position (0 to 3) of the winning card in each trick and the points of each trick
+    """
+    tricks = np.asarray(tricks, dtype=np.intp)
+    trumps = np.broadcast_to(np.asarray(trumps, dtype=np.intp), tricks.shape[:1])[:, None]
+    served = tricks[:, :1] // N_RANKS
+    winners = STRENGTH_TABLE[tricks, served, trumps].argmax(axis=1)
+    points_ = POINTS_TABLE[tricks, trumps].sum(axis=1)
+    return winners, points_
@@ -1,18 +1,26 @@
 from collections import OrderedDict
-from typing import Dict, Optional
-
-from werkzeug.utils import cached_property
+from typing import Dict, List, Optional, Tuple
 
+from jass.logic import bitboard as bb, tables
 from jass.logic.card import Card, Suit
 from jass.logic.exceptions import IllegalMoveError
 from jass.logic.player import Player
 
 
 class Trick:
+    """
+    The winner, best card and points are updated as each card is added, so they are available in O(1) on incomplete
+    tricks as well. `remove_last_card` undoes the last `add_card` (e.g. to push and pop moves during a search).
+    """
+
     def __init__(self, trump: Suit):
         self.__played_cards: Dict[Player, Card] = OrderedDict()
         self.__trump: Suit = trump
         self.__served: Optional[Suit] = None
+        self.__mask: int = 0
+        self.__points: int = 0
+        # (winner, best card, its strength) after each card played
+        self.__bests: List[Tuple[Player, Card, int]] = []
 
     @property
     def served(self) -> Optional[Suit]:
@@ -22,36 +30,59 @@ class Trick:
     def trump(self) -> Suit:
         return self.__trump
 
+    @property
+    def mask(self) -> int:
+        return self.__mask
+
     @property
     def played_cards(self) -> Dict[Player, Card]:
         return self.__played_cards
 
+    @property
+    def winner(self) -> Optional[Player]:
+        """Player currently winning the trick, None if no card was played"""
+        return self.__bests[-1][0] if self.__bests else None
+
+    @property
+    def best_card(self) -> Optional[Card]:
+        """Card currently winning the trick, None if no card was played"""
+        return self.__bests[-1][1] if self.__bests else None
+
+    @property
+    def points(self) -> int:
+        """Points of the cards played so far"""
+        return self.__points
+
+    @property
+    def is_complete(self) -> bool:
+        return len(self.__played_cards) == 4
+
     def add_card(self, card: Card, player: Player) -> None:
-        if len(self.played_cards) == 0:
-            self.__served = card.suit
-        if self.__is_complete():
+        if self.is_complete:
             raise IllegalMoveError('A trick can have at most 4 cards')
-        if player in self.played_cards:
+        if player in self.__played_cards:
             raise IllegalMoveError('A player can only play once per trick')
-        self.played_cards[player] = card
-
-    @cached_property
-    def winner(self) -> Player:
-        if not self.__is_complete():
-            raise IllegalMoveError('Should not determine the winner of an incomplete trick')
-        played_card_list = list(self.played_cards.items())
-        best_player, _ = played_card_list[0]
-        for player, card in played_card_list[1:]:
-            if card.beats(self.played_cards[best_player], served=self.served, trump=self.trump):
-                best_player = player
-        return best_player
-
-    @cached_property
-    def points(self) -> int:
-        if not self.__is_complete():
-            raise IllegalMoveError('Should not compute points of an incomplete trick')
-        points = sum([c.points(self.trump) for c in self.played_cards.values()])
-        return points
+        if len(self.__played_cards) == 0:
+            self.__served = card.suit
+
+        self.__played_cards[player] = card
+        self.__mask |= bb.bit(card.order_value)
+        self.__points += tables.points(card.order_value, self.__trump.order_value)
+
+        strength = tables.strength(card.order_value, self.__served.order_value, self.__trump.order_value)
+        if not self.__bests or strength > self.__bests[-1][2]:
+            self.__bests.append((player, card, strength))
+        else:
+            self.__bests.append(self.__bests[-1])
 
-    def __is_complete(self) -> bool:
-        return len(self.played_cards) == 4
+    def remove_last_card(self) -> Tuple[Player, Card]:
+        """Undoes the last `add_card` and returns the player and the card removed"""
+        if len(self.__played_cards) == 0:
+            raise IllegalMoveError('Cannot remove a card from an empty trick')
+        player, card = self.__played_cards.popitem(last=True)
+        self.__mask &= ~bb.bit(card.order_value)
+        self.__points -= tables.points(card.order_value, self.__trump.order_value)
+        self.__bests.pop()
+        if len(self.__played_cards) == 0:
+            self.__served = None
+        return player, card
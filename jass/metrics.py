@@ -0,0 +1,351 @@
+"""
+Metrics of long runs: counters, gauges and histograms kept in a registry, which can be served in the Prometheus text
+format from localhost (`MetricsServer`) and/or written to a rotated file of JSON lines (`RollingFileWriter`).
+
+    metrics = GameMetrics()
+    with MetricsServer(port=9100), RollingFileWriter('metrics.jsonl', interval=10):
+        Game(agents, metrics=metrics).start()
+
+Updating a metric is a lock and an addition, cheap enough to leave them on.
+"""
+import bisect
+import json
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from logging.handlers import RotatingFileHandler
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+
+def exponential_buckets(start: float, factor: float, count: int) -> List[float]:
+    """`count` bucket upper bounds from `start` on, each `factor` times the previous one"""
+    return [start * factor ** i for i in range(count)]
+
+
+def _format_labels(labels: Dict[str, str], **extra: str) -> str:
+    labels = {**labels, **extra}
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{value}"' for key, value in sorted(labels.items())) + '}'
+
+
+class Counter:
+    """Value which only goes up, e.g. a number of games or a total duration"""
+    type = 'counter'
+
+    def __init__(self, name: str, help: str = '', labels: Optional[Dict[str, str]] = None):
+        self.name = name
+        self.help = help
+        self.labels = dict(labels or {})
+        self.value = 0.0
+        self.__lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self.__lock:
+            self.value += amount
+
+    def samples(self) -> List[Tuple[str, float]]:
+        return [(self.name + _format_labels(self.labels), self.value)]
+
+
+class Gauge:
+    """Value which goes up and down, e.g. the size of a replay memory"""
+    type = 'gauge'
+
+    def __init__(self, name: str, help: str = '', labels: Optional[Dict[str, str]] = None):
+        self.name = name
+        self.help = help
+        self.labels = dict(labels or {})
+        self.value = 0.0
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def samples(self) -> List[Tuple[str, float]]:
+        return [(self.name + _format_labels(self.labels), self.value)]
+
+
+class Histogram:
+    """
+    Distribution of observed values: number of values in each bucket (given by its upper bound, the last bucket going
+    to +inf), with their count and sum. Percentiles are estimated by interpolation within the buckets.
+    """
+    type = 'histogram'
+
+    def __init__(self, name: str, buckets: Sequence[float], help: str = '', labels: Optional[Dict[str, str]] = None):
+        self.name = name
+        self.help = help
+        self.labels = dict(labels or {})
+        self.buckets = sorted(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.__lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        idx = bisect.bisect_left(self.buckets, value)
+        with self.__lock:
+            self.counts[idx] += 1
+            self.count += 1
+            self.sum += value
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def percentile(self, q: float) -> float:
+        """Estimated value below which a fraction `q` of the values fall"""
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        cumulated = 0
+        for idx, n in enumerate(self.counts):
+            if n and cumulated + n >= rank:
+                if idx == len(self.buckets):  # the +inf bucket has no upper bound
+                    return self.buckets[-1]
+                lower = self.buckets[idx - 1] if idx else 0.0
+                return lower + (self.buckets[idx] - lower) * (rank - cumulated) / n
+            cumulated += n
+        return self.buckets[-1]
+
+    def reset(self) -> None:
+        with self.__lock:
+            self.counts = [0] * (len(self.buckets) + 1)
+            self.count = 0
+            self.sum = 0.0
+
+    def samples(self) -> List[Tuple[str, float]]:
+        """Cumulative buckets, sum and count, as in the Prometheus format"""
+        samples = []
+        cumulated = 0
+        for bound, n in zip(self.buckets + [float('inf')], self.counts):
+            cumulated += n
+            le = '+Inf' if bound == float('inf') else f'{bound:g}'
+            samples.append((self.name + '_bucket' + _format_labels(self.labels, le=le), cumulated))
+        samples.append((self.name + '_sum' + _format_labels(self.labels), self.sum))
+        samples.append((self.name + '_count' + _format_labels(self.labels), self.count))
+        return samples
+
+    def __str__(self) -> str:
+        return (f'{self.name}: n={self.count} mean={self.mean:.4g} p50={self.percentile(.5):.4g} '
+                f'p90={self.percentile(.9):.4g} p99={self.percentile(.99):.4g}')
+
+
+Metric = Union[Counter, Gauge, Histogram]
+
+
+class Registry:
+    """Metrics by name and labels, getting a metric creates it the first time"""
+
+    def __init__(self):
+        self.__metrics: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], Metric] = {}
+        self.__lock = threading.Lock()
+
+    def counter(self, name: str, help: str = '', **labels: str) -> Counter:
+        return self.__get(Counter, name, help=help, labels=labels)
+
+    def gauge(self, name: str, help: str = '', **labels: str) -> Gauge:
+        return self.__get(Gauge, name, help=help, labels=labels)
+
+    def histogram(self, name: str, buckets: Sequence[float], help: str = '', **labels: str) -> Histogram:
+        return self.__get(Histogram, name, buckets=buckets, help=help, labels=labels)
+
+    def register(self, metric: Metric) -> Metric:
+        """Adds a metric created elsewhere (e.g. the histograms of an `InferenceBroker`)"""
+        with self.__lock:
+            self.__metrics[metric.name, tuple(sorted(metric.labels.items()))] = metric
+        return metric
+
+    @property
+    def metrics(self) -> List[Metric]:
+        with self.__lock:
+            return list(self.__metrics.values())
+
+    def render(self) -> str:
+        """Prometheus text exposition format"""
+        lines = []
+        described = set()
+        for metric in sorted(self.metrics, key=lambda m: m.name):
+            if metric.name not in described:
+                described.add(metric.name)
+                if metric.help:
+                    lines.append(f'# HELP {metric.name} {metric.help}')
+                lines.append(f'# TYPE {metric.name} {metric.type}')
+            lines += [f'{name} {value}' for name, value in metric.samples()]
+        return '\n'.join(lines) + '\n'
+
+    def snapshot(self) -> Dict[str, float]:
+        """Value of the counters and gauges, count, mean and percentiles of the histograms"""
+        values = {}
+        for metric in self.metrics:
+            key = metric.name + _format_labels(metric.labels)
+            if isinstance(metric, Histogram):
+                values.update({f'{key}_count': metric.count, f'{key}_mean': metric.mean,
+                               **{f'{key}_p{round(q * 100)}': metric.percentile(q) for q in (.5, .9, .99)}})
+            else:
+                values[key] = metric.value
+        return values
+
+    def __get(self, metric_type, name: str, labels: Dict[str, str], **kwargs) -> Metric:
+        key = name, tuple(sorted(labels.items()))
+        with self.__lock:
+            metric = self.__metrics.get(key)
+            if metric is None:
+                metric = self.__metrics[key] = metric_type(name, labels=labels, **kwargs)
+        assert isinstance(metric, metric_type), f'{name} is a {metric.type}'
+        return metric
+
+
+REGISTRY = Registry()
+
+
+###############
+# INSTRUMENTS #
+###############
+
+class GameMetrics:
+    """Games, rounds and cards played and the time spent in the agents and in the game engine, see `Game`"""
+
+    def __init__(self, registry: Registry = REGISTRY, **labels: str):
+        self.games = registry.counter('jass_games_total', 'games played', **labels)
+        self.rounds = registry.counter('jass_rounds_total', 'rounds played', **labels)
+        self.cards = registry.counter('jass_cards_total', 'cards played', **labels)
+        self.agent_seconds = registry.counter('jass_agent_seconds_total', 'seconds spent in the agents', **labels)
+        self.engine_seconds = registry.counter('jass_engine_seconds_total', 'seconds spent in the game engine',
+                                               **labels)
+        self.round_seconds = registry.histogram('jass_round_seconds', exponential_buckets(1e-4, 2, 16),
+                                                'duration of a round', **labels)
+
+    def round_played(self, seconds: float, agent_seconds: float, n_cards: int) -> None:
+        self.rounds.inc()
+        self.cards.inc(n_cards)
+        self.agent_seconds.inc(agent_seconds)
+        self.engine_seconds.inc(seconds - agent_seconds)
+        self.round_seconds.observe(seconds)
+
+    def game_played(self) -> None:
+        self.games.inc()
+
+
+class LearnerMetrics:
+    """Optimization steps of a learning agent: duration, replay memory size, loss and exploration rate"""
+
+    def __init__(self, registry: Registry = REGISTRY, **labels: str):
+        self.steps = registry.counter('jass_optimize_steps_total', 'optimization steps', **labels)
+        self.step_seconds = registry.histogram('jass_optimize_seconds', exponential_buckets(1e-4, 2, 16),
+                                               'duration of an optimization step', **labels)
+        self.replay_size = registry.gauge('jass_replay_size', 'transitions in the replay memory', **labels)
+        self.loss = registry.gauge('jass_loss', 'loss of the last optimization step', **labels)
+        self.epsilon = registry.gauge('jass_epsilon', 'exploration rate of the epsilon greedy policy', **labels)
+
+    def step(self, seconds: float, replay_size: int, loss: float, epsilon: Optional[float] = None) -> None:
+        self.steps.inc()
+        self.step_seconds.observe(seconds)
+        self.replay_size.set(replay_size)
+        self.loss.set(loss)
+        if epsilon is not None:
+            self.epsilon.set(epsilon)
+
+
+###########
+# OUTPUTS #
+###########
+
+class MetricsServer:
+    """Serves the metrics of `registry` in the Prometheus text format at http://`host`:`port`/metrics"""
+
+    def __init__(self, registry: Registry = REGISTRY, port: int = 9100, host: str = '127.0.0.1'):
+        metrics = registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.__server = ThreadingHTTPServer((host, port), Handler)
+        self.__server.daemon_threads = True
+        self.port = self.__server.server_address[1]  # the one picked by the system if `port` is 0
+        self.__thread: Optional[threading.Thread] = None
+
+    def start(self) -> 'MetricsServer':
+        self.__thread = threading.Thread(target=self.__server.serve_forever, daemon=True)
+        self.__thread.start()
+        return self
+
+    def close(self) -> None:
+        if self.__thread is not None:
+            self.__server.shutdown()
+            self.__thread.join()
+            self.__thread = None
+        self.__server.server_close()
+
+    def __enter__(self) -> 'MetricsServer':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class RollingFileWriter:
+    """
+    Appends a snapshot of `registry` to `path` every `interval` seconds, one JSON object per line with the time, the
+    values (see `Registry.snapshot`) and the rate per second of each counter since the previous line. The file is
+    rotated when it reaches `max_bytes` (`path`.1, `path`.2... up to `backups` old files).
+    """
+
+    def __init__(self, path: str, registry: Registry = REGISTRY, interval: float = 10.0,
+                 max_bytes: int = 10 * 2 ** 20, backups: int = 5):
+        self.registry = registry
+        self.interval = interval
+        self.__handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups)
+        self.__previous: Optional[Tuple[float, Dict[str, float]]] = None
+        self.__stop = threading.Event()
+        self.__thread: Optional[threading.Thread] = None
+
+    def write(self) -> None:
+        now = time.time()
+        counters = {name: value for metric in self.registry.metrics if isinstance(metric, Counter)
+                    for name, value in metric.samples()}
+        rates = {}
+        if self.__previous is not None:
+            then, previous = self.__previous
+            rates = {name: (value - previous.get(name, 0.0)) / max(now - then, 1e-9)
+                     for name, value in counters.items()}
+        self.__previous = now, counters
+        line = json.dumps({'time': now, 'values': self.registry.snapshot(), 'rates': rates})
+        self.__handler.emit(logging.makeLogRecord({'msg': line}))
+
+    def start(self) -> 'RollingFileWriter':
+        self.__stop.clear()
+        self.__thread = threading.Thread(target=self.__run, daemon=True)
+        self.__thread.start()
+        return self
+
+    def close(self) -> None:
+        if self.__thread is not None:
+            self.__stop.set()
+            self.__thread.join()
+            self.__thread = None
+        self.write()
+        self.__handler.close()
+
+    def __run(self) -> None:
+        while not self.__stop.wait(self.interval):
+            self.write()
+
+    def __enter__(self) -> 'RollingFileWriter':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -1,5 +1,8 @@
-from typing import Any, Type
+import copy
+import os
+from typing import Type, Union
 
+import torch
 from torch import nn
 
 from jass.agents.state import State
@@ -17,18 +20,53 @@ class LinearDQN(nn.Module):
         inputs = [in_size] + list(layers_size[:-1])
         outputs = list(layers_size)
 
-        self.net = nn.ModuleList()
+        layers = []
         for in_layer, out_layer in zip(inputs, outputs):
-            self.net.extend([
+            layers.extend([
                 nn.Linear(in_layer, out_layer),
                 # nn.BatchNorm1d(out_layer),
                 nn.ReLU()
             ])
 
         # last layer has not BN nor ReLU
-        self.net.append(nn.Linear(layers_size[-1], out_size))
+        layers.append(nn.Linear(layers_size[-1], out_size))
+        self.net = nn.Sequential(*layers)  # state dict keys are net.0.weight, net.0.bias, net.2.weight...
 
     # Called with either one element to determine next action, or a batch
     # during optimization.
-    def forward(self, x):  # ModuleList can act as an iterable, or be indexed using ints
-        return nn.Sequential(*list(self.net))(x.float())
+    def forward(self, x):
+        return self.net(x.float())
+
+    def frozen(self, script: bool = False, quantize: bool = False) -> 'FrozenDQN':
+        """Copy of the network for inference only, see `FrozenDQN`"""
+        return FrozenDQN(self, script=script, quantize=quantize)
+
+
+class FrozenDQN(nn.Module):
+    """
+    Snapshot of a network for acting only: no gradients, evaluation mode, called under `torch.inference_mode`.
+    Optionally its Linear layers are quantized to int8 (weights quantized once, activations on the fly) and it is
+    traced and frozen with TorchScript, in which case it can be saved and loaded without the python code.
+    """
+
+    def __init__(self, model: LinearDQN, script: bool = False, quantize: bool = False):
+        super().__init__()
+        example = torch.zeros(1, model.net[0].in_features, device=next(model.parameters()).device)
+        module = copy.deepcopy(model).eval()
+        for param in module.parameters():
+            param.requires_grad_(False)
+        if quantize:
+            module = torch.ao.quantization.quantize_dynamic(module, {nn.Linear}, dtype=torch.qint8)
+        if script:
+            module = torch.jit.freeze(torch.jit.trace(module, example))
+        self.module = module
+        self.scripted = script
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        with torch.inference_mode():
+            return self.module(x)
+
+    def save(self, path: Union[str, os.PathLike]) -> None:
+        """Saves the TorchScript module, to be loaded with `torch.jit.load`"""
+        assert self.scripted, 'only scripted networks can be saved, use the state dict of the original one otherwise'
+        torch.jit.save(self.module, path)
@@ -0,0 +1,210 @@
+"""
+Plays many games between two teams of agents on all the cores of the machine.
+
+    python -m jass.tournament --agents jass.agents.impl.greedy_agent:GreedyAgent \
+        jass.agents.impl.random_agent:RandomAgent --games 1000 --seed 0
+
+Team A is made of the first and third agents, team B of the second and fourth (with only two agents given, each
+plays both seats of its team). Seats are swapped every other game and both games of a pair get the same deals,
+from `DealStream(seed, stream_id=pair index)`, which cancels the luck of the deals and the advantage of a seat. The
+`random` module is seeded from (seed, game index) before each game, so agents drawing from it replay their games too.
+"""
+import argparse
+import importlib
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, List, NamedTuple, Optional, Sequence, Tuple
+
+from jass.agents.agent import Agent
+from jass.logic.deck import Deck
+from jass.logic.game import Game, GOAL
+
+AgentFactory = Callable[[], Agent]
+
+Z_95 = 1.959963984540054
+
+
+class GameResult(NamedTuple):
+    game_idx: int
+    scores: Tuple[int, int]  # team A, team B
+    rounds: int
+    duration: float  # seconds
+
+    @property
+    def winner(self) -> int:
+        return 0 if self.scores[0] > self.scores[1] else 1
+
+    @property
+    def score_diff(self) -> int:
+        return self.scores[0] - self.scores[1]
+
+
+class TournamentSummary:
+    def __init__(self):
+        self.n_games = 0
+        self.wins = [0, 0]
+        self.rounds = 0
+        self.__diff_sum = 0.
+        self.__diff_sq_sum = 0.
+
+    def add(self, result: GameResult) -> None:
+        self.n_games += 1
+        self.wins[result.winner] += 1
+        self.rounds += result.rounds
+        self.__diff_sum += result.score_diff
+        self.__diff_sq_sum += result.score_diff ** 2
+
+    @property
+    def win_rate(self) -> float:
+        """Win rate of team A"""
+        return self.wins[0] / self.n_games if self.n_games > 0 else math.nan
+
+    @property
+    def win_rate_ci(self) -> Tuple[float, float]:
+        """95% Wilson score interval of the win rate of team A"""
+        n = self.n_games
+        if n == 0:
+            return math.nan, math.nan
+        p = self.win_rate
+        center = (p + Z_95 ** 2 / (2 * n)) / (1 + Z_95 ** 2 / n)
+        margin = Z_95 / (1 + Z_95 ** 2 / n) * math.sqrt(p * (1 - p) / n + Z_95 ** 2 / (4 * n ** 2))
+        return center - margin, center + margin
+
+    @property
+    def mean_score_diff(self) -> float:
+        """Mean of team A score minus team B score"""
+        return self.__diff_sum / self.n_games if self.n_games > 0 else math.nan
+
+    @property
+    def score_diff_ci(self) -> Tuple[float, float]:
+        """95% (normal approximation) confidence interval of the mean score difference"""
+        n = self.n_games
+        if n < 2:
+            return math.nan, math.nan
+        variance = (self.__diff_sq_sum - n * self.mean_score_diff ** 2) / (n - 1)
+        margin = Z_95 * math.sqrt(max(variance, 0.) / n)
+        return self.mean_score_diff - margin, self.mean_score_diff + margin
+
+    def __str__(self):
+        low, high = self.win_rate_ci
+        diff_low, diff_high = self.score_diff_ci
+        return f'{self.n_games} games ({self.rounds} rounds), ' \
+               f'team A wins {self.wins[0]} - team B wins {self.wins[1]}\n' \
+               f'team A win rate: {self.win_rate:.3f} (95% CI [{low:.3f}, {high:.3f}])\n' \
+               f'mean score difference: {self.mean_score_diff:.1f} (95% CI [{diff_low:.1f}, {diff_high:.1f}])'
+
+
+##########
+# WORKER #
+##########
+
+_agents: List[Agent] = []
+
+
+def _init_worker(factories: Sequence[AgentFactory]) -> None:
+    global _agents
+    _agents = [factory() for factory in factories]
+
+
+def _play_game(game_idx: int, seed: int, goal: int, swap_seats: bool) -> GameResult:
+    start = time.perf_counter()
+    random.seed((seed << 32) + game_idx)  # whichever worker plays the game
+    swapped = swap_seats and game_idx % 2 == 1
+    # swapped -> team A sits on seats 1 and 3
+    agents = _agents[-1:] + _agents[:-1] if swapped else _agents
+    game = Game(
+        agents=agents,
+        names=[f'{"AB"[(seat + swapped) % 2]}{seat}' for seat in range(4)],
+        goal=goal,
+        deck=Deck(seed=seed, stream_id=game_idx // 2 if swap_seats else game_idx),  # same deals for a swapped pair
+    )
+    game.start()
+    scores = tuple(team.score for team in game.teams)
+    return GameResult(
+        game_idx=game_idx,
+        scores=scores[::-1] if swapped else scores,
+        rounds=game.round_idx + 1,
+        duration=time.perf_counter() - start,
+    )
+
+
+##########
+# RUNNER #
+##########
+
+def run_tournament(factories: Sequence[AgentFactory], n_games: int, seed: int = 0, goal: int = GOAL,
+                   workers: Optional[int] = None, swap_seats: bool = True,
+                   on_result: Callable[[GameResult, TournamentSummary], None] = None) -> TournamentSummary:
+    """
+    Plays `n_games` games, spread over `workers` processes (all the cores by default, in this process if 0).
+    Each worker builds its own agents from the factories (which must be picklable, e.g. module level functions or
+    agent classes), `on_result` is called as soon as each game is over.
+    """
+    if len(factories) == 2:
+        factories = list(factories) * 2
+    assert len(factories) == 4, 'need 2 (one per team) or 4 (one per seat) agent factories'
+
+    summary = TournamentSummary()
+
+    def add(result: GameResult):
+        summary.add(result)
+        if on_result is not None:
+            on_result(result, summary)
+
+    if workers == 0:
+        _init_worker(factories)
+        for game_idx in range(n_games):
+            add(_play_game(game_idx, seed, goal, swap_seats))
+        return summary
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(factories,)) as executor:
+        futures = [executor.submit(_play_game, game_idx, seed, goal, swap_seats) for game_idx in range(n_games)]
+        for future in as_completed(futures):
+            add(future.result())
+    return summary
+
+
+def import_factory(path: str) -> AgentFactory:
+    """'package.module:name' -> the object `name` of `package.module`"""
+    module_name, _, attr = path.partition(':')
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def main(args: Sequence[str] = None) -> None:
+    parser = argparse.ArgumentParser(prog='python -m jass.tournament', description=__doc__.split('\n\n')[0])
+    parser.add_argument('--agents', nargs='+', required=True,
+                        help='2 or 4 agent factories as module:name, e.g. jass.agents.impl.random_agent:RandomAgent')
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--goal', type=int, default=GOAL)
+    parser.add_argument('--workers', type=int, default=None, help='number of processes (default: all cores)')
+    parser.add_argument('--no-swap', action='store_true', help='do not swap seats every other game')
+    parser.add_argument('--report-every', type=int, default=100)
+    parsed = parser.parse_args(args)
+
+    start = time.perf_counter()
+
+    def report(result: GameResult, summary: TournamentSummary):
+        if summary.n_games % parsed.report_every == 0 and summary.n_games < parsed.games:
+            low, high = summary.win_rate_ci
+            print(f'[{summary.n_games}/{parsed.games}] team A win rate {summary.win_rate:.3f} '
+                  f'[{low:.3f}, {high:.3f}], mean score difference {summary.mean_score_diff:.1f}')
+
+    summary = run_tournament(
+        factories=[import_factory(path) for path in parsed.agents],
+        n_games=parsed.games,
+        seed=parsed.seed,
+        goal=parsed.goal,
+        workers=parsed.workers,
+        swap_seats=not parsed.no_swap,
+        on_result=report,
+    )
+    elapsed = time.perf_counter() - start
+    print(summary)
+    print(f'{summary.n_games / elapsed:.2f} games/s, {summary.rounds / elapsed:.1f} rounds/s')
+
+
+if __name__ == '__main__':
+    main()
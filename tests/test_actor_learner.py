@@ -0,0 +1,94 @@
+import queue
+import random
+from unittest import TestCase
+
+import numpy as np
+import torch
+
+from jass.actor_learner import ActorAgent, Learner, SharedWeights
+from jass.agents.impl.dqn_agent import DQNAgent, EPS_START, EPS_END
+from jass.agents.impl.random_agent import RandomAgent
+from jass.logic.deck import Deck
+from jass.logic.game import Game
+from jass.metrics import GameMetrics, LearnerMetrics, Registry
+from jass.models.linear_dqn import LinearDQN
+from jass.agents.state import PlayCardState
+
+
+def failing_opponent():
+    raise ValueError('no opponent')
+
+
+class ActorAgentTest(TestCase):
+
+    def test_transitions_and_weights(self):
+        random.seed(0)
+        weights = SharedWeights()
+        transitions = queue.Queue()
+        actor = ActorAgent(weights, transitions, chunk_size=10)
+        self.assertEqual(actor.version, 0)
+        game = Game([actor, RandomAgent(), RandomAgent(), RandomAgent()], goal=300, deck=Deck(seed=0))
+        weights.publish(LinearDQN.for_state(PlayCardState))  # swapped in at the end of the first round
+        game.start()
+        actor.flush()
+        self.assertEqual(actor.version, 1)
+        self.assertTrue(torch.equal(actor.policy_net.net[0].weight, weights.net.net[0].weight))
+
+        records = np.concatenate([transitions.get_nowait() for _ in range(transitions.qsize())])
+        # one per card chosen (the last one of a round is played automatically), none between rounds, the game may
+        # end during the last round
+        n_rounds = int(records['done'].sum())
+        self.assertGreater(n_rounds, 0)
+        self.assertTrue(np.array_equal(np.flatnonzero(records['done']), np.arange(7, 8 * n_rounds, 8)))
+        self.assertLess(len(records), 8 * (n_rounds + 1))
+
+    def test_games_in_a_row(self):
+        random.seed(1)
+        transitions = queue.Queue()
+        actor = ActorAgent(SharedWeights(), transitions)
+        deck = Deck(seed=1)
+        for _ in range(3):
+            actor.new_game()
+            Game([actor, RandomAgent(), RandomAgent(), RandomAgent()], goal=300, deck=deck).start()
+        actor.flush()
+
+        records = np.concatenate([transitions.get_nowait() for _ in range(transitions.qsize())])
+        # the positions of the ones of the hand encoding, padded with tensor_size
+        hand = range(8, 8 + 36)
+        n_cards = [np.isin(records[name], hand).sum(axis=1) for name in ('state', 'next_state')]
+        not_done = records['done'] == 0
+        self.assertGreater(not_done.sum(), 0)
+        # a transition which is not final goes to the next card of the same round, never to another game
+        self.assertTrue(np.array_equal(n_cards[1][not_done], n_cards[0][not_done] - 1))
+
+
+class LearnerTest(TestCase):
+
+    def test_train(self):
+        game_metrics = GameMetrics(Registry())
+        with Learner(n_actors=2, goal=300, publish_every=5, mp_context='fork', game_metrics=game_metrics) as learner:
+            learner.train(10)
+        self.assertEqual(learner.n_steps, 10)
+        self.assertGreaterEqual(learner.n_transitions, len(learner.agent.memory))
+        self.assertGreaterEqual(len(learner.agent.memory), 128)
+        self.assertEqual(learner.weights.version.value, 1 + 2)
+        self.assertTrue(torch.equal(learner.weights.net.net[0].weight, learner.agent.policy_net.net[0].weight))
+        # the games of the actors are counted by the learner
+        self.assertGreater(learner.n_games, 0)
+        self.assertEqual(game_metrics.games.value, learner.n_games)
+        self.assertGreaterEqual(game_metrics.rounds.value, learner.n_games)
+        self.assertGreater(game_metrics.cards.value, 0)
+
+    def test_exploration_rate(self):
+        agent = DQNAgent(train=True, metrics=LearnerMetrics(Registry()))
+        with Learner(n_actors=1, agent=agent, goal=300, mp_context='fork') as learner:
+            learner.train(5)
+        self.assertGreater(learner.n_games, 0)
+        # the rate of the actors, the learner does not act
+        self.assertLess(agent.metrics.epsilon.value, EPS_START)
+        self.assertGreater(agent.metrics.epsilon.value, EPS_END)
+
+    def test_failed_actors(self):
+        with Learner(n_actors=2, opponent=failing_opponent, mp_context='fork') as learner:
+            with self.assertRaisesRegex(RuntimeError, r'actor \d .* died with exit code 1'):
+                learner.train(1)
@@ -0,0 +1,69 @@
+from unittest import TestCase
+
+import numpy as np
+
+from jass.logic import bitboard as bb
+from jass.logic.batch_game import BatchGame, random_policy, heuristic_policy, random_trump_policy, unpack
+from jass.logic.card import Card, Suit
+
+
+class BatchGameTest(TestCase):
+
+    def test_legal_moves(self):
+        game = BatchGame(200, seed=1)
+        for policy in [random_policy, heuristic_policy]:
+            game.deal()
+            game.choose_trump(random_trump_policy)
+            for _ in range(36):
+                legal = game.legal_mask()
+                hands = game.hands[game.rows, game.seat]
+                for i in range(game.n):
+                    expected = bb.playable_mask(
+                        hand=int(hands[i]),
+                        table=[int(c) for c in game.trick[i, :game.trick_size]],
+                        trump=int(game.trump[i]),
+                    )
+                    self.assertEqual(int(legal[i]), expected)
+                game.step(policy)
+            self.assertTrue((game.hands == 0).all())
+
+    def test_unpack(self):
+        masks = np.array([bb.FULL_MASK, 0, bb.mask_of([0, 9, 35])], dtype=np.uint64)
+        self.assertEqual(unpack(masks).tolist(), [
+            [True] * 36,
+            [False] * 36,
+            [i in (0, 9, 35) for i in range(36)],
+        ])
+
+    def test_points(self):
+        game = BatchGame(300, seed=2)
+        for _ in range(3):
+            points = game.play_round([heuristic_policy, random_policy, random_policy, heuristic_policy])
+            self.assertTrue(np.isin(points.sum(axis=1), [157, 257]).all())
+
+            for i in range(game.n):
+                trump = Suit[int(game.trump[i])]
+                expected = [0, 0]
+                winners = []
+                leader = int(game.trick_leaders[i, 0])
+                for trick_idx in range(9):
+                    cards = [Card[int(c)] for c in game.tricks[i, trick_idx]]
+                    best = 0
+                    for pos, card in enumerate(cards[1:], start=1):
+                        if card.beats(cards[best], served=cards[0].suit, trump=trump):
+                            best = pos
+                    winner = (leader + best) % 4
+                    winners.append(winner % 2)
+                    expected[winner % 2] += sum(c.points(trump) for c in cards)
+                    leader = winner
+                expected[winners[-1]] += 5
+                if len(set(winners)) == 1:
+                    expected[winners[-1]] += 100
+                self.assertEqual(points[i].tolist(), expected)
+        self.assertEqual(game.rounds, 3)
+        self.assertTrue((game.scores.sum(axis=1) >= 3 * 157).all())
+
+    def test_round_points_kept(self):
+        game = BatchGame(50, seed=3)
+        rounds = [game.play_round(random_policy) for _ in range(3)]
+        self.assertTrue((sum(rounds) == game.scores).all())  # not overwritten by the following rounds
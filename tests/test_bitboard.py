@@ -0,0 +1,128 @@
+from unittest import TestCase
+
+from jass.logic import bitboard as bb
+from jass.logic.card import Card, Suit, Rank
+from jass.logic.hand import Hand
+
+
+def mask(*cards: Card) -> int:
+    return bb.mask_of(c.order_value for c in cards)
+
+
+def idx(*cards: Card):
+    return [c.order_value for c in cards]
+
+
+class BitboardTest(TestCase):
+
+    def test_indices(self):
+        cards = [Card(6, Suit.diamonds), Card(Rank.jack, Suit.hearts), Card(Rank.ace, Suit.clubs)]
+        self.assertEqual(bb.indices_of(mask(*cards)), idx(*cards))
+        self.assertEqual(bb.count(mask(*cards)), 3)
+        self.assertEqual(bb.count(bb.FULL_MASK), 36)
+        for suit in Suit:
+            self.assertEqual(bb.indices_of(bb.SUIT_MASKS[suit.order_value]),
+                             sorted(c.order_value for c in Card if c.suit is suit))
+
+    def test_stronger_trumps(self):
+        for trump in Suit:
+            self.assertEqual(bb.STRONGER_TRUMPS[Card(Rank.jack, trump).order_value], 0)
+            self.assertEqual(bb.STRONGER_TRUMPS[Card(9, trump).order_value], mask(Card(Rank.jack, trump)))
+            for card in Card:
+                if card.suit is trump:
+                    beaten_by = [c for c in Card if c.suit is trump and c != card
+                                 and c.beats(card, served=trump, trump=trump)]
+                    self.assertEqual(bb.STRONGER_TRUMPS[card.order_value], mask(*beaten_by))
+
+    def test_first_to_play(self):
+        hand = mask(*list(Card)[:9])
+        self.assertEqual(bb.playable_mask(hand, [], Suit.clubs.order_value), hand)
+
+    def test_trump_jack_exempt(self):
+        trump = Suit.hearts
+        jack = Card(Rank.jack, trump)
+        hand = mask(jack, Card(6, Suit.spades), Card(Rank.ace, Suit.clubs))
+        table = idx(Card(7, trump))
+        self.assertEqual(bb.playable_mask(hand, table, trump.order_value), hand)
+
+        hand |= mask(Card(8, trump))
+        self.assertEqual(bb.playable_mask(hand, table, trump.order_value), mask(jack, Card(8, trump)))
+
+    def test_must_over_trump(self):
+        trump = Suit.spades
+        served = Suit.diamonds
+        table = idx(Card(Rank.king, served), Card(Rank.queen, trump))
+        hand = mask(Card(6, served), Card(10, trump), Card(Rank.ace, trump), Card(7, Suit.clubs))
+        self.assertEqual(bb.playable_mask(hand, table, trump.order_value),
+                         mask(Card(6, served), Card(Rank.ace, trump)))
+
+        # cannot serve -> any non trump card or a stronger trump card
+        hand = mask(Card(10, trump), Card(Rank.ace, trump), Card(7, Suit.clubs))
+        self.assertEqual(bb.playable_mask(hand, table, trump.order_value),
+                         mask(Card(Rank.ace, trump), Card(7, Suit.clubs)))
+
+        # only weaker trump cards left -> they can be played
+        hand = mask(Card(10, trump), Card(6, trump))
+        self.assertEqual(bb.playable_mask(hand, table, trump.order_value), hand)
+
+    def test_hand_api(self):
+        cards = list(Card)[:9]
+        hand = Hand(cards)
+        self.assertEqual(hand.mask, mask(*cards))
+        self.assertEqual(sorted(hand.cards), cards)
+        hand.play(cards[0], [], Suit.clubs)
+        self.assertFalse(hand.has(cards[0]))
+        self.assertTrue(hand.has(cards[1]))
+        self.assertEqual(hand.mask, mask(*cards[1:]))
+
+    def test_playable_cache(self):
+        bb.set_playable_cache_size(2)
+        try:
+            trump = Suit.clubs
+            hand = Hand(list(Card)[:9])
+            table = [Card(Rank.ace, Suit.spades)]
+            self.assertEqual(hand.playable_cards(table, trump), hand.cards)  # cannot serve
+            self.assertEqual(hand.playable_cards([], trump), hand.cards)
+            # same hand but a different trick must not reuse the previous entry
+            self.assertEqual(hand.playable_cards([Card(7, Suit.diamonds)], trump), hand.cards)
+            self.assertEqual(hand.playable_cards([Card(7, Suit.diamonds)], Suit.diamonds), hand.cards)
+            hand.play(Card(6, Suit.diamonds), [], trump)
+            self.assertEqual(hand.playable_cards([Card(Rank.jack, Suit.diamonds)], trump),
+                             [c for c in hand.cards if c.suit is Suit.diamonds])
+            self.assertEqual(hand.playable_cards([Card(Rank.jack, Suit.diamonds)], trump),
+                             [c for c in hand.cards if c.suit is Suit.diamonds])
+
+            info = bb.playable_cache_info()
+            self.assertEqual(info.hits, 1)
+            self.assertEqual(info.misses, 6)  # playing a card also checks its legality
+            self.assertEqual(info.currsize, 2)
+        finally:
+            bb.set_playable_cache_size(bb.PLAYABLE_CACHE_SIZE)
+
+    def test_playable_cache_keys(self):
+        """The same hand gets a different entry for each table and trump"""
+        bb.set_playable_cache_size(16)
+        try:
+            diamonds = [Card(rank, Suit.diamonds) for rank in (6, 7, 8, 9, 10)]
+            spades = [Card(rank, Suit.spades) for rank in (6, 7, 8, 9)]
+            hand = Hand(diamonds + spades)
+            spade_led = [Card(Rank.ace, Suit.spades)]
+            cases = [
+                ([], Suit.clubs, diamonds + spades),
+                (spade_led, Suit.clubs, spades),  # must serve
+                (spade_led, Suit.diamonds, diamonds + spades),  # may trump instead
+                ([Card(Rank.ace, Suit.diamonds)], Suit.clubs, diamonds),
+                ([Card(Rank.ace, Suit.hearts)], Suit.clubs, diamonds + spades),  # cannot serve
+                (spade_led + [Card(Rank.queen, Suit.diamonds)], Suit.diamonds,  # no under trumping
+                 [Card(Rank.nine, Suit.diamonds)] + spades),
+            ]
+            for _ in range(2):
+                for table, trump, expected in cases:
+                    self.assertEqual(sorted(hand.playable_cards(table, trump)), sorted(expected), (table, trump))
+
+            info = bb.playable_cache_info()
+            self.assertEqual(info.misses, len(cases))
+            self.assertEqual(info.hits, len(cases))
+            self.assertEqual(info.currsize, len(cases))
+        finally:
+            bb.set_playable_cache_size(bb.PLAYABLE_CACHE_SIZE)
@@ -1,3 +1,5 @@
+import pickle
+from copy import deepcopy
 from random import randint
 from unittest import TestCase
 
@@ -49,6 +51,16 @@ class CardTest(TestCase):
         self.assertEqual(hash(Rank.queen), hash(Rank(12)))
         self.assertEqual(hash(Card(Rank.eight, Suit.hearts)), hash(Card(Rank(8), Suit('♡'))))
 
+    def test_interned(self):
+        for i, card in enumerate(Card):
+            self.assertIs(Card[i], card)
+            self.assertIs(Card(card.rank, card.suit), card)
+            self.assertIs(deepcopy(card), card)
+            self.assertIs(pickle.loads(pickle.dumps(card)), card)
+            self.assertEqual(hash(card), i)
+        self.assertIs(Card('q', 'h'), Card(Rank.queen, Suit.hearts))
+        self.assertNotEqual(Card[0], Card[1])
+
     def test_beats(self):
         def checks(card1, card2, trump, served):
             if card1.suit is trump and card2.suit is not trump:
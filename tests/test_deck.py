@@ -1,7 +1,10 @@
 import random
 from unittest import TestCase
 
-from jass.logic.card import Suit
+import numpy as np
+
+from jass.logic.card import Suit, Card
+from jass.logic.deal import DealStream
 from jass.logic.deck import Deck
 
 
@@ -17,3 +20,40 @@ class DeckTest(TestCase):
         for trump in list(Suit):
             random.shuffle(cards)
             self.assertEqual(sum([card.points(trump) for card in cards]), 152)
+
+    def test_seeded_deck(self):
+        deck1, deck2 = Deck(seed=42), Deck(seed=42)
+        other_stream = Deck(seed=42, stream_id=1)
+        for _ in range(5):
+            cards = list(deck1.shuffle().dealt_cards())
+            self.assertEqual(cards, deck2.shuffle().dealt_cards())
+            self.assertNotEqual(cards, other_stream.shuffle().dealt_cards())
+            self.assertEqual(sorted(cards), list(Card))
+
+        replay = Deck(seed=42, first_deal=3)
+        deck1 = Deck(seed=42)
+        for _ in range(4):
+            deck1.shuffle()
+        self.assertEqual(replay.shuffle().dealt_cards(), deck1.dealt_cards())
+
+
+class DealStreamTest(TestCase):
+
+    def test_bulk(self):
+        stream = DealStream(seed=7, stream_id=3, block_size=100)
+        deals = stream.deals(50, 120)
+        self.assertEqual(deals.shape, (120, 36))
+        self.assertEqual(deals.dtype, np.uint8)
+        self.assertTrue((np.sort(deals, axis=1) == np.arange(36)).all())
+        self.assertEqual(len({d.tobytes() for d in deals}), 120)
+
+        self.assertTrue((DealStream(seed=7, stream_id=3).deals(50, 120) != deals).any())  # other block size
+        self.assertTrue((DealStream(seed=7, stream_id=3, block_size=100).deals(50, 120) == deals).all())
+
+    def test_replay(self):
+        stream = DealStream(seed=1, block_size=10)
+        deals = stream.deals(0, 35)
+        for idx in [0, 9, 10, 34]:
+            self.assertTrue((stream.deal(idx) == deals[idx]).all())
+        for idx, deal in zip(range(35), stream):
+            self.assertTrue((deal == deals[idx]).all())
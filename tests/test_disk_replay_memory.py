@@ -0,0 +1,100 @@
+import os
+import random
+import tempfile
+from unittest import TestCase
+
+import torch
+
+from jass.agents.action import PlayCardAction
+from jass.agents.impl.dqn_agent import DQNAgent
+from jass.agents.state import PlayCardState, ChooseTrumpState
+from jass.agents.util.disk_replay_memory import DiskReplayMemory
+from jass.agents.util.replay_memory import SARS, TensorReplayMemory, encode_transitions
+from tests.test_replay_memory import random_states
+
+
+class DiskReplayMemoryTest(TestCase):
+    def setUp(self) -> None:
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'replay.bin')
+        states = random_states(40, random.Random(0))
+        self.transitions = [
+            SARS(state, PlayCardAction(state.playable_cards[0]), i, None if i % 4 == 3 else next_state)
+            for i, (state, next_state) in enumerate(zip(states, states[1:]))
+        ]
+
+    def tearDown(self) -> None:
+        self.dir.cleanup()
+
+    def assertSameBatch(self, batch, expected):
+        for name in ('states', 'actions', 'rewards', 'next_states', 'dones', 'next_masks', 'indices'):
+            self.assertTrue(torch.equal(getattr(batch, name), getattr(expected, name)), name)
+
+    def test_same_as_tensor_memory(self):
+        """Transitions in RAM, in the file and overwritten in the ring are sampled as from a TensorReplayMemory"""
+        expected = TensorReplayMemory(capacity=25, state_type=PlayCardState)
+        with DiskReplayMemory(self.path, capacity=25, state_type=PlayCardState, hot_size=10, prefetch=0) as memory:
+            for n, sars in enumerate(self.transitions, 1):
+                memory.push(sars)
+                expected.push(sars)
+                self.assertEqual(len(memory), len(expected))
+                self.assertEqual(memory.position, expected.position)
+                if n % 7 == 0:
+                    batch = memory.sample(32)
+                    self.assertSameBatch(batch, expected.gather(batch.indices))
+                    self.assertTrue(torch.equal(batch.weights, torch.ones(32)))
+
+    def test_persistence(self):
+        memory = DiskReplayMemory(self.path, capacity=50, state_type=PlayCardState, hot_size=8, prefetch=0)
+        for sars in self.transitions[:30]:
+            memory.push(sars)
+        memory.close()
+
+        memory = DiskReplayMemory(self.path, capacity=50, state_type=PlayCardState, prefetch=0)
+        self.assertEqual((len(memory), memory.position), (30, 30))
+        for sars in self.transitions[30:]:
+            memory.push(sars)
+        batch = memory.sample(64)
+        rewards = [self.transitions[i].reward for i in batch.indices.tolist()]
+        self.assertEqual(batch.rewards.tolist(), rewards)
+        memory.close()
+
+        with self.assertRaises(ValueError):
+            DiskReplayMemory(self.path, capacity=50, state_type=ChooseTrumpState)
+        with self.assertRaises(ValueError):
+            DiskReplayMemory(self.path, capacity=60, state_type=PlayCardState)
+
+    def test_prefetch(self):
+        with DiskReplayMemory(self.path, capacity=100, state_type=PlayCardState, hot_size=16, prefetch=2) as memory:
+            for sars in self.transitions:
+                memory.push(sars)
+            for batch_size in (8, 8, 5):
+                batch = memory.sample(batch_size)
+                self.assertEqual(batch.states.shape, (batch_size, PlayCardState.tensor_size))
+                rewards = [self.transitions[i].reward for i in batch.indices.tolist()]
+                self.assertEqual(batch.rewards.tolist(), rewards)
+
+    def test_prefetch_error(self):
+        with DiskReplayMemory(self.path, capacity=10, state_type=PlayCardState, prefetch=2) as memory:
+            with self.assertRaises(ValueError):  # empty, raised in the prefetching thread
+                memory.sample(4)
+            memory.push(self.transitions[0])
+            self.assertEqual(memory.sample(4).rewards.tolist(), [0] * 4)
+
+    def test_push_records(self):
+        expected = TensorReplayMemory(capacity=30, state_type=PlayCardState)
+        with DiskReplayMemory(self.path, capacity=30, state_type=PlayCardState, hot_size=8, prefetch=0) as memory:
+            for start in range(0, len(self.transitions), 13):
+                chunk = self.transitions[start:start + 13]
+                memory.push_records(encode_transitions(chunk, PlayCardState))
+                for sars in chunk:
+                    expected.push(sars)
+            self.assertEqual((len(memory), memory.position), (len(expected), expected.position))
+            batch = memory.sample(64)
+            self.assertSameBatch(batch, expected.gather(batch.indices))
+
+    def test_not_prioritized(self):
+        with DiskReplayMemory(self.path, capacity=10, state_type=PlayCardState, prefetch=0) as memory:
+            with self.assertRaises(ValueError):
+                DQNAgent(prioritized=True, memory=memory)
+            self.assertIs(DQNAgent(memory=memory).memory, memory)
@@ -0,0 +1,42 @@
+from unittest import TestCase
+
+from jass.agents.impl.random_agent import RandomAgent
+from jass.logic.deck import Deck
+from jass.logic.events import Deal, TrumpChosen, CardPlayed, TrickWon, RoundScored, GameEnded
+from jass.logic.game import Game
+
+
+class EventsTest(TestCase):
+
+    def test_events(self):
+        game = Game([RandomAgent() for _ in range(4)], names=['Jean', 'Anne', 'Luc', 'Sophie'], goal=2000,
+                    deck=Deck(seed=0))
+        batches = []
+        game.events.subscribe(batches.append, batch_size=100)
+        game.start()
+
+        self.assertTrue(all(len(batch) <= 100 for batch in batches))
+        events = [e for batch in batches for e in batch]
+        self.assertIsInstance(events[-1], GameEnded)
+        self.assertEqual(events[-1].scores, tuple(t.score for t in game.teams))
+        self.assertGreaterEqual(events[-1].scores[events[-1].winning_team], 2000)
+
+        rounds = [e for e in events if isinstance(e, RoundScored)]
+        self.assertEqual(len([e for e in events if isinstance(e, Deal)]), len(rounds) + 1)
+        self.assertEqual(len([e for e in events if isinstance(e, TrumpChosen)]), len(rounds) + 1)
+
+        for round_idx, scored in enumerate(rounds):
+            cards = [e.card for e in events if isinstance(e, CardPlayed) and e.round_idx == round_idx]
+            self.assertEqual(len(set(cards)), 36)
+            tricks = [e for e in events if isinstance(e, TrickWon) and e.round_idx == round_idx]
+            self.assertIn(sum(t.points for t in tricks), [157, 257])
+
+    def test_text_log(self):
+        lines = []
+        game = Game([RandomAgent() for _ in range(4)], names=['Jean', 'Anne', 'Luc', 'Sophie'], goal=500,
+                    log_fn=lines.append)
+        game.start()
+        self.assertEqual(lines[0], 'Let\'s start a Jass Game :)')
+        self.assertTrue(lines[1].endswith('has the 7♢!'))
+        self.assertTrue(any(line.endswith('team won') for line in lines))
+        self.assertEqual(len([line for line in lines if ' played ' in line]) % 4, 0)
@@ -0,0 +1,84 @@
+import multiprocessing
+import random
+import threading
+from typing import List
+from unittest import TestCase
+
+import torch
+
+from jass.agents.state import PlayCardState
+from jass.agents.util.inference_broker import InferenceBroker, BrokerPolicy
+from jass.models.linear_dqn import LinearDQN
+from tests.test_replay_memory import random_states
+
+
+def best_actions(model: LinearDQN, states: List[PlayCardState]) -> List[int]:
+    with torch.no_grad():
+        values = model(PlayCardState.encode_batch(states))
+    masks = PlayCardState.action_mask_batch(states)
+    return values.masked_fill(~masks, float('-inf')).argmax(dim=1).tolist()
+
+
+def play(policy: BrokerPolicy, states: List[PlayCardState], results) -> None:
+    results.put([policy(state).index for state in states])
+
+
+class InferenceBrokerTest(TestCase):
+    def setUp(self) -> None:
+        torch.manual_seed(0)
+        self.model = LinearDQN.for_state(PlayCardState)
+        self.states = random_states(64, random.Random(0))
+
+    def test_threads(self):
+        with InferenceBroker(self.model, PlayCardState, max_batch_size=8, max_wait_us=50_000) as broker:
+            policies = [broker.policy() for _ in range(8)]
+            results = [[] for _ in policies]
+
+            def run(i):
+                results[i] = [policies[i](state).index for state in self.states[i::8]]
+
+            threads = [threading.Thread(target=run, args=(i,)) for i in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        expected = best_actions(self.model, self.states)
+        for i in range(8):
+            self.assertEqual(results[i], expected[i::8])
+        self.assertEqual(broker.n_requests, 64)
+        self.assertEqual(broker.batch_sizes.count, broker.forward_times.count)
+        self.assertGreater(broker.batch_sizes.mean, 1)  # the threads waited for each other
+        self.assertEqual(broker.latencies.count, 64)
+        self.assertGreater(broker.throughput, 0)
+
+    def test_processes(self):
+        context = multiprocessing.get_context('fork')
+        with InferenceBroker(self.model, PlayCardState, processes=True, mp_context='fork') as broker:
+            results = context.Queue()
+            workers = [context.Process(target=play, args=(broker.policy(), self.states[i::2], results))
+                       for i in range(2)]
+            for worker in workers:
+                worker.start()
+            played = [results.get(timeout=30) for _ in workers]
+            for worker in workers:
+                worker.join()
+
+        expected = best_actions(self.model, self.states)
+        self.assertCountEqual([expected[0::2], expected[1::2]], played)
+        self.assertEqual(broker.n_requests, 64)
+
+    def test_failures(self):
+        class Failing(torch.nn.Module):
+            def forward(self, x):
+                raise ValueError('no model')
+
+        with InferenceBroker(Failing(), PlayCardState) as broker:
+            policy = broker.policy()
+            with self.assertRaisesRegex(RuntimeError, 'no model'):
+                policy(self.states[0])
+            with self.assertRaisesRegex(RuntimeError, 'no model'):  # still serving
+                policy(self.states[1])
+
+        with self.assertRaisesRegex(RuntimeError, 'not running'):  # closed
+            policy(self.states[0])
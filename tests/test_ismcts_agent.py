@@ -0,0 +1,58 @@
+import random
+from unittest import TestCase
+
+from jass.agents.impl.ismcts_agent import ISMCTSAgent, SearchStats, observe
+from jass.agents.impl.random_agent import RandomAgent
+from jass.agents.state import PlayCardState
+from jass.logic import bitboard as bb
+from jass.logic.card import Card, Suit, Rank
+from jass.logic.deck import Deck
+from jass.logic.game import Game
+
+
+class ISMCTSAgentTest(TestCase):
+    def test_game(self):
+        random.seed(0)
+        agent = ISMCTSAgent(iterations=20, seed=0)
+        game = Game([agent, RandomAgent(), ISMCTSAgent(iterations=20, seed=1), RandomAgent()], goal=300,
+                    deck=Deck(seed=0))
+        game.start()
+        self.assertGreater(len(agent.stats.latencies), 0)
+        self.assertGreater(agent.stats.iterations, 0)
+
+    def test_workers(self):
+        random.seed(0)
+        agent = ISMCTSAgent(iterations=10, workers=2, executor='thread', seed=0)
+        try:
+            game = Game([agent, RandomAgent(), RandomAgent(), RandomAgent()], goal=300, deck=Deck(seed=0))
+            game.start()
+        finally:
+            agent.close()
+        # each decision (trump or card) sums the iterations of both searches
+        self.assertGreater(len(agent.stats.latencies), 0)
+        self.assertEqual(agent.stats.iterations, 2 * 10 * len(agent.stats.latencies))
+
+    def test_observe(self):
+        trump = Suit.hearts
+        # seat 1 (trump chooser) led spades, seat 2 played a club -> no spades left for seat 2
+        round_history = [[Card(6, Suit.spades), Card(Rank.ace, Suit.spades), Card(7, Suit.clubs),
+                          Card(8, Suit.spades)]]
+        hand = [Card(rank, Suit.diamonds) for rank in range(6, 14)]
+        table = [Card(10, Suit.clubs), Card(Rank.king, Suit.clubs), Card(6, Suit.hearts)]  # seats 1, 2 and 3
+        state = PlayCardState(trick_trump=trump, trump_chooser_idx=1, player_hand=hand, playable_cards=hand,
+                              trick_history=table, round_history=round_history)
+        observed, sampler = observe(state)
+        self.assertEqual(observed.winners, [1])
+        self.assertEqual(observed.to_play, 0)
+        self.assertEqual(observed.hands[0], bb.mask_of(card.order_value for card in hand))
+        self.assertEqual(sampler.candidates[2] & bb.SUIT_MASKS[Suit.spades.order_value], 0)
+        self.assertNotEqual(sampler.candidates[1] & bb.SUIT_MASKS[Suit.spades.order_value], 0)
+        self.assertEqual(sampler.sizes, [8, 7, 7, 7])
+
+    def test_stats(self):
+        stats = SearchStats()
+        for i in range(1, 101):
+            stats.add(latency=i / 1000, iterations=10)
+        self.assertAlmostEqual(stats.percentile(50), 0.05)
+        self.assertAlmostEqual(stats.percentile(99), 0.099)
+        self.assertAlmostEqual(stats.iterations_per_second, 1000 / 5.05)
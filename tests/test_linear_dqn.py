@@ -0,0 +1,51 @@
+import os
+import random
+import tempfile
+from unittest import TestCase
+
+import torch
+
+from jass.agents.impl.dqn_agent import DQNAgent
+from jass.agents.state import PlayCardState
+from jass.models.linear_dqn import LinearDQN
+from tests.test_replay_memory import random_states
+
+
+class LinearDQNTest(TestCase):
+    def setUp(self) -> None:
+        torch.manual_seed(0)
+        self.model = LinearDQN.for_state(PlayCardState)
+        self.states = PlayCardState.encode_batch(random_states(32, random.Random(0)))
+
+    def test_state_dict(self):
+        self.assertEqual(list(self.model.state_dict()), [f'net.{i}.{name}' for i in (0, 2, 4, 6)
+                                                         for name in ('weight', 'bias')])
+        agent = DQNAgent(train=False, state_dict=self.model.state_dict())
+        self.assertTrue(torch.equal(agent.policy_net(self.states), self.model(self.states)))
+
+    def test_frozen(self):
+        expected = self.model(self.states)
+        frozen = self.model.frozen()
+        values = frozen(self.states)
+        self.assertTrue(torch.equal(values, expected))
+        self.assertFalse(values.requires_grad)
+        with torch.no_grad():  # a snapshot: later updates of the model do not change it
+            self.model.net[0].bias += 1
+        self.assertTrue(torch.equal(frozen(self.states), values))
+
+    def test_scripted(self):
+        expected = self.model(self.states)
+        frozen = self.model.frozen(script=True)
+        self.assertTrue(torch.allclose(frozen(self.states), expected, atol=1e-6))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'policy.pt')
+            frozen.save(path)
+            self.assertTrue(torch.allclose(torch.jit.load(path)(self.states), expected, atol=1e-6))
+        with self.assertRaises(AssertionError):
+            self.model.frozen().save(path)
+
+    def test_quantized(self):
+        expected = self.model(self.states)
+        for script in (False, True):
+            values = self.model.frozen(script=script, quantize=True)(self.states)
+            self.assertTrue(torch.allclose(values, expected, atol=1e-2))
@@ -0,0 +1,128 @@
+import json
+import os
+import random
+import tempfile
+import urllib.error
+import urllib.request
+from unittest import TestCase
+
+from jass.agents.action import PlayCardAction
+from jass.agents.impl.dqn_agent import DQNAgent, BATCH_SIZE
+from jass.agents.impl.random_agent import RandomAgent
+from jass.agents.util.replay_memory import SARS
+from jass.logic.deck import Deck
+from jass.logic.game import Game
+from jass.metrics import (Histogram, Registry, GameMetrics, LearnerMetrics, MetricsServer, RollingFileWriter,
+                          exponential_buckets)
+from tests.test_replay_memory import random_states
+
+
+class HistogramTest(TestCase):
+
+    def test_buckets(self):
+        self.assertEqual(exponential_buckets(10, 2, 4), [10, 20, 40, 80])
+        histogram = Histogram('latency', [1, 2, 4])
+        for value in (0.5, 1, 1.5, 3, 3, 100):
+            histogram.observe(value)
+        self.assertEqual(histogram.counts, [2, 1, 2, 1])
+        self.assertEqual(histogram.count, 6)
+        self.assertAlmostEqual(histogram.sum, 109)
+
+    def test_percentile(self):
+        histogram = Histogram('latency', [10, 20, 30])
+        self.assertEqual(histogram.percentile(.5), 0.0)
+        for value in range(1, 21):
+            histogram.observe(value)
+        self.assertAlmostEqual(histogram.percentile(.25), 5)
+        self.assertAlmostEqual(histogram.percentile(.75), 15)
+        histogram.observe(1000)
+        self.assertEqual(histogram.percentile(1), 30)  # no upper bound above the last bucket
+        histogram.reset()
+        self.assertEqual((histogram.count, histogram.counts), (0, [0, 0, 0, 0]))
+
+
+class RegistryTest(TestCase):
+
+    def test_render(self):
+        registry = Registry()
+        registry.counter('games_total', 'games played').inc(3)
+        self.assertIs(registry.counter('games_total'), registry.counter('games_total'))
+        registry.gauge('loss', agent='a').set(0.5)
+        registry.gauge('loss', agent='b').set(1.5)
+        histogram = registry.histogram('seconds', [1, 2])
+        histogram.observe(0.5)
+        histogram.observe(5)
+        self.assertEqual(registry.render().splitlines(), [
+            '# HELP games_total games played',
+            '# TYPE games_total counter',
+            'games_total 3.0',
+            '# TYPE loss gauge',
+            'loss{agent="a"} 0.5',
+            'loss{agent="b"} 1.5',
+            '# TYPE seconds histogram',
+            'seconds_bucket{le="1"} 1',
+            'seconds_bucket{le="2"} 1',
+            'seconds_bucket{le="+Inf"} 2',
+            'seconds_sum 5.5',
+            'seconds_count 2',
+        ])
+        snapshot = registry.snapshot()
+        self.assertEqual(snapshot['loss{agent="b"}'], 1.5)
+        self.assertEqual(snapshot['seconds_count'], 2)
+        with self.assertRaises(AssertionError):
+            registry.gauge('games_total')
+
+    def test_server(self):
+        registry = Registry()
+        registry.counter('games_total').inc()
+        with MetricsServer(registry, port=0) as server:
+            with urllib.request.urlopen(f'http://127.0.0.1:{server.port}/metrics') as response:
+                self.assertEqual(response.read().decode(), registry.render())
+            with self.assertRaises(urllib.error.HTTPError):
+                urllib.request.urlopen(f'http://127.0.0.1:{server.port}/other')
+
+    def test_rolling_file(self):
+        registry = Registry()
+        counter = registry.counter('cards_total')
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'metrics.jsonl')
+            writer = RollingFileWriter(path, registry, max_bytes=500, backups=2)
+            for _ in range(20):
+                counter.inc(36)
+                writer.write()
+            writer.close()
+            self.assertEqual(sorted(os.listdir(directory)), ['metrics.jsonl', 'metrics.jsonl.1', 'metrics.jsonl.2'])
+            with open(path) as f:
+                line = json.loads(f.readlines()[-1])
+            self.assertEqual(line['values']['cards_total'], 20 * 36)
+            self.assertEqual(line['rates']['cards_total'], 0)  # written twice by close
+
+
+class InstrumentsTest(TestCase):
+
+    def test_game_metrics(self):
+        metrics = GameMetrics(Registry())
+        for game_idx in range(2):
+            game = Game([RandomAgent() for _ in range(4)], goal=500, deck=Deck(seed=0, stream_id=game_idx),
+                        metrics=metrics)
+            game.start()
+        self.assertEqual(metrics.games.value, 2)
+        self.assertEqual(metrics.round_seconds.count, metrics.rounds.value)
+        self.assertGreater(metrics.cards.value, 36 * (metrics.rounds.value - 2))
+        self.assertLessEqual(metrics.cards.value, 36 * metrics.rounds.value)
+        self.assertGreater(metrics.agent_seconds.value, 0)
+        self.assertGreater(metrics.engine_seconds.value, 0)
+
+    def test_learner_metrics(self):
+        metrics = LearnerMetrics(Registry(), agent='a')
+        agent = DQNAgent(train=True, metrics=metrics)
+        states = random_states(BATCH_SIZE, random.Random(0))
+        for state in states:
+            agent.memory.push(SARS(state, PlayCardAction(state.playable_cards[0]), 1, None))
+        agent.policy(states[0])
+        agent.optimize_model()
+        self.assertEqual(metrics.steps.value, 1)
+        self.assertEqual(metrics.step_seconds.count, 1)
+        self.assertEqual(metrics.replay_size.value, BATCH_SIZE)
+        self.assertGreater(metrics.loss.value, 0)
+        self.assertAlmostEqual(metrics.epsilon.value, agent.policy.epsilon)
@@ -0,0 +1,89 @@
+import os
+import random
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+
+from jass.agents.impl.random_agent import RandomAgent
+from jass.logic.deck import Deck
+from jass.logic.events import CardPlayed, TrumpChosen, Subscriber
+from jass.logic.game import Game
+from jass.logic.records import GameRecordWriter, GameRecords, RECORD_SIZE, NO_CARD, replay
+
+
+class GameRecordsTest(TestCase):
+    def setUp(self) -> None:
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'games.jrec')
+
+    def tearDown(self) -> None:
+        self.dir.cleanup()
+
+    def play_games(self, n_games: int, writer: Subscriber):
+        """Plays games recorded by `writer`, returns the cards played and the trump chosen in each round"""
+        random.seed(0)
+        rounds = []
+
+        def collect(events):
+            for event in events:
+                if isinstance(event, TrumpChosen):
+                    rounds.append(([], event))
+                elif isinstance(event, CardPlayed):
+                    rounds[-1][0].append(event.card.order_value)
+
+        for game_idx in range(n_games):
+            game = Game([RandomAgent() for _ in range(4)], goal=500, deck=Deck(seed=0, stream_id=game_idx))
+            game.events.subscribe(writer, batch_size=64)
+            game.events.subscribe(collect)
+            game.start()
+        return rounds
+
+    def test_write_read(self):
+        with GameRecordWriter(self.path, buffer_size=7) as writer:
+            rounds = self.play_games(3, writer)
+        self.assertEqual(os.path.getsize(self.path), RECORD_SIZE * (len(rounds) + 1))
+
+        records = GameRecords(self.path)
+        self.assertEqual(len(records), len(rounds))
+        self.assertEqual(records.n_games, 3)
+        self.assertEqual(sum(len(records.game(i)) for i in range(3)), len(rounds))
+        for record, (cards, trump_chosen) in zip(records, rounds):
+            played = record['cards'][record['cards'] != NO_CARD]
+            self.assertEqual(played.tolist(), cards)
+            self.assertEqual(record['trump'], trump_chosen.trump.order_value)
+            self.assertEqual(record['chooser'], trump_chosen.chooser)
+            self.assertEqual(bool(record['chibre']), trump_chosen.chibre)
+
+        # slices are views of the file
+        cards = records[2:5]['cards']
+        self.assertEqual(cards.shape, (3, 36))
+        self.assertFalse(cards.flags.owndata)
+        self.assertTrue(np.shares_memory(cards, records.records))
+
+    def test_flush_mid_round(self):
+        with GameRecordWriter(self.path, buffer_size=5) as writer:
+            def write_and_flush(events):
+                writer(events)
+                writer.flush()  # between the Deal and the end of the round for most events
+
+            rounds = self.play_games(2, write_and_flush)
+        records = GameRecords(self.path)
+        self.assertEqual(len(records), len(rounds))
+        self.assertEqual(records.n_games, 2)
+        for record, (cards, trump_chosen) in zip(records, rounds):
+            self.assertEqual(record['cards'][record['cards'] != NO_CARD].tolist(), cards)
+            self.assertEqual(record['trump'], trump_chosen.trump.order_value)
+
+    def test_append_and_replay(self):
+        with GameRecordWriter(self.path) as writer:
+            self.play_games(1, writer)
+        with GameRecordWriter(self.path) as writer:
+            self.play_games(1, writer)
+        records = GameRecords(self.path)
+        self.assertEqual(records.n_games, 2)
+
+        state = replay(records[0])
+        self.assertTrue(state.is_over)
+        self.assertEqual(sum(state.scores), 257 if state.is_match else 157)
+        self.assertEqual(state.cards, records[0]['cards'].tolist())
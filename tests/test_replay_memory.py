@@ -0,0 +1,124 @@
+import random
+from typing import List
+from unittest import TestCase
+
+import torch
+
+from jass.agents.action import PlayCardAction
+from jass.agents.state import PlayCardState
+from jass.agents.util.replay_memory import SARS, PrioritizedReplayMemory, TensorReplayMemory, encode_transitions
+from jass.logic.card import Suit
+from jass.logic.deck import Deck
+
+
+def random_states(n: int, rng: random.Random) -> List[PlayCardState]:
+    deck = Deck()
+    states = []
+    for _ in range(n):
+        cards = deck.shuffle().cards()
+        num_cards_hand = rng.randint(2, 9)
+        num_card_on_table = rng.randint(0, 3)
+        round_idx = num_cards_hand + num_card_on_table
+        states.append(PlayCardState(
+            trick_trump=rng.choice(list(Suit)),
+            trump_chooser_idx=rng.randint(0, 3),
+            player_hand=cards[:num_cards_hand],
+            playable_cards=cards[:rng.randint(1, num_cards_hand)],
+            trick_history=cards[num_cards_hand:num_cards_hand + num_card_on_table],
+            round_history=[cards[round_idx + i * 4:round_idx + (i + 1) * 4] for i in range(9 - num_cards_hand)],
+        ))
+    return states
+
+
+class TensorReplayMemoryTest(TestCase):
+
+    def test_round_trip(self):
+        states = random_states(21, random.Random(0))
+        memory = TensorReplayMemory(capacity=20, state_type=PlayCardState)
+        transitions = []
+        for i, (state, next_state) in enumerate(zip(states, states[1:])):
+            sars = SARS(state, PlayCardAction(state.playable_cards[0]), i - 5, None if i % 3 == 0 else next_state)
+            memory.push(sars)
+            transitions.append(sars)
+        self.assertEqual(len(memory), 20)
+
+        batch = memory.gather(torch.arange(20))
+        for i, sars in enumerate(transitions):
+            self.assertTrue(torch.equal(batch.states[i], sars.state.tensor.to(torch.uint8)))
+            self.assertEqual(batch.actions[i].item(), sars.action.index)
+            self.assertEqual(batch.rewards[i].item(), sars.reward)
+            self.assertEqual(batch.dones[i].item(), sars.is_final)
+            if sars.is_final:
+                self.assertEqual(batch.next_states[i].sum().item(), 0)
+                self.assertFalse(batch.next_masks[i].any())
+            else:
+                self.assertTrue(torch.equal(batch.next_states[i], sars.next_state.tensor.to(torch.uint8)))
+                self.assertTrue(torch.equal(batch.next_masks[i], sars.next_state.action_tensor_mask))
+
+    def test_ring(self):
+        states = random_states(8, random.Random(1))
+        memory = TensorReplayMemory(capacity=3, state_type=PlayCardState)
+        for reward, state in enumerate(states):
+            memory.push(SARS(state, PlayCardAction(state.playable_cards[0]), reward, None))
+        self.assertEqual(len(memory), 3)
+        self.assertEqual(memory.position, 8 % 3)
+        self.assertEqual(sorted(memory.gather(torch.arange(3)).rewards.tolist()), [5, 6, 7])
+
+        batch = memory.sample(50, generator=torch.Generator().manual_seed(0))
+        self.assertEqual(batch.states.shape, (50, PlayCardState.tensor_size))
+        self.assertEqual(set(batch.rewards.tolist()), {5, 6, 7})
+
+    def test_push_records(self):
+        states = random_states(12, random.Random(4))
+        transitions = [SARS(state, PlayCardAction(state.playable_cards[-1]), i, None if i % 5 == 4 else next_state)
+                       for i, (state, next_state) in enumerate(zip(states, states[1:]))]
+        expected = TensorReplayMemory(capacity=8, state_type=PlayCardState)
+        memory = TensorReplayMemory(capacity=8, state_type=PlayCardState)
+        for sars in transitions:
+            expected.push(sars)
+        memory.push_records(encode_transitions(transitions[:3], PlayCardState))
+        memory.push_records(encode_transitions(transitions[3:], PlayCardState))  # more than the capacity left
+        self.assertEqual((len(memory), memory.position), (len(expected), expected.position))
+        batch, expected_batch = memory.gather(torch.arange(8)), expected.gather(torch.arange(8))
+        for name in batch._fields:
+            self.assertTrue(torch.equal(getattr(batch, name), getattr(expected_batch, name)), name)
+
+
+class PrioritizedReplayMemoryTest(TestCase):
+
+    def test_priorities(self):
+        states = random_states(10, random.Random(2))
+        memory = PrioritizedReplayMemory(capacity=10, state_type=PlayCardState, alpha=1.0, beta=1.0, epsilon=0.0)
+        for reward, state in enumerate(states):
+            memory.push(SARS(state, PlayCardAction(state.playable_cards[0]), reward, None))
+        self.assertEqual(memory.tree.values.tolist(), [1.0] * 10)  # new transitions get the max priority
+
+        memory.update_priorities(torch.arange(10), torch.tensor([0.] * 9 + [-9.]))  # only the last one matters
+        batch = memory.sample(16, generator=torch.Generator().manual_seed(0))
+        self.assertEqual(set(batch.rewards.tolist()), {9})
+        self.assertEqual(batch.indices.tolist(), [9] * 16)
+        self.assertTrue(torch.allclose(batch.weights, torch.ones(16)))
+
+        memory.push(SARS(states[0], PlayCardAction(states[0].playable_cards[0]), 10, None))
+        self.assertEqual(memory.tree.values[0], 9.0)
+
+    def test_weights(self):
+        states = random_states(4, random.Random(3))
+        memory = PrioritizedReplayMemory(capacity=4, state_type=PlayCardState, alpha=1.0, beta=1.0, epsilon=0.0)
+        for reward, state in enumerate(states):
+            memory.push(SARS(state, PlayCardAction(state.playable_cards[0]), reward, None))
+        memory.update_priorities(torch.arange(4), torch.tensor([1., 1., 1., 3.]))
+        batch = memory.sample(60, generator=torch.Generator().manual_seed(0))
+        # sampled 3 times more often, weighted 3 times less
+        self.assertEqual(batch.indices.tolist().count(3), 30)
+        for index, weight in zip(batch.indices.tolist(), batch.weights.tolist()):
+            self.assertAlmostEqual(weight, 1 / 3 if index == 3 else 1.0, places=6)
+
+    def test_push_records(self):
+        states = random_states(6, random.Random(5))
+        memory = PrioritizedReplayMemory(capacity=4, state_type=PlayCardState, alpha=1.0, epsilon=0.0)
+        memory.push(SARS(states[0], PlayCardAction(states[0].playable_cards[0]), 0, None))
+        memory.update_priorities(torch.tensor([0]), torch.tensor([5.]))
+        transitions = [SARS(state, PlayCardAction(state.playable_cards[0]), 1, None) for state in states[1:]]
+        memory.push_records(encode_transitions(transitions, PlayCardState))
+        self.assertEqual(memory.tree.values.tolist(), [5.0] * 4)
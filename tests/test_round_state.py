@@ -0,0 +1,72 @@
+import random
+from unittest import TestCase
+
+from jass.logic import bitboard as bb
+from jass.logic.round_state import RoundState
+
+
+def random_state(seed: int) -> RoundState:
+    rng = random.Random(seed)
+    cards = list(range(36))
+    rng.shuffle(cards)
+    return RoundState(hands=[bb.mask_of(cards[i * 9:(i + 1) * 9]) for i in range(4)], trump=rng.randrange(4),
+                      chooser=rng.randrange(4))
+
+
+def play_randomly(state: RoundState, rng: random.Random, n_cards: int = 36) -> None:
+    for _ in range(n_cards):
+        if state.is_over:
+            return
+        state.apply(rng.choice(state.legal_cards()))
+
+
+class RoundStateTest(TestCase):
+    def test_full_round(self):
+        rng = random.Random(0)
+        for seed in range(50):
+            state = random_state(seed)
+            play_randomly(state, rng)
+            self.assertTrue(state.is_over)
+            self.assertEqual(state.played, bb.FULL_MASK)
+            self.assertEqual(state.hands, [0, 0, 0, 0])
+            self.assertEqual(sum(state.scores), 257 if state.is_match else 157)
+            self.assertEqual(sum(state.trick_scores), sum(state.scores))
+            self.assertEqual(state.leaders[1:], state.winners[:-1])
+
+    def test_undo(self):
+        rng = random.Random(1)
+        for seed in range(20):
+            state = random_state(seed)
+            play_randomly(state, rng, n_cards=rng.randrange(36))
+            before = state.clone()
+            n_cards = rng.randrange(1, 37 - len(state.cards))
+            played = state.cards[:]
+            play_randomly(state, rng, n_cards)
+            for _ in range(len(state.cards) - len(played)):
+                state.undo()
+            self.assertEqual(state.cards, played)
+            for attr in RoundState.__slots__:
+                self.assertEqual(getattr(state, attr), getattr(before, attr), attr)
+
+    def test_clone_is_independent(self):
+        state = random_state(2)
+        play_randomly(state, random.Random(2), n_cards=10)
+        clone = state.clone()
+        clone.apply(clone.legal_cards()[0])
+        self.assertEqual(len(state.cards), 10)
+        self.assertEqual(len(clone.cards), 11)
+        self.assertNotEqual(state.hands, clone.hands)
+
+    def test_to_play_and_tricks_from(self):
+        state = random_state(3)
+        self.assertEqual(state.to_play, state.chooser)
+        play_randomly(state, random.Random(3), n_cards=4)
+        self.assertEqual(state.trick_idx, 1)
+        self.assertEqual(state.to_play, state.winners[0])
+        self.assertEqual(state.table, [])
+
+        seat = 2
+        (trick,) = state.tricks_from(seat)
+        for offset, card in enumerate(trick):
+            position = (seat + offset - state.chooser) % 4  # position of the card in playing order
+            self.assertEqual(card, state.cards[position])
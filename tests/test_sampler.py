@@ -0,0 +1,88 @@
+import random
+from collections import Counter
+from unittest import TestCase
+
+import numpy as np
+
+from jass.logic import bitboard as bb
+from jass.logic.card import Suit
+from jass.logic.round_state import RoundState
+from jass.logic.sampler import DealSampler
+
+DIAMONDS, SPADES, HEARTS, CLUBS = (suit.order_value for suit in Suit)
+
+
+def card(suit: int, rank: int) -> int:
+    return suit * 9 + rank
+
+
+def random_round(rng: random.Random) -> RoundState:
+    cards = list(range(36))
+    rng.shuffle(cards)
+    return RoundState(hands=[bb.mask_of(cards[i * 9:(i + 1) * 9]) for i in range(4)], trump=rng.randrange(4),
+                      chooser=rng.randrange(4))
+
+
+class DealSamplerTest(TestCase):
+    def test_consistent_deals(self):
+        rng = random.Random(0)
+        for i in range(50):
+            state = random_round(rng)
+            seat = rng.randrange(4)
+            sampler = DealSampler(hand=state.hands[seat], trump=state.trump, seat=seat)
+            for _ in range(rng.randrange(36)):
+                played_by = state.to_play
+                card_idx = rng.choice(state.legal_cards())
+                state.apply(card_idx)
+                sampler.play(played_by, card_idx)
+
+            for s in range(4):  # the actual deal is one of the candidates
+                self.assertEqual(state.hands[s] & ~sampler.candidates[s], 0)
+            deals = sampler.sample(100, np.random.default_rng(i))
+            self.assertEqual(deals.shape, (100, 4))
+            self.assertEqual(deals.dtype, np.uint64)
+            for hands in deals.tolist() + [sampler.sample_one(rng)]:
+                self.assertEqual(hands[seat], state.hands[seat])
+                for s in range(4):
+                    self.assertEqual(bb.count(hands[s]), bb.count(state.hands[s]))
+                    self.assertEqual(hands[s] & ~sampler.candidates[s], 0)
+
+    def test_uniform(self):
+        rng = random.Random(1)
+        state = random_round(rng)
+        sampler = DealSampler(hand=state.hands[0], trump=state.trump)
+        for _ in range(27):
+            played_by = state.to_play
+            card_idx = rng.choice(state.legal_cards())
+            state.apply(card_idx)
+            sampler.play(played_by, card_idx)
+
+        n = 20000
+        counts = Counter(map(tuple, sampler.sample(n, np.random.default_rng(1)).tolist()))
+        self.assertEqual(len(counts), sampler.count())
+        expected = n / sampler.count()
+        for count in counts.values():
+            self.assertLess(abs(count - expected), 5 * expected ** 0.5)
+
+    def test_voids(self):
+        hand = bb.mask_of([card(CLUBS, rank) for rank in range(5)] + [card(DIAMONDS, rank) for rank in range(4)])
+        sampler = DealSampler(hand=hand, trump=HEARTS)
+        sampler.play(0, card(CLUBS, 0))
+        sampler.play(1, card(SPADES, 2))  # neither serves nor trumps -> no card of the served suit
+        self.assertEqual(sampler.candidates[1] & bb.SUIT_MASKS[CLUBS], 0)
+        self.assertNotEqual(sampler.candidates[3] & bb.SUIT_MASKS[CLUBS], 0)
+        sampler.play(2, card(HEARTS, 0))
+        sampler.play(3, card(SPADES, 0))
+
+        sampler.play(2, card(HEARTS, 1))  # leads trump
+        sampler.play(3, card(SPADES, 1))  # does not follow -> at most the trump jack
+        self.assertEqual(sampler.candidates[3] & bb.SUIT_MASKS[HEARTS], bb.JACK_BITS[HEARTS])
+        sampler.play(0, card(DIAMONDS, 0))
+        sampler.play(1, card(HEARTS, 8))
+
+        sampler.play(1, card(SPADES, 3))
+        sampler.play(2, card(HEARTS, 4))  # trumps with the 10
+        sampler.play(3, card(HEARTS, 2))  # under trumps -> had only weaker trumps (and the 6, 7, 8 are gone)
+        self.assertEqual(sampler.candidates[3], 0)
+        sampler.play(0, card(DIAMONDS, 1))
+        self.assertEqual(sampler.sizes, [6, 6, 6, 6])
@@ -0,0 +1,77 @@
+import random
+from unittest import TestCase
+
+from jass.logic import bitboard as bb
+from jass.logic.round_state import RoundState, TEAM_OF_SEAT
+from jass.logic.solver import Solver, TranspositionTable
+
+
+def minimax(state: RoundState) -> int:
+    """Plain minimax of the points of team 0 minus the points of team 1 at the end of the round"""
+    if state.is_over:
+        return state.scores[0] - state.scores[1]
+    values = []
+    for card in state.legal_cards():
+        state.apply(card)
+        values.append(minimax(state))
+        state.undo()
+    return max(values) if TEAM_OF_SEAT[state.to_play] == 0 else min(values)
+
+
+def endgame(rng: random.Random, n_played: int) -> RoundState:
+    cards = list(range(36))
+    rng.shuffle(cards)
+    state = RoundState(hands=[bb.mask_of(cards[i * 9:(i + 1) * 9]) for i in range(4)], trump=rng.randrange(4),
+                       chooser=rng.randrange(4))
+    for _ in range(n_played):
+        state.apply(rng.choice(state.legal_cards()))
+    return state
+
+
+class SolverTest(TestCase):
+    def test_matches_minimax(self):
+        rng = random.Random(0)
+        solver = Solver(tt_bits=10)
+        for _ in range(20):
+            state = endgame(rng, n_played=rng.randrange(25, 33))
+            result = solver.solve(state)
+            self.assertEqual(result.value, minimax(state.clone()) - (state.scores[0] - state.scores[1]))
+            self.assertEqual(solver.move_values(state)[result.card], result.value)
+            self.assertIn(result.card, state.legal_cards())
+
+    def test_scores_of_optimal_play(self):
+        rng = random.Random(1)
+        solver = Solver()
+        for _ in range(10):
+            state = endgame(rng, n_played=rng.randrange(20, 30))
+            cards = state.cards[:]
+            result = solver.solve(state)
+            self.assertEqual(state.cards, cards, 'state left unchanged')
+            while not state.is_over:
+                state.apply(solver.solve(state).card)
+            self.assertEqual(tuple(state.scores), result.scores)
+
+    def test_match(self):
+        # seat 0 holds all the trumps and leads -> team 0 wins every trick
+        rng = random.Random(2)
+        others = list(range(9, 36))
+        rng.shuffle(others)
+        hands = [bb.SUIT_MASKS[0]] + [bb.mask_of(others[i * 9:(i + 1) * 9]) for i in range(3)]
+        state = RoundState(hands=hands, trump=0, chooser=0)
+        for _ in range(24):
+            state.apply(rng.choice(state.legal_cards()))
+        result = Solver().solve(state)
+        self.assertEqual(result.scores, (257, 0))
+
+    def test_transposition_table_replacement(self):
+        tt = TranspositionTable(bits=2)
+        tt.store(key=1, value=10, flag=0, move=3, size=20)
+        tt.store(key=5, value=11, flag=0, move=4, size=8)  # same bucket, smaller subtree -> second entry
+        self.assertEqual(tt.values[tt.probe(1)], 10)
+        self.assertEqual(tt.values[tt.probe(5)], 11)
+        tt.store(key=9, value=12, flag=0, move=5, size=4)  # replaces the second entry only
+        self.assertGreaterEqual(tt.probe(1), 0)
+        self.assertLess(tt.probe(5), 0)
+        tt.store(key=13, value=13, flag=0, move=6, size=24)  # larger subtree -> replaces the first entry
+        self.assertLess(tt.probe(1), 0)
+        self.assertEqual(tt.moves[tt.probe(13)], 6)
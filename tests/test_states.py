@@ -1,8 +1,10 @@
 import random
 from unittest import TestCase
 
+import torch
+
 from jass.agents.state import PlayCardState, ChooseTrumpState
-from jass.logic.card import Suit
+from jass.logic.card import Suit, Card
 from jass.logic.deck import Deck
 
 
@@ -36,3 +38,52 @@ class StatesTest(TestCase):
                 can_chibre=random.random() < 0.5,
             )
             self.assertEqual(state.tensor.nelement(), state.tensor_size)
+
+    def test_play_card_state_layout(self):
+        cards = list(Card)
+        round_history = [cards[0:4], cards[4:8]]  # ordered by seat
+        state = PlayCardState(
+            trick_trump=Suit.clubs,
+            trump_chooser_idx=1,
+            player_hand=cards[20:26],
+            playable_cards=cards[20:22],
+            trick_history=cards[8:10],
+            round_history=round_history,
+        )
+        tensor = state.tensor
+        self.assertEqual(tensor[:8].nonzero().view(-1).tolist(), [Suit.clubs.order_value, 4 + 1])
+        self.assertEqual(tensor[8:44].nonzero().view(-1).tolist(), list(range(20, 26)))
+        self.assertEqual(tensor[44:152].view(3, 36).argmax(dim=1).tolist(), [8, 9, 0])
+        # cards of the previous tricks, flattened then viewed as (4, 2, 36) in the first 2 columns of a (4, 7) grid
+        history = tensor[152:].view(4, 7, 36)
+        self.assertEqual(history[:, :2].argmax(dim=2).tolist(), [[0, 1], [2, 3], [4, 5], [6, 7]])
+        self.assertEqual(history[:, 2:].sum(), 0)
+
+        out = torch.ones(state.tensor_size, dtype=torch.long)
+        self.assertIs(state.write_tensor(out), out)
+        self.assertTrue(torch.equal(out, tensor))
+
+    def test_encode_batch(self):
+        deck = Deck(seed=0)
+        play_states, trump_states = [], []
+        for _ in range(50):
+            cards = deck.shuffle().dealt_cards()
+            num_cards_hand = random.randint(2, 9)
+            num_card_on_table = random.randint(0, 3)
+            round_idx = num_cards_hand + num_card_on_table
+            play_states.append(PlayCardState(
+                trick_trump=random.choice(list(Suit)),
+                trump_chooser_idx=random.randint(0, 3),
+                player_hand=cards[:num_cards_hand],
+                playable_cards=random.sample(cards[:num_cards_hand], k=random.randint(1, num_cards_hand)),
+                trick_history=cards[num_cards_hand:num_cards_hand + num_card_on_table],
+                round_history=[cards[round_idx + i * 4:round_idx + (i + 1) * 4] for i in range(9 - num_cards_hand)],
+            ))
+            trump_states.append(ChooseTrumpState(hand=cards[:9], can_chibre=random.random() < 0.5))
+
+        for cls, states in ((PlayCardState, play_states), (ChooseTrumpState, trump_states)):
+            batch = cls.encode_batch(states)
+            self.assertTrue(torch.equal(batch, torch.stack([state.tensor for state in states])))
+            masks = cls.action_mask_batch(states)
+            self.assertTrue(torch.equal(masks, torch.stack([state.action_tensor_mask for state in states])))
+        self.assertEqual(PlayCardState.encode_batch([]).shape, (0, PlayCardState.tensor_size))
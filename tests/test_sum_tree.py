@@ -0,0 +1,34 @@
+from unittest import TestCase
+
+import numpy as np
+
+from jass.agents.util.sum_tree import SumTree
+
+
+class SumTreeTest(TestCase):
+
+    def test_update(self):
+        rng = np.random.default_rng(0)
+        tree = SumTree(1000)
+        values = np.zeros(1000)
+        for _ in range(20):
+            indices = rng.integers(1000, size=64)
+            new_values = rng.random(64)
+            tree.update(indices, new_values)
+            values[indices] = new_values  # last one wins, as in the tree
+        self.assertTrue(np.array_equal(tree.values, values))
+        self.assertAlmostEqual(tree.total, values.sum())
+        self.assertTrue(np.array_equal(tree[[3, 999]], values[[3, 999]]))
+
+    def test_find(self):
+        tree = SumTree(5)
+        tree.update(np.arange(5), np.array([1., 0., 2., 0., 3.]))
+        self.assertEqual(tree.find([0, 0.99, 1, 2.5, 3, 5.99]).tolist(), [0, 0, 2, 2, 4, 4])
+        self.assertEqual(tree.find([6]).tolist(), [4])  # never an empty leaf
+
+    def test_proportional(self):
+        rng = np.random.default_rng(1)
+        tree = SumTree(3)
+        tree.update(np.arange(3), np.array([1., 2., 7.]))
+        counts = np.bincount(tree.find(rng.random(10000) * tree.total), minlength=3)
+        self.assertTrue(np.allclose(counts / 10000, [.1, .2, .7], atol=0.02))
@@ -0,0 +1,121 @@
+import os
+import random
+import tempfile
+from unittest import TestCase
+
+from jass.logic import bitboard as bb
+from jass.logic.solver import Solver
+from jass.logic.tablebase import Tablebase, build, canonical_key, random_positions, solve
+
+
+def swap_suits(mask: int, a: int, b: int) -> int:
+    lane_a = (mask >> (a * bb.N_RANKS)) & bb.LANE_MASK
+    lane_b = (mask >> (b * bb.N_RANKS)) & bb.LANE_MASK
+    mask &= ~(bb.SUIT_MASKS[a] | bb.SUIT_MASKS[b])
+    return mask | lane_a << (b * bb.N_RANKS) | lane_b << (a * bb.N_RANKS)
+
+
+class TablebaseTest(TestCase):
+    def setUp(self) -> None:
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'endgames.jtb')
+
+    def tearDown(self) -> None:
+        self.dir.cleanup()
+
+    def test_canonical_key(self):
+        state = next(random_positions(1, seed=3))
+        hands, trump, leader = state.hands, state.trump, state.leader
+        key = canonical_key(hands, trump, leader)
+        a, b = [suit for suit in range(4) if suit != trump][:2]
+        self.assertEqual(canonical_key([swap_suits(h, a, b) for h in hands], trump, leader), key)
+        rotated = [hands[(seat - 1) % 4] for seat in range(4)]  # every player moves one seat further
+        self.assertEqual(canonical_key(rotated, trump, (leader + 1) % 4), key)
+        self.assertNotEqual(canonical_key(hands, trump, (leader + 1) % 4), key)
+
+    def test_pointless_ranks(self):
+        """The 6 to 9 of a suit (6 to 8 of trump) in play only matter by their order"""
+        def card(suit: int, rank: int) -> int:
+            return suit * bb.N_RANKS + rank
+
+        def position(*cards: int):
+            return [bb.mask_of(cards[i:i + 2]) for i in range(0, 8, 2)], 0, 0
+
+        spades, hearts = 1, 2
+        base = position(card(spades, 1), card(hearts, 8), card(spades, 3), card(0, 2),
+                        card(spades, 8), card(hearts, 0), card(0, 0), card(hearts, 4))
+        same = position(card(spades, 0), card(hearts, 8), card(spades, 2), card(0, 1),
+                        card(spades, 8), card(hearts, 3), card(0, 0), card(hearts, 4))
+        swapped = position(card(spades, 3), card(hearts, 8), card(spades, 1), card(0, 2),
+                           card(spades, 8), card(hearts, 0), card(0, 0), card(hearts, 4))
+        self.assertEqual(canonical_key(*same), canonical_key(*base))
+        self.assertNotEqual(canonical_key(*swapped), canonical_key(*base))
+        self.assertEqual(solve(*same, Solver()), solve(*base, Solver()))
+
+    def test_lookup(self):
+        positions = [state for n_cards in (1, 2, 3) for state in random_positions(15, seed=n_cards, n_cards=n_cards)]
+        n = build(positions, self.path)
+        self.assertGreater(n, len(positions))  # and the positions met by the searches
+        tablebase = Tablebase(self.path)
+        self.assertEqual(len(tablebase), n)
+
+        solver = Solver()
+        for state in positions:
+            self.assertEqual(tablebase.lookup(state), solver.solve(state).value)
+
+        state = positions[-1]
+        state.apply(state.legal_cards()[0])
+        self.assertIsNone(tablebase.lookup(state))  # not the start of a trick
+
+    def test_solver_with_tablebase(self):
+        rng = random.Random(0)
+        positions = list(random_positions(20, seed=4, n_cards=4))
+        endgames = []
+        for state in positions:  # positions after one more trick, met by the solver
+            state = state.clone()
+            for _ in range(4):
+                state.apply(rng.choice(state.legal_cards()))
+            endgames.append(state)
+        build(endgames, self.path)
+
+        tablebase = Tablebase(self.path)
+        hits = []
+        probe = tablebase.probe
+        tablebase.probe = lambda *args: hits.append(probe(*args)) or hits[-1]
+        for state in positions:
+            self.assertEqual(Solver(tablebase=tablebase).solve(state), Solver().solve(state))
+        self.assertGreater(len([hit for hit in hits if hit is not None]), 0)
+
+    def test_write_through(self):
+        positions = list(random_positions(10, seed=5, n_cards=4))
+        tablebase = Tablebase(self.path, writable=True)
+        self.assertEqual(len(tablebase), 0)
+        for state in positions:
+            self.assertEqual(Solver(tablebase=tablebase).solve(state), Solver().solve(state))
+        self.assertGreater(tablebase.hits, 0)  # the 1 and 2 cards endgames recur within a search
+        n = len(tablebase)
+        self.assertEqual(tablebase.save(), n)
+
+        tablebase = Tablebase(self.path)
+        self.assertEqual(len(tablebase), n)
+        solver = Solver(tablebase=tablebase)
+        for state in positions:
+            self.assertEqual(solver.solve(state).value, Solver().solve(state).value)
+        self.assertEqual(tablebase.hits, tablebase.probes)  # every endgame of these positions was stored
+        with self.assertRaises(ValueError):
+            tablebase.store(positions[0].hands, positions[0].trump, positions[0].leader, [], 0)
+
+    def test_interrupted_build(self):
+        positions = list(random_positions(5, seed=6, n_cards=1))
+        n = build(positions, self.path)
+
+        def interrupted():
+            yield from random_positions(5, seed=7, n_cards=2)
+            raise KeyboardInterrupt
+
+        with self.assertRaises(KeyboardInterrupt):
+            build(interrupted(), self.path)
+        tablebase = Tablebase(self.path)  # the previous table is kept
+        self.assertEqual(len(tablebase), n)
+        for state in positions:
+            self.assertIsNotNone(tablebase.lookup(state))
@@ -0,0 +1,54 @@
+import random
+from unittest import TestCase
+
+import numpy as np
+
+from jass.logic import tables
+from jass.logic.card import Card, Suit, Rank
+
+
+class TablesTest(TestCase):
+
+    def test_points(self):
+        for trump in range(4):
+            self.assertEqual(sum(tables.points(c, trump) for c in range(36)), 152)
+            self.assertEqual(tables.POINTS_TABLE[:, trump].sum(), 152)
+        self.assertEqual(Card(Rank.jack, Suit.hearts).points(Suit.hearts), 20)
+        self.assertEqual(Card(Rank.nine, Suit.hearts).points(Suit.hearts), 14)
+        self.assertEqual(Card(Rank.jack, Suit.hearts).points(Suit.clubs), 2)
+        self.assertEqual(Card(Rank.ace, Suit.spades).points(Suit.clubs), 11)
+
+    def test_strength(self):
+        for trump in Suit:
+            for served in Suit:
+                jack = Card(Rank.jack, trump)
+                for card in Card:
+                    s = tables.STRENGTH_TABLE[card.order_value, served.order_value, trump.order_value]
+                    self.assertEqual(s, tables.strength(card.order_value, served.order_value, trump.order_value))
+                    if card.suit is not trump and card.suit is not served:
+                        self.assertEqual(s, 0)
+                    if card != jack:
+                        self.assertTrue(jack.beats(card, served=served, trump=trump))
+                        self.assertFalse(card.beats(jack, served=served, trump=trump))
+
+    def test_score_tricks(self):
+        cards = list(range(36))
+        tricks, trumps = [], []
+        for _ in range(1000):
+            random.shuffle(cards)
+            tricks.append(cards[:4])
+            trumps.append(random.randint(0, 3))
+        winners, points = tables.score_tricks(np.array(tricks), np.array(trumps))
+
+        for trick, trump, winner, p in zip(tricks, trumps, winners, points):
+            trick_cards = [Card[c] for c in trick]
+            served = trick_cards[0].suit
+            best = trick_cards[0]
+            for card in trick_cards[1:]:
+                if card.beats(best, served=served, trump=Suit[trump]):
+                    best = card
+            self.assertEqual(trick_cards[winner], best)
+            self.assertEqual(p, sum(c.points(Suit[trump]) for c in trick_cards))
+
+        shared_winners, _ = tables.score_tricks(np.array(tricks), 2)
+        self.assertEqual(shared_winners.shape, (1000,))
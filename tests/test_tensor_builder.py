@@ -0,0 +1,35 @@
+from unittest import TestCase
+
+import torch
+
+from jass.agents.tensor_builder import TensorBuilder
+from jass.logic.card import Card, Suit, Rank
+
+
+class TensorBuilderTest(TestCase):
+    def test_bow(self):
+        cards = [Card(6, Suit.hearts), Card(Rank.ace, Suit.spades)]
+        vector = TensorBuilder.bow(*cards)
+        self.assertEqual(vector.shape, (36,))
+        self.assertEqual(vector.sum(), 2)
+        for card in cards:
+            self.assertEqual(vector[card.order_value], 1)
+        suit_vector = TensorBuilder.bow(Suit.clubs)
+        self.assertTrue(torch.equal(suit_vector, torch.eye(4, dtype=torch.long)[Suit.clubs.order_value]))
+
+    def test_one_hot(self):
+        cards = [Card(7, Suit.diamonds), Card(Rank.jack, Suit.clubs), Card(6, Suit.hearts)]
+        matrix = TensorBuilder.one_hot(*cards)
+        self.assertEqual(matrix.shape, (3, 36))
+        self.assertEqual(matrix.argmax(dim=1).tolist(), [card.order_value for card in cards])
+
+    def test_out(self):
+        out = torch.full((2, 36), 7, dtype=torch.long)
+        cards = [Card(8, Suit.spades), Card(9, Suit.spades)]
+        result = TensorBuilder.one_hot(*cards, out=out)
+        self.assertIs(result, out)
+        self.assertTrue(torch.equal(out, TensorBuilder.one_hot(*cards)))
+
+        out = torch.ones(10, dtype=torch.uint8)
+        TensorBuilder.indicator([1, 5], 10, out=out)
+        self.assertEqual(out.tolist(), [0, 1, 0, 0, 0, 1, 0, 0, 0, 0])
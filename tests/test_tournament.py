@@ -0,0 +1,47 @@
+from unittest import TestCase
+
+from jass.agents.impl.greedy_agent import GreedyAgent
+from jass.agents.impl.random_agent import RandomAgent
+from jass.tournament import run_tournament, GameResult, TournamentSummary
+
+
+class TournamentTest(TestCase):
+
+    def test_summary(self):
+        summary = TournamentSummary()
+        for game_idx, scores in enumerate([(1000, 800), (900, 1010), (1005, 300), (1100, 700)]):
+            summary.add(GameResult(game_idx=game_idx, scores=scores, rounds=6, duration=0.1))
+        self.assertEqual(summary.wins, [3, 1])
+        self.assertEqual(summary.win_rate, 0.75)
+        self.assertEqual(summary.mean_score_diff, (200 - 110 + 705 + 400) / 4)
+        low, high = summary.win_rate_ci
+        self.assertLess(low, 0.75)
+        self.assertGreater(high, 0.75)
+        low, high = summary.score_diff_ci
+        self.assertLess(low, summary.mean_score_diff)
+        self.assertGreater(high, summary.mean_score_diff)
+
+    def test_run(self):
+        results = []
+        summary = run_tournament([GreedyAgent, RandomAgent], n_games=6, goal=300, workers=0,
+                                 on_result=lambda r, s: results.append(r))
+        self.assertEqual(summary.n_games, 6)
+        self.assertEqual(sorted(r.game_idx for r in results), list(range(6)))
+        for result in results:
+            self.assertGreaterEqual(max(result.scores), 300)
+
+        summary = run_tournament([RandomAgent] * 4, n_games=4, goal=300, workers=2)
+        self.assertEqual(summary.n_games, 4)
+        self.assertEqual(sum(summary.wins), 4)
+
+    def test_replay(self):
+        """The deals and the `random` module are seeded per game, whichever process plays it"""
+        def results(workers: int):
+            played = []
+            run_tournament([RandomAgent] * 4, n_games=4, seed=3, goal=300, workers=workers,
+                           on_result=lambda r, s: played.append(r))
+            return sorted((r.game_idx, r.scores, r.rounds) for r in played)
+
+        first = results(workers=0)
+        self.assertEqual(len(first), 4)
+        self.assertEqual(results(workers=2), first)
@@ -0,0 +1,64 @@
+from unittest import TestCase
+
+from jass.agents.impl.random_agent import RandomAgent
+from jass.logic.card import Card, Suit, Rank
+from jass.logic.exceptions import IllegalMoveError
+from jass.logic.player import Player
+from jass.logic.trick import Trick
+
+
+class TrickTest(TestCase):
+    def setUp(self) -> None:
+        self.players = [Player(name, RandomAgent()) for name in ['Jean', 'Anne', 'Luc', 'Sophie']]
+
+    def test_running_winner(self):
+        trick = Trick(trump=Suit.hearts)
+        self.assertIsNone(trick.winner)
+        self.assertEqual(trick.points, 0)
+
+        jean, anne, luc, sophie = self.players
+        trick.add_card(Card(10, Suit.spades), jean)
+        self.assertIs(trick.winner, jean)
+        self.assertEqual(trick.points, 10)
+        self.assertIs(trick.served, Suit.spades)
+
+        trick.add_card(Card(Rank.ace, Suit.spades), anne)
+        self.assertIs(trick.winner, anne)
+        self.assertIs(trick.best_card, Card(Rank.ace, Suit.spades))
+        self.assertEqual(trick.points, 21)
+
+        trick.add_card(Card(Rank.king, Suit.clubs), luc)
+        self.assertIs(trick.winner, anne)
+        self.assertEqual(trick.points, 25)
+
+        trick.add_card(Card(6, Suit.hearts), sophie)
+        self.assertIs(trick.winner, sophie)
+        self.assertEqual(trick.points, 25)
+        self.assertTrue(trick.is_complete)
+
+        with self.assertRaises(IllegalMoveError):
+            trick.add_card(Card(7, Suit.hearts), jean)
+
+    def test_undo(self):
+        trick = Trick(trump=Suit.clubs)
+        jean, anne, luc, sophie = self.players
+        trick.add_card(Card(Rank.queen, Suit.diamonds), jean)
+        trick.add_card(Card(9, Suit.clubs), anne)
+        mask, points = trick.mask, trick.points
+
+        trick.add_card(Card(Rank.jack, Suit.clubs), luc)
+        self.assertIs(trick.winner, luc)
+        self.assertEqual(trick.points, points + 20)
+
+        self.assertEqual(trick.remove_last_card(), (luc, Card(Rank.jack, Suit.clubs)))
+        self.assertIs(trick.winner, anne)
+        self.assertEqual(trick.mask, mask)
+        self.assertEqual(trick.points, points)
+
+        trick.remove_last_card()
+        trick.remove_last_card()
+        self.assertIsNone(trick.winner)
+        self.assertIsNone(trick.served)
+        self.assertEqual(trick.points, 0)
+        with self.assertRaises(IllegalMoveError):
+            trick.remove_last_card()